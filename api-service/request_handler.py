@@ -3,15 +3,139 @@ request_handler validates the schema of incoming requests and routes them to app
 
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
+from urllib.parse import urlencode
+import hashlib
+import os
+import time
 import requests
-from common_packages.constants.constants import CALIBRATION_SCHEMA, ADD_TAG_SCHEMA
-from common_packages.utils.schema_validator import validate_schema
+from common_packages.constants.constants import (
+    CALIBRATION_SCHEMA, ADD_TAG_SCHEMA, CALIBRATION_BATCH_SCHEMA, BULK_TAG_SCHEMA, SNAPSHOT_SCHEMA, BATCH_MODE_ALL_OR_NOTHING,
+    CALIBRATION_SERVICE, TAG_SERVICE, GATEWAY_RESPONSE_CACHE, DEFAULT_GATEWAY_CACHE_SIZE, DEFAULT_GATEWAY_CACHE_TTL,
+    DEFAULT_COMPOSITE_DEADLINE, MAX_COMPOSITE_IDS
+)
+from common_packages.cache.cache import get_cache
+from common_packages.utils.schema_validator import schema_errors, validate_many
+from common_packages.utils.service_client import get_client, fan_out
 from common_packages.logs.logging_config import setup_logger
 
 routes = Blueprint('routes', __name__)
 log = setup_logger(__file__)
 
+calibration_service = get_client(CALIBRATION_SERVICE)
+tag_service = get_client(TAG_SERVICE)
+
+# Successful downstream GET bodies with their validators, keyed by path and normalised query
+response_cache = get_cache(
+    GATEWAY_RESPONSE_CACHE,
+    maxsize=int(os.getenv('GATEWAY_CACHE_SIZE', DEFAULT_GATEWAY_CACHE_SIZE)),
+    ttl=float(os.getenv('GATEWAY_CACHE_TTL', DEFAULT_GATEWAY_CACHE_TTL))
+)
+
+
+def downstream_error(client, path, error):
+    """The gateway's response when a downstream call fails before any response arrives"""
+    if isinstance(error, requests.exceptions.Timeout):
+        log.error("Timed out calling %s: %s", client.url(path), error)
+        return jsonify({
+            "status": {
+                "code": 504,
+                "message": "Downstream service timed out"
+            }
+        }), 504
+    log.error("Error calling %s: %s", client.url(path), error)
+    return jsonify({
+        "status": {
+            "code": 502,
+            "message": "Downstream service unavailable"
+        }
+    }), 502
+
+
+def forward(client, method, path, **kwargs):
+    """Send a request to a downstream service and relay its response"""
+    try:
+        response = client.request(method, path, **kwargs)
+    except requests.exceptions.RequestException as e:
+        return downstream_error(client, path, e)
+    return response.content, response.status_code
+
+
+def forward_stream(client, method, path, **kwargs):
+    """Relay a downstream response chunk by chunk as it arrives, without buffering the body"""
+    try:
+        response = client.request(method, path, stream=True, **kwargs)
+    except requests.exceptions.RequestException as e:
+        return downstream_error(client, path, e)
+
+    if response.status_code != 200:
+        # Error bodies are small JSON envelopes
+        content = response.content
+        response.close()
+        return content, response.status_code
+
+    def relay():
+        try:
+            yield from response.iter_content(chunk_size=None)
+        finally:
+            response.close()
+
+    headers = {name: response.headers[name] for name in ('Content-Type', 'Content-Disposition')
+               if name in response.headers}
+    return Response(relay(), status=response.status_code, headers=headers)
+
+
+def cache_key(path, params=None):
+    """``path`` plus its query parameters, sorted and without unset ones"""
+    query = urlencode(sorted((k, v) for k, v in (params or {}).items() if v is not None))
+    return f'{path}?{query}'
+
+
+def forward_cached(client, path, params=None):
+    """GET through the response cache, answering If-None-Match with 304.
+
+    Bodies are only reused from a shared cache backend, where the clear() done
+    after each gateway write reaches every worker. With the per-process backend
+    another worker may still hold a body from before the write, so every request
+    is revalidated against the downstream service instead.
+    """
+    key = cache_key(path, params)
+    entry = response_cache.get(key) if response_cache.shared else None
+    cache_status = 'HIT'
+    if entry is None:
+        cache_status = 'MISS'
+        # Taken before the fetch: a write that clears the cache meanwhile orphans this body
+        version = response_cache.version(key) if response_cache.shared else None
+        content, status = forward(client, 'GET', path, params=params)
+        if status != 200:
+            return content, status
+        entry = {
+            "body": content.decode(),
+            "etag": hashlib.blake2b(content, digest_size=16).hexdigest()
+        }
+        if response_cache.shared:
+            response_cache.set(key, entry, version=version)
+
+    response = Response(entry["body"], status=200, mimetype='application/json')
+    # The ETag hashes the body itself; there is no data timestamp to send as Last-Modified
+    response.set_etag(entry["etag"])
+    # Clients may keep the body but must revalidate, which costs them a 304 when nothing changed
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Cache'] = cache_status
+    return response.make_conditional(request)
+
+
+@routes.after_request
+def invalidate_response_cache(response):
+    """Any write through the gateway may change what the cached GETs return.
+
+    Only rejected requests (4xx) are known to have changed nothing: a write that
+    timed out or failed downstream may still have been applied.
+    """
+    if request.method in ('POST', 'DELETE') and not 400 <= response.status_code < 500:
+        response_cache.clear()
+    return response
+
 
 # Health check endpoints
 @routes.route('/', methods=['GET'])
@@ -28,92 +152,350 @@ def health_check():
 @routes.route('/api/v1/calibrations', methods=['POST'])
 def create_calibration():
     data = request.get_json()
-    log.info(f"Received request to create calibration with: {data}")
+    log.info("Received request to create calibration with: %s", data)
 
-    if validate_schema(data, CALIBRATION_SCHEMA):
-        response = requests.post('http://calibration-service:5001/internal-calibration', json=data)
-        log.info(f"Routed calibration creation request to calibration service")
-        return response.content, response.status_code
+    errors = schema_errors(data, CALIBRATION_SCHEMA)
+    if not errors:
+        log.info("Routed calibration creation request to calibration service")
+        return forward(calibration_service, 'POST', '/internal-calibration', json=data)
     else:
-        log.warning(f"Invalid schema for calibration creation: {data}")
+        log.warning("Invalid schema for calibration creation: %s", data)
         return jsonify({
             "status": {
                 "code": 400,
                 "message": "Invalid schema. Please use the correct schema for calibration creation"
-            }
+            },
+            "errors": errors
         }), 400
 
 
-@routes.route('/api/v1/calibrations', methods=['GET'])
-def get_calibrations():
-    # Extract query parameters for the 4 filter types mentioned in challenge
-    filters = {
+@routes.route('/api/v1/calibrations/batch', methods=['POST'])
+def create_calibrations_batch():
+    data = request.get_json()
+    errors = schema_errors(data, CALIBRATION_BATCH_SCHEMA)
+    if errors:
+        log.warning("Invalid schema for batch calibration creation: %s", errors)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": "Invalid schema. Please use the correct schema for batch calibration creation"
+            },
+            "errors": errors
+        }), 400
+
+    calibrations = data['calibrations']
+    mode = data.get('mode', BATCH_MODE_ALL_OR_NOTHING)
+    log.info("Received request to create %s calibrations in '%s' mode", len(calibrations), mode)
+
+    # In partial mode the calibration service reports per-row errors itself
+    if mode == BATCH_MODE_ALL_OR_NOTHING:
+        invalid = validate_many(calibrations, CALIBRATION_SCHEMA)
+        if invalid:
+            log.warning("Rejected batch of %s calibrations: %s invalid rows", len(calibrations), len(invalid))
+            return jsonify({
+                "status": {
+                    "code": 400,
+                    "message": f"{len(invalid)} of {len(calibrations)} calibrations are invalid, nothing was created"
+                },
+                "errors": [{"index": index, "errors": row_errors} for index, row_errors in invalid.items()]
+            }), 400
+
+    log.info("Routed batch calibration creation request to calibration service")
+    return forward(calibration_service, 'POST', '/internal-calibrations/batch', json=data)
+
+
+def calibration_filters():
+    """The listing filters present on this request"""
+    return {
         'username': request.args.get('username'),                # Filter by USER
         'calibration_type': request.args.get('calibration_type'), # Filter by TYPE
         'tag_name': request.args.get('tag_name'),                # Filter by TAG
         'tag_at_time': request.args.get('tag_at_time'),
         'start_date': request.args.get('start_date'),            # Filter by TIME
         'end_date': request.args.get('end_date'),                # Filter by TIME
+    }
+
+
+@routes.route('/api/v1/calibrations', methods=['GET'])
+def get_calibrations():
+    # Extract query parameters for the 4 filter types mentioned in challenge
+    filters = {
+        **calibration_filters(),
         'page': request.args.get('page', 1, type=int),
-        'limit': request.args.get('limit', 20, type=int)
+        'limit': request.args.get('limit', 20, type=int),
+        'cursor': request.args.get('cursor'),                    # Keyset pagination
+        'total': request.args.get('total')                       # exact | estimate | none
     }
 
     # Remove None values
     filters = {k: v for k, v in filters.items() if v is not None}
 
-    log.info(f"Received request to get calibrations with filters: {filters}")
+    log.info("Received request to get calibrations with filters: %s", filters)
+
+    log.info("Routed get calibrations request to calibration service")
+    return forward_cached(calibration_service, '/internal-calibrations', filters)
 
-    response = requests.get('http://calibration-service:5001/internal-calibrations', params=filters)
-    log.info(f"Routed get calibrations request to calibration service")
-    return response.content, response.status_code
+
+@routes.route('/api/v1/calibrations/stats', methods=['GET'])
+def get_calibration_stats():
+    params = {
+        **calibration_filters(),
+        'group_by': request.args.get('group_by'),          # calibration_type, username
+        'percentiles': request.args.get('percentiles')     # e.g. 50,95,99
+    }
+    params = {k: v for k, v in params.items() if v is not None}
+
+    log.info("Received request for calibration stats with: %s", params)
+
+    log.info("Routed calibration stats request to calibration service")
+    return forward_cached(calibration_service, '/internal-calibrations/stats', params)
+
+
+@routes.route('/api/v1/calibrations/series', methods=['GET'])
+def get_calibration_series():
+    params = {
+        **calibration_filters(),
+        'interval': request.args.get('interval'),          # bucket width, e.g. 1m, 1h, 1d
+        'points': request.args.get('points')               # target bucket count when no interval
+    }
+    params = {k: v for k, v in params.items() if v is not None}
+
+    log.info("Received request for calibration series with: %s", params)
+
+    log.info("Routed calibration series request to calibration service")
+    return forward_cached(calibration_service, '/internal-calibrations/series', params)
+
+
+@routes.route('/api/v1/calibrations/export', methods=['GET'])
+def export_calibrations():
+    params = {**calibration_filters(), 'format': request.args.get('format')}
+    params = {k: v for k, v in params.items() if v is not None}
+
+    log.info("Received request to export calibrations with: %s", params)
+
+    log.info("Routed export request to calibration service")
+    return forward_stream(calibration_service, 'GET', '/internal-calibrations/export', params=params)
+
+
+def hop_result(result):
+    """``(data, error)`` from one fanned-out downstream response, or the exception it raised"""
+    if isinstance(result, requests.exceptions.Timeout):
+        return None, "Downstream service timed out"
+    if isinstance(result, Exception):
+        return None, "Downstream service unavailable"
+    try:
+        body = result.json()
+    except ValueError:
+        return None, f"Invalid downstream response (HTTP {result.status_code})"
+    if result.status_code != 200:
+        return None, body.get('status', {}).get('message', f"Downstream error (HTTP {result.status_code})")
+    return body.get('data'), None
+
+
+# Composite: calibrations together with their active tags, fanned out concurrently
+@routes.route('/api/v1/calibrations/with-tags', methods=['GET'])
+def get_calibrations_with_tags():
+    deadline = time.monotonic() + float(os.getenv('COMPOSITE_DEADLINE', DEFAULT_COMPOSITE_DEADLINE))
+    raw_ids = request.args.get('ids')
+    pagination = None
+
+    if raw_ids:
+        try:
+            calibration_ids = list(dict.fromkeys(int(value) for value in raw_ids.split(',') if value.strip()))
+        except ValueError:
+            calibration_ids = []
+        if not 0 < len(calibration_ids) <= MAX_COMPOSITE_IDS:
+            return jsonify({
+                "status": {
+                    "code": 400,
+                    "message": f"Expected 'ids' as 1 to {MAX_COMPOSITE_IDS} comma-separated calibration ids"
+                }
+            }), 400
+        log.info("Received request for %s calibrations with tags", len(calibration_ids))
+
+        # Both services, every id, all at once
+        calls = {}
+        for calibration_id in calibration_ids:
+            calls[('calibration', calibration_id)] = (
+                calibration_service, 'GET', f'/internal-calibration/{calibration_id}', {})
+            calls[('tags', calibration_id)] = (
+                tag_service, 'GET', f'/internal-calibration/{calibration_id}/tags', {})
+        results = fan_out(calls, deadline)
+        calibrations = [hop_result(results[('calibration', calibration_id)]) for calibration_id in calibration_ids]
+        calibrations = [calibration or {"id": calibration_id, "error": error}
+                        for calibration_id, (calibration, error) in zip(calibration_ids, calibrations)]
+    else:
+        params = {
+            **calibration_filters(),
+            'page': request.args.get('page', 1, type=int),
+            'limit': request.args.get('limit', 20, type=int),
+            'cursor': request.args.get('cursor'),
+            'total': request.args.get('total')
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+        log.info("Received request for calibrations with tags with filters: %s", params)
+
+        # The page decides which ids to fetch tags for, so this hop comes first
+        path = '/internal-calibrations'
+        listing = fan_out({'listing': (calibration_service, 'GET', path, {'params': params})}, deadline)['listing']
+        if isinstance(listing, Exception):
+            return downstream_error(calibration_service, path, listing)
+        if listing.status_code != 200:
+            return listing.content, listing.status_code
+        data = listing.json()['data']
+        calibrations = data['calibrations']
+        pagination = data['pagination']
+
+        results = fan_out({
+            ('tags', calibration['id']): (tag_service, 'GET', f"/internal-calibration/{calibration['id']}/tags", {})
+            for calibration in calibrations
+        }, deadline)
+
+    # Merge: each calibration gets its tags, or the error that kept us from getting them
+    for calibration in calibrations:
+        if 'error' in calibration:
+            continue
+        tags, error = hop_result(results[('tags', calibration['id'])])
+        if error:
+            calibration['tags_error'] = error
+        else:
+            calibration['tags'] = tags['tags']
+
+    incomplete = sum(1 for calibration in calibrations if 'error' in calibration or 'tags_error' in calibration)
+    return jsonify({
+        "status": {
+            "code": 200,
+            "message": "Success" if not incomplete else f"{incomplete} of {len(calibrations)} calibrations incomplete"
+        },
+        "data": {
+            "calibrations": calibrations,
+            "pagination": pagination
+        }
+    }), 200
 
 
 # USE CASE 2: Add a Calibration to a tag
 @routes.route('/api/v1/calibrations/<int:calibration_id>/tags', methods=['POST'])
 def add_calibration_to_tag(calibration_id):
     data = request.get_json()
-    log.info(f"Received request to add calibration {calibration_id} to tag: {data}")
-
-    if validate_schema(data, ADD_TAG_SCHEMA):
-        response = requests.post(
-            f'http://tag-service:5002/internal-calibration/{calibration_id}/tags',
-            json=data
-        )
-        log.info(f"Routed add-to-tag request to tag service")
-        return response.content, response.status_code
+    log.info("Received request to add calibration %s to tag: %s", calibration_id, data)
+
+    errors = schema_errors(data, ADD_TAG_SCHEMA)
+    if not errors:
+        log.info("Routed add-to-tag request to tag service")
+        return forward(tag_service, 'POST', f'/internal-calibration/{calibration_id}/tags', json=data)
     else:
-        log.warning(f"Invalid schema for adding calibration to tag: {data}")
+        log.warning("Invalid schema for adding calibration to tag: %s", data)
         return jsonify({
             "status": {
                 "code": 400,
                 "message": "Invalid schema. Please use the correct schema for adding calibration to tag"
-            }
+            },
+            "errors": errors
         }), 400
 
 
 @routes.route('/api/v1/calibrations/<int:calibration_id>/tags/<string:tag_name>', methods=['DELETE'])
 def remove_calibration_from_tag(calibration_id, tag_name):
-    log.info(f"Received request to remove calibration {calibration_id} from tag {tag_name}")
+    log.info("Received request to remove calibration %s from tag %s", calibration_id, tag_name)
 
-    response = requests.delete(
-        f'http://tag-service:5002/internal-calibration/{calibration_id}/tags/{tag_name}'
-    )
-    log.info(f"Routed remove-from-tag request to tag service")
-    return response.content, response.status_code
+    log.info("Routed remove-from-tag request to tag service")
+    return forward(tag_service, 'DELETE', f'/internal-calibration/{calibration_id}/tags/{tag_name}')
 
 
 @routes.route('/api/v1/calibrations/<int:calibration_id>/tags', methods=['GET'])
 def get_calibration_tags(calibration_id):
-    log.info(f"Received request to get tags for calibration {calibration_id}")
+    log.info("Received request to get tags for calibration %s", calibration_id)
+
+    log.info("Routed get calibration tags request to tag service")
+    return forward_cached(tag_service, f'/internal-calibration/{calibration_id}/tags')
 
-    response = requests.get(f'http://tag-service:5002/internal-calibration/{calibration_id}/tags')
-    log.info(f"Routed get calibration tags request to tag service")
-    return response.content, response.status_code
+
+# Bulk tagging: add or remove many calibrations in one request
+@routes.route('/api/v1/tags/<string:tag_name>/calibrations', methods=['POST', 'DELETE'])
+def bulk_tag_calibrations(tag_name):
+    data = request.get_json(silent=True)
+    action = 'add' if request.method == 'POST' else 'remove'
+
+    errors = schema_errors(data, BULK_TAG_SCHEMA)
+    if errors:
+        log.warning("Invalid schema for bulk %s on tag %s: %s", action, tag_name, errors)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": f"Invalid schema. Please use the correct schema for bulk {action} on a tag"
+            },
+            "errors": errors
+        }), 400
+
+    log.info("Received request to %s %s calibrations on tag %s", action, len(data['calibration_ids']), tag_name)
+    log.info("Routed bulk %s request to tag service", action)
+    return forward(tag_service, request.method, f'/internal-tags/{tag_name}/calibrations', json=data)
+
+
+@routes.route('/api/v1/tags/<string:tag_name>/latest', methods=['GET'])
+def get_latest_calibrations(tag_name):
+    params = {
+        'group_by': request.args.get('group_by'),          # calibration_type | calibration_type,username
+        'tag_at_time': request.args.get('tag_at_time')
+    }
+    params = {k: v for k, v in params.items() if v is not None}
+
+    log.info("Received request for latest calibrations under tag %s with: %s", tag_name, params)
+
+    log.info("Routed latest calibrations request to tag service")
+    return forward_cached(tag_service, f'/internal-tags/{tag_name}/latest', params)
+
+
+# Tag snapshots: immutable copies of a tag's membership
+@routes.route('/api/v1/tags/<string:tag_name>/snapshots', methods=['POST'])
+def create_snapshot(tag_name):
+    data = request.get_json(silent=True)
+    log.info("Received request to snapshot tag %s: %s", tag_name, data)
+
+    errors = schema_errors(data, SNAPSHOT_SCHEMA)
+    if not errors:
+        log.info("Routed create snapshot request to tag service")
+        return forward(tag_service, 'POST', f'/internal-tags/{tag_name}/snapshots', json=data)
+    else:
+        log.warning("Invalid schema for creating a snapshot: %s", data)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": "Invalid schema. Please use the correct schema for creating a snapshot"
+            },
+            "errors": errors
+        }), 400
+
+
+@routes.route('/api/v1/tags/<string:tag_name>/snapshots', methods=['GET'])
+def get_tag_snapshots(tag_name):
+    log.info("Received request to list snapshots of tag %s", tag_name)
+
+    log.info("Routed list snapshots request to tag service")
+    return forward_cached(tag_service, f'/internal-tags/{tag_name}/snapshots')
+
+
+@routes.route('/api/v1/snapshots/<string:name>', methods=['GET'])
+def get_snapshot(name):
+    log.info("Received request to get snapshot %s", name)
+
+    log.info("Routed get snapshot request to tag service")
+    return forward_cached(tag_service, f'/internal-snapshots/{name}')
+
+
+@routes.route('/api/v1/snapshots/<string:name>/diff', methods=['GET'])
+def diff_snapshot(name):
+    params = {'against': request.args.get('against')}          # another snapshot; omit for the tag now
+    params = {k: v for k, v in params.items() if v is not None}
+    log.info("Received request to diff snapshot %s with: %s", name, params)
+
+    log.info("Routed diff snapshot request to tag service")
+    return forward_cached(tag_service, f'/internal-snapshots/{name}/diff', params)
 
 
 @routes.route('/api/v1/tags', methods=['GET'])
 def get_all_tags():
     log.info("Received request to get all tags")
-    response = requests.get('http://tag-service:5002/internal-tags')
-    log.info(f"Routed get all tags request to tag service")
-    return response.content, response.status_code
+    log.info("Routed get all tags request to tag service")
+    return forward_cached(tag_service, '/internal-tags')
@@ -1,38 +1,99 @@
-from flask import request, jsonify, Blueprint
-from common_packages.models.models import Calibration, Tag, CalibrationTag, db
+from flask import request, jsonify, Blueprint, Response, stream_with_context
+from common_packages.models.models import Calibration, db
+from common_packages.models.filters import CALIBRATION_FILTERS, filter_calibrations
+from common_packages.models.database import pool_stats
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import and_, or_
-from datetime import datetime
-import random
-from common_packages.utils.id_generator import SnowflakeIdGenerator
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
+from datetime import datetime, timezone
+import math
+import os
+import re
+import time
+from common_packages.cache.cache import get_cache, cache_stats
+from common_packages.cache.lookups import load_calibration
+from common_packages.utils.id_generator import get_id_generator
+from common_packages.utils.cursor import encode_cursor, decode_cursor
+from common_packages.utils.schema_validator import validate_many
+from common_packages.utils.export import EXPORT_FORMATS, EXPORT_NDJSON
+from common_packages.instrumentation.timing import phase
+from common_packages.constants.constants import (
+    CALIBRATION_SCHEMA, BATCH_MODE_ALL_OR_NOTHING, BATCH_MODE_PARTIAL, MAX_BATCH_SIZE,
+    TOTAL_EXACT, TOTAL_ESTIMATE, TOTAL_NONE, TOTAL_MODES, DEFAULT_COUNT_CACHE_TTL, DEFAULT_TAG_COUNT_CACHE_TTL,
+    COUNT_CACHE_SIZE,
+    CALIBRATION_CACHE, CALIBRATION_COUNT_CACHE, EXPORT_BATCH_SIZE,
+    STATS_GROUP_KEYS, DEFAULT_STATS_PERCENTILES, MAX_STATS_PERCENTILES,
+    SERIES_INTERVAL_UNITS, DEFAULT_SERIES_POINTS, MAX_SERIES_BUCKETS
+)
 from common_packages.logs.logging_config import setup_logger
 
 log = setup_logger(__file__)
 
 calibration_routes = Blueprint('calibration_routes', __name__)
 
+# Filter signature -> [total row count, when it was counted], served to total=estimate
+# requests. Cleared on calibration writes here and on tag writes in the tag service.
+# The tag service's clears only reach a shared backend, so with the local one counts
+# filtered by tag are reused for TAG_COUNT_CACHE_TTL seconds at most.
+count_cache = get_cache(
+    CALIBRATION_COUNT_CACHE,
+    maxsize=COUNT_CACHE_SIZE,
+    ttl=float(os.getenv('COUNT_CACHE_TTL', DEFAULT_COUNT_CACHE_TTL))
+)
+tag_count_ttl = float(os.getenv('TAG_COUNT_CACHE_TTL', DEFAULT_TAG_COUNT_CACHE_TTL))
+calibration_cache = get_cache(CALIBRATION_CACHE)
+
 
 @calibration_routes.route('/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy", "service": "calibration-service"})
 
 
+@calibration_routes.route('/internal-cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Hit/miss counters for this process's caches"""
+    return jsonify({
+        "status": {
+            "code": 200,
+            "message": "Success"
+        },
+        "data": cache_stats()
+    }), 200
+
+
+@calibration_routes.route('/internal-db/stats', methods=['GET'])
+def get_db_stats():
+    """Connection pool usage for this process; server=true adds the database's connection count and limit"""
+    try:
+        stats = pool_stats(include_server=request.args.get('server', 'false').lower() == 'true')
+    except SQLAlchemyError as e:
+        log.error("Database error reading pool stats: %s", e)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": "Database error occurred",
+                "error": str(e)
+            }
+        }), 400
+    return jsonify({
+        "status": {
+            "code": 200,
+            "message": "Success"
+        },
+        "data": stats
+    }), 200
+
+
 @calibration_routes.route('/internal-calibration', methods=['POST'])
 def create_calibration():
     """Create a new calibration"""
     data = request.get_json()
-    log.info(f"Received request to create calibration with: {data}")
+    log.info("Received request to create calibration with: %s", data)
 
     try:
-        # Generate unique ID using Snowflake pattern
-        id_generator = SnowflakeIdGenerator(
-            worker_id=random.randint(0, 4),
-            datacenter_id=random.randint(0, 4)
-        )
-
-        # Create new calibration
+        # Create new calibration with a unique Snowflake ID
         new_calibration = Calibration(
-            id=id_generator.generate(),
+            id=get_id_generator().generate(),
             calibration_type=data['calibration_type'].lower(),
             value=data['value'],
             username=data['username'],
@@ -40,10 +101,12 @@ def create_calibration():
         )
 
         calibration_id = new_calibration.id
-        log.info(f"Created new calibration with id: {calibration_id}")
+        log.info("Created new calibration with id: %s", calibration_id)
 
         db.session.add(new_calibration)
         db.session.commit()
+        calibration_cache.invalidate(calibration_id)
+        count_cache.clear()
 
         return jsonify({
             "status": {
@@ -55,7 +118,100 @@ def create_calibration():
 
     except SQLAlchemyError as e:
         db.session.rollback()
-        log.error(f"Error occurred while adding new calibration to the database: {str(e)}")
+        log.error("Error occurred while adding new calibration to the database: %s", e)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": "Database error occurred",
+                "error": str(e)
+            }
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        log.error("Unexpected error creating calibration: %s", e)
+        return jsonify({
+            "status": {
+                "code": 500,
+                "message": "Internal server error",
+                "error": str(e)
+            }
+        }), 500
+
+
+@calibration_routes.route('/internal-calibrations/batch', methods=['POST'])
+def create_calibrations_batch():
+    """Create many calibrations with a single multi-row insert"""
+    data = request.get_json() or {}
+    calibrations = data.get('calibrations') or []
+    mode = data.get('mode', BATCH_MODE_ALL_OR_NOTHING)
+    log.info("Received request to create %s calibrations in '%s' mode", len(calibrations), mode)
+
+    if mode not in (BATCH_MODE_ALL_OR_NOTHING, BATCH_MODE_PARTIAL) or not 0 < len(calibrations) <= MAX_BATCH_SIZE:
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": f"Expected 1 to {MAX_BATCH_SIZE} calibrations and mode "
+                           f"'{BATCH_MODE_ALL_OR_NOTHING}' or '{BATCH_MODE_PARTIAL}'"
+            }
+        }), 400
+
+    # One validation pass over the whole batch
+    invalid = validate_many(calibrations, CALIBRATION_SCHEMA)
+    errors = [{"index": index, "errors": row_errors} for index, row_errors in invalid.items()]
+
+    if invalid and (mode == BATCH_MODE_ALL_OR_NOTHING or len(invalid) == len(calibrations)):
+        log.warning("Rejected batch of %s calibrations: %s invalid rows", len(calibrations), len(invalid))
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": f"{len(invalid)} of {len(calibrations)} calibrations are invalid, nothing was created"
+            },
+            "errors": errors
+        }), 400
+
+    try:
+        timestamp = datetime.utcnow()
+        new_ids = iter(get_id_generator().generate_many(len(calibrations) - len(invalid)))
+
+        calibration_ids = []
+        rows = []
+        for index, item in enumerate(calibrations):
+            if index in invalid:
+                calibration_ids.append(None)
+                continue
+            calibration_id = next(new_ids)
+            calibration_ids.append(calibration_id)
+            rows.append({
+                "id": calibration_id,
+                "calibration_type": item['calibration_type'].lower(),
+                "value": item['value'],
+                "username": item['username'],
+                "timestamp": timestamp
+            })
+
+        # executemany on a Core insert is sent as batched multi-row INSERT ... VALUES
+        db.session.execute(insert(Calibration.__table__), rows)
+        db.session.commit()
+        calibration_cache.invalidate(*(row["id"] for row in rows))
+        count_cache.clear()
+        log.info("Created %s calibrations, rejected %s", len(rows), len(invalid))
+
+        return jsonify({
+            "status": {
+                "code": 201,
+                "message": f"{len(rows)} calibrations created successfully!"
+            },
+            "data": {
+                "calibration_ids": calibration_ids,
+                "created": len(rows),
+                "rejected": len(invalid)
+            },
+            "errors": errors
+        }), 201
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Error occurred while adding calibration batch to the database: %s", e)
         return jsonify({
             "status": {
                 "code": 400,
@@ -65,7 +221,7 @@ def create_calibration():
         }), 400
     except Exception as e:
         db.session.rollback()
-        log.error(f"Unexpected error creating calibration: {str(e)}")
+        log.error("Unexpected error creating calibration batch: %s", e)
         return jsonify({
             "status": {
                 "code": 500,
@@ -86,100 +242,349 @@ def get_calibrations():
         tag_at_time = request.args.get('tag_at_time')
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
-        page = request.args.get('page', 1, type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
         limit = request.args.get('limit', 20, type=int)
+        if limit < 1:
+            limit = 20
+        # Keyset pagination is used whenever a cursor is passed; an empty cursor requests the first page
+        cursor = request.args.get('cursor')
+        total_mode = request.args.get('total', TOTAL_EXACT)
+
+        if total_mode not in TOTAL_MODES:
+            return jsonify({
+                "status": {"code": 400, "message": f"Invalid total mode, expected one of {', '.join(TOTAL_MODES)}"}
+            }), 400
+
+        log.info("Filtering calibrations with parameters: username=%s, type=%s, tag=%s, dates=%s-%s, tag_at_time=%s",
+                 username, calibration_type, tag_name, start_date, end_date, tag_at_time)
+
+        try:
+            query = filter_calibrations(
+                Calibration.query,
+                username=username,
+                calibration_type=calibration_type,
+                tag_name=tag_name,
+                tag_at_time=tag_at_time,
+                start_date=start_date,
+                end_date=end_date
+            )
+        except ValueError:
+            return jsonify({
+                "status": {"code": 400, "message": "Invalid tag_at_time format"}
+            }), 400
 
-        log.info(f"Filtering calibrations with parameters: username={username}, "
-                 f"type={calibration_type}, tag={tag_name}, dates={start_date}-{end_date}, tag_at_time={tag_at_time}")
-
-        # Start with base query
-        query = Calibration.query
-
-        # Apply filters
-        if username:
-            query = query.filter(Calibration.username == username)
-
-        if calibration_type:
-            query = query.filter(Calibration.calibration_type == calibration_type.lower())
-
-        # Date range filtering
-        if start_date:
-            try:
-                start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-                query = query.filter(Calibration.timestamp >= start_dt)
-            except ValueError:
-                log.warning(f"Invalid start_date format: {start_date}")
-
-        if end_date:
-            try:
-                end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-                query = query.filter(Calibration.timestamp <= end_dt)
-            except ValueError:
-                log.warning(f"Invalid end_date format: {end_date}")
-
-        # Tag filtering with historical support (direct JOIN on Tag.name)
-        if tag_name:
-            if tag_at_time:
-                # HISTORICAL: What HAD this tag at specific time
-                try:
-                    at_time = datetime.fromisoformat(tag_at_time.replace('Z', '+00:00'))
-                except ValueError:
-                    return jsonify({
-                        "status": {"code": 400, "message": "Invalid tag_at_time format"}
-                    }), 400
-
-                query = (
-                    query
-                    .join(CalibrationTag, Calibration.id == CalibrationTag.calibration_id)
-                    .join(Tag, Tag.id == CalibrationTag.tag_id)
-                    .filter(
-                        Tag.name == tag_name,
-                        CalibrationTag.added_at <= at_time,
-                        or_(
-                            CalibrationTag.removed_at.is_(None),
-                            CalibrationTag.removed_at > at_time
-                        )
-                    )
-                )
-            else:
-                # CURRENT: What has this tag NOW
-                query = (
-                    query
-                    .join(CalibrationTag, Calibration.id == CalibrationTag.calibration_id)
-                    .join(Tag, Tag.id == CalibrationTag.tag_id)
-                    .filter(
-                        Tag.name == tag_name,
-                        CalibrationTag.removed_at.is_(None)
-                    )
-                )
+        query = query.order_by(Calibration.timestamp.desc(), Calibration.id.desc())
+
+        if cursor is not None:
+            return _keyset_page(query, cursor, limit)
 
         # Apply pagination
-        total_count = query.count()
-        calibrations = query.order_by(Calibration.timestamp.desc()).paginate(
-            page=page, per_page=limit, error_out=False
-        ).items
+        offset = (page - 1) * limit
+        if total_mode == TOTAL_NONE:
+            # Fetch one extra row to report has_next without counting
+            calibrations = query.offset(offset).limit(limit + 1).all()
+            has_next = len(calibrations) > limit
+            calibrations = calibrations[:limit]
+            total_count = None
+            total_approximate = False
+        else:
+            signature = repr((username, calibration_type and calibration_type.lower(), tag_name, tag_at_time,
+                              start_date, end_date))
+            total_count = _reused_count(signature, tag_name) if total_mode == TOTAL_ESTIMATE else None
+            total_approximate = total_count is not None
+            if total_count is None:
+                version = count_cache.version(signature)
+                with phase('count'):
+                    total_count = query.order_by(None).count()
+                count_cache.set(signature, [total_count, time.time()], version=version)
+            calibrations = query.offset(offset).limit(limit).all()
+            has_next = offset + len(calibrations) < total_count
+
+        with phase('serialization'):
+            # Convert to dict
+            calibrations_dict = [calibration.to_dict() for calibration in calibrations]
+
+            return jsonify({
+                "status": {
+                    "code": 200,
+                    "message": "Success"
+                },
+                "data": {
+                    "calibrations": calibrations_dict,
+                    "pagination": {
+                        "page": page,
+                        "limit": limit,
+                        "total": total_count,
+                        "total_mode": total_mode,
+                        "total_approximate": total_approximate,
+                        "pages": (total_count + limit - 1) // limit if total_count is not None else None,
+                        "has_next": has_next
+                    }
+                }
+            }), 200
+
+    except Exception as e:
+        log.error("Error retrieving calibrations: %s", e)
+        return jsonify({
+            "status": {
+                "code": 500,
+                "message": "Internal server error",
+                "error": str(e)
+            }
+        }), 500
 
-        # Convert to dict
-        calibrations_dict = [calibration.to_dict() for calibration in calibrations]
 
+def _reused_count(signature, tag_name):
+    """An earlier count for the same filters, if it may still be served as an estimate"""
+    entry = count_cache.get(signature)
+    if entry is None:
+        return None
+    total_count, counted_at = entry
+    if tag_name and not count_cache.shared and time.time() - counted_at > tag_count_ttl:
+        return None
+    return total_count
+
+
+def _keyset_page(query, cursor, limit):
+    """Return the page of ``query`` after ``cursor``, seeking on (timestamp, id) instead of OFFSET"""
+    if cursor:
+        try:
+            last_timestamp, last_id = decode_cursor(cursor)
+        except ValueError:
+            return jsonify({
+                "status": {"code": 400, "message": "Invalid cursor"}
+            }), 400
+        query = query.filter(tuple_(Calibration.timestamp, Calibration.id) < tuple_(last_timestamp, last_id))
+
+    # Fetch one extra row to learn whether another page exists without counting
+    calibrations = query.limit(limit + 1).all()
+    has_next = len(calibrations) > limit
+    calibrations = calibrations[:limit]
+    next_cursor = encode_cursor(calibrations[-1].timestamp, calibrations[-1].id) if has_next else None
+
+    with phase('serialization'):
         return jsonify({
             "status": {
                 "code": 200,
                 "message": "Success"
             },
             "data": {
-                "calibrations": calibrations_dict,
+                "calibrations": [calibration.to_dict() for calibration in calibrations],
                 "pagination": {
-                    "page": page,
                     "limit": limit,
-                    "total": total_count,
-                    "pages": (total_count + limit - 1) // limit
+                    "has_next": has_next,
+                    "next_cursor": next_cursor
                 }
             }
         }), 200
 
+
+def _parse_group_by(raw):
+    """Comma-separated group-by keys, raising ValueError for unknown or repeated keys"""
+    keys = [key.strip() for key in raw.split(',') if key.strip()] if raw else []
+    unknown = [key for key in keys if key not in STATS_GROUP_KEYS]
+    if unknown or len(set(keys)) != len(keys):
+        raise ValueError(f"Invalid group_by, expected a comma-separated subset of {', '.join(STATS_GROUP_KEYS)}")
+    return keys
+
+
+def _parse_percentiles(raw):
+    """Comma-separated percentiles in [0, 100], raising ValueError if malformed"""
+    if raw is None:
+        return list(DEFAULT_STATS_PERCENTILES)
+    try:
+        percentiles = [float(value) for value in raw.split(',') if value.strip()]
+    except ValueError:
+        percentiles = None
+    if percentiles is None or len(percentiles) > MAX_STATS_PERCENTILES \
+            or not all(0 <= value <= 100 for value in percentiles):
+        raise ValueError(f"Invalid percentiles, expected up to {MAX_STATS_PERCENTILES} numbers between 0 and 100")
+    return percentiles
+
+
+@calibration_routes.route('/internal-calibrations/stats', methods=['GET'])
+def get_calibration_stats():
+    """Aggregate calibration values in SQL over the listing filters, optionally grouped"""
+    try:
+        group_by = _parse_group_by(request.args.get('group_by'))
+        percentiles = _parse_percentiles(request.args.get('percentiles'))
+    except ValueError as e:
+        return jsonify({
+            "status": {"code": 400, "message": str(e)}
+        }), 400
+
+    filters = {name: request.args.get(name) for name in CALIBRATION_FILTERS}
+    log.info("Computing calibration stats grouped by %s with filters: %s", group_by, filters)
+
+    group_columns = [getattr(Calibration, key) for key in group_by]
+    # percentile_cont is exact: PostgreSQL sorts each group's values itself
+    aggregates = [
+        func.count().label('count'),
+        func.avg(Calibration.value).label('mean'),
+        func.min(Calibration.value).label('min'),
+        func.max(Calibration.value).label('max'),
+        func.stddev_samp(Calibration.value).label('stddev'),
+    ] + [
+        func.percentile_cont(percentile / 100).within_group(Calibration.value).label(f'p{index}')
+        for index, percentile in enumerate(percentiles)
+    ]
+
+    try:
+        statement = filter_calibrations(select(*group_columns, *aggregates), **filters)
+    except ValueError:
+        return jsonify({
+            "status": {"code": 400, "message": "Invalid tag_at_time format"}
+        }), 400
+    if group_columns:
+        statement = statement.group_by(*group_columns).order_by(*group_columns)
+
+    try:
+        groups = []
+        for row in db.session.execute(statement).mappings():
+            if not row['count']:
+                continue  # ungrouped aggregate over no rows
+            groups.append({
+                **{key: row[key] for key in group_by},
+                "count": row['count'],
+                "mean": row['mean'],
+                "min": row['min'],
+                "max": row['max'],
+                "stddev": row['stddev'],
+                "percentiles": {f'p{percentile:g}': row[f'p{index}'] for index, percentile in enumerate(percentiles)}
+            })
+
+        return jsonify({
+            "status": {
+                "code": 200,
+                "message": "Success"
+            },
+            "data": {
+                "group_by": group_by,
+                "groups": groups
+            }
+        }), 200
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Database error computing calibration stats: %s", e)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": "Database error occurred",
+                "error": str(e)
+            }
+        }), 400
+    except Exception as e:
+        log.error("Error computing calibration stats: %s", e)
+        return jsonify({
+            "status": {
+                "code": 500,
+                "message": "Internal server error",
+                "error": str(e)
+            }
+        }), 500
+
+
+def _parse_interval(raw):
+    """Bucket width in seconds from e.g. '30s', '5m', '1h', '1d'; raises ValueError if malformed"""
+    match = re.fullmatch(r'(\d+)([smhd])', raw.strip())
+    if match is None or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid interval, expected a positive number followed by one of "
+                         f"{', '.join(SERIES_INTERVAL_UNITS)} (e.g. 1h)")
+    return int(match.group(1)) * SERIES_INTERVAL_UNITS[match.group(2)]
+
+
+@calibration_routes.route('/internal-calibrations/series', methods=['GET'])
+def get_calibration_series():
+    """Fixed-width time buckets of calibration values per calibration_type, aggregated in SQL"""
+    try:
+        width = _parse_interval(request.args['interval']) if request.args.get('interval') else None
+        points = request.args.get('points', DEFAULT_SERIES_POINTS, type=int)
+        if not 0 < points <= MAX_SERIES_BUCKETS:
+            raise ValueError(f"Invalid points, expected 1 to {MAX_SERIES_BUCKETS}")
+    except ValueError as e:
+        return jsonify({
+            "status": {"code": 400, "message": str(e)}
+        }), 400
+
+    filters = {name: request.args.get(name) for name in CALIBRATION_FILTERS}
+    log.info("Computing calibration series (interval=%ss, points=%s) with filters: %s", width, points, filters)
+
+    try:
+        # Span of the matching rows, to size buckets from ``points`` and bound their number
+        bounds = filter_calibrations(
+            select(func.min(Calibration.timestamp), func.max(Calibration.timestamp)), **filters
+        )
+    except ValueError:
+        return jsonify({
+            "status": {"code": 400, "message": "Invalid tag_at_time format"}
+        }), 400
+
+    try:
+        series = []
+        first, last = db.session.execute(bounds).one()
+        if first is not None:
+            span = (last - first).total_seconds()
+            if width is None:
+                width = max(1, math.ceil(span / points))
+            elif span / width >= MAX_SERIES_BUCKETS:
+                return jsonify({
+                    "status": {"code": 400, "message": f"Interval too small: the matching rows span more than "
+                                                      f"{MAX_SERIES_BUCKETS} buckets"}
+                }), 400
+
+            # Buckets are aligned to the Unix epoch (UTC); PostgreSQL 13 has no date_bin
+            bucket = func.floor(func.extract('epoch', Calibration.timestamp) / width) * width
+            statement = filter_calibrations(
+                select(
+                    Calibration.calibration_type,
+                    bucket.label('bucket'),
+                    func.count().label('count'),
+                    func.min(Calibration.value).label('min'),
+                    func.max(Calibration.value).label('max'),
+                    func.avg(Calibration.value).label('mean'),
+                    array_agg(aggregate_order_by(
+                        Calibration.value, Calibration.timestamp.desc(), Calibration.id.desc()
+                    ))[1].label('last')
+                ),
+                **filters
+            ).group_by(Calibration.calibration_type, bucket).order_by(Calibration.calibration_type, bucket)
+
+            for row in db.session.execute(statement).mappings():
+                if not series or series[-1]["calibration_type"] != row['calibration_type']:
+                    series.append({"calibration_type": row['calibration_type'], "buckets": []})
+                series[-1]["buckets"].append({
+                    "start": datetime.fromtimestamp(float(row['bucket']), tz=timezone.utc).isoformat(),
+                    "count": row['count'],
+                    "min": row['min'],
+                    "max": row['max'],
+                    "mean": row['mean'],
+                    "last": row['last']
+                })
+
+        return jsonify({
+            "status": {
+                "code": 200,
+                "message": "Success"
+            },
+            "data": {
+                "interval_seconds": width,
+                "series": series
+            }
+        }), 200
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Database error computing calibration series: %s", e)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": "Database error occurred",
+                "error": str(e)
+            }
+        }), 400
     except Exception as e:
-        log.error(f"Error retrieving calibrations: {str(e)}")
+        log.error("Error computing calibration series: %s", e)
         return jsonify({
             "status": {
                 "code": 500,
@@ -189,16 +594,84 @@ def get_calibrations():
         }), 500
 
 
+@calibration_routes.route('/internal-calibrations/export', methods=['GET'])
+def export_calibrations():
+    """Stream every calibration matching the listing filters as NDJSON, CSV or binary columns"""
+    export_format = request.args.get('format', EXPORT_NDJSON)
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({
+            "status": {"code": 400, "message": f"Invalid format, expected one of {', '.join(EXPORT_FORMATS)}"}
+        }), 400
+    mimetype, extension, encode = EXPORT_FORMATS[export_format]
+    filters = {name: request.args.get(name) for name in CALIBRATION_FILTERS}
+
+    log.info("Exporting calibrations as %s with filters: %s", export_format, filters)
+
+    try:
+        # Plain column rows: no ORM objects or to_dict() per row
+        statement = filter_calibrations(
+            select(Calibration.id, Calibration.calibration_type, Calibration.value,
+                   Calibration.username, Calibration.timestamp),
+            **filters
+        )
+    except ValueError:
+        return jsonify({
+            "status": {"code": 400, "message": "Invalid tag_at_time format"}
+        }), 400
+
+    # yield_per streams from a server-side cursor, EXPORT_BATCH_SIZE rows at a time
+    statement = statement.order_by(Calibration.timestamp.desc(), Calibration.id.desc()) \
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    try:
+        result = db.session.execute(statement)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Database error exporting calibrations: %s", e)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": "Database error occurred",
+                "error": str(e)
+            }
+        }), 400
+
+    exported = 0
+
+    def batches():
+        nonlocal exported
+        for rows in result.partitions():
+            exported += len(rows)
+            yield rows
+
+    def generate():
+        try:
+            yield from encode(batches())
+        except Exception as e:
+            # Headers are already sent; aborting the stream lets the client see the export is incomplete
+            log.error("Export failed after %s calibrations: %s", exported, e)
+            raise
+        finally:
+            result.close()
+        log.info("Exported %s calibrations as %s", exported, export_format)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=calibrations.{extension}"}
+    )
+
+
 @calibration_routes.route('/internal-calibration/<int:calibration_id>', methods=['GET'])
 def get_calibration_by_id(calibration_id):
     """Get a specific calibration by ID"""
     try:
-        log.info(f"Retrieving calibration with id: {calibration_id}")
+        log.info("Retrieving calibration with id: %s", calibration_id)
 
-        calibration = Calibration.query.get(calibration_id)
+        calibration = load_calibration(calibration_id)
 
         if calibration is None:
-            log.warning(f"Calibration not found: {calibration_id}")
+            log.warning("Calibration not found: %s", calibration_id)
             return jsonify({
                 "status": {
                     "code": 404,
@@ -211,11 +684,11 @@ def get_calibration_by_id(calibration_id):
                 "code": 200,
                 "message": "Success"
             },
-            "data": calibration.to_dict()
+            "data": calibration
         }), 200
 
     except Exception as e:
-        log.error(f"Error retrieving calibration {calibration_id}: {str(e)}")
+        log.error("Error retrieving calibration %s: %s", calibration_id, e)
         return jsonify({
             "status": {
                 "code": 500,
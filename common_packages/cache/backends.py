@@ -0,0 +1,92 @@
+"""
+backends store cache entries either in this process or in a shared Redis
+
+Both expose the same small interface: get, set, set_many, delete, counter and incr.
+"""
+
+import json
+import threading
+
+from common_packages.utils.ttl_cache import TTLCache
+
+MISSING = object()
+
+
+class LocalBackend:
+    """In-process LRU with per-entry expiry. Not shared between workers."""
+
+    shared = False
+
+    def __init__(self, maxsize, ttl):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._entries.get(key, MISSING)
+
+    def set(self, key, value, ttl=None):
+        self._entries.set(key, value)
+
+    def set_many(self, items, ttl=None):
+        for key, value in items.items():
+            self._entries.set(key, value)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._entries.delete(key)
+
+    def counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisBackend:
+    """Shared backend over any client with the redis-py get/set/delete/incr/pipeline API.
+
+    Values are stored as JSON, so cached values must be JSON-serialisable.
+    """
+
+    shared = True
+
+    def __init__(self, client, ttl, prefix='calibration-cache:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return MISSING if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=int(ttl or self.ttl))
+
+    def set_many(self, items, ttl=None):
+        # One round trip however many keys a bulk write touched
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipeline.set(self.prefix + key, json.dumps(value), ex=int(ttl or self.ttl))
+        pipeline.execute()
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def counter(self, key):
+        raw = self.client.get(self.prefix + key)
+        return int(raw) if raw is not None else 0
+
+    def incr(self, key):
+        return int(self.client.incr(self.prefix + key))
+
+    @classmethod
+    def from_url(cls, url, ttl):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("CACHE_BACKEND=redis requires the 'redis' package") from e
+        return cls(redis.Redis.from_url(url), ttl)
@@ -0,0 +1,178 @@
+"""
+cache provides named read-through caches with explicit invalidation and hit/miss stats
+
+The backend is chosen by ``CACHE_BACKEND``: ``local`` (default) keeps an LRU in
+each process, ``redis`` shares entries between workers and services through
+``CACHE_REDIS_URL``. Every cache name gets its own key namespace.
+"""
+
+import os
+import threading
+
+from common_packages.cache.backends import LocalBackend, RedisBackend, MISSING
+from common_packages.constants.constants import (
+    CACHE_BACKEND_LOCAL, CACHE_BACKEND_REDIS, DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL
+)
+from common_packages.logs.logging_config import setup_logger
+
+log = setup_logger(__file__)
+
+
+class Cache:
+    def __init__(self, name, backend, ttl):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self._generation_key = f'{name}:generation'
+        self._invalidation_key = f'{name}:invalidations'
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        """Whether every worker and service sees the same entries, and the same clear()"""
+        return self.backend.shared
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def _key(self, key, generation=None):
+        # Bumping the generation (see clear) orphans every older entry at once
+        if generation is None:
+            generation = self.backend.counter(self._generation_key)
+        return f'{self.name}:{generation}:{key}'
+
+    def _marker(self, key):
+        # Holds the number of the last invalidate() that covered ``key``
+        return f'{self.name}:invalidated:{key}'
+
+    def version(self, key):
+        """Mark the state of ``key`` before its value is read from the source.
+
+        Pass the result to set() so a value read before a clear() or an
+        invalidate(key) that ran in the meantime is never served: it lands in the
+        orphaned generation, or is not stored at all.
+        """
+        try:
+            return self.backend.counter(self._generation_key), self.backend.counter(self._invalidation_key)
+        except Exception as e:
+            log.warning("Cache '%s' read failed: %s", self.name, e)
+            self._count("errors")
+            return MISSING
+
+    def get(self, key, default=None):
+        try:
+            value = self.backend.get(self._key(key))
+        except Exception as e:
+            # A broken shared backend degrades to a miss rather than failing the request
+            log.warning("Cache '%s' read failed: %s", self.name, e)
+            self._count("errors")
+            value = MISSING
+        if value is MISSING:
+            self._count("misses")
+            return default
+        self._count("hits")
+        return value
+
+    def set(self, key, value, version=None):
+        if version is MISSING:
+            # The backend failed before the value was read; don't risk storing it
+            return
+        try:
+            if version is None:
+                self.backend.set(self._key(key), value, self.ttl)
+                return
+            generation, invalidations = version
+            entry = self._key(key, generation)
+            self.backend.set(entry, value, self.ttl)
+            # Checked after the write: an invalidate() that marks later also deletes later
+            invalidated = self.backend.get(self._marker(key))
+            if invalidated is not MISSING and invalidated > invalidations:
+                self.backend.delete(entry)
+        except Exception as e:
+            log.warning("Cache '%s' write failed: %s", self.name, e)
+            self._count("errors")
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader`` and caching its result on a miss.
+
+        ``None`` results are returned but not cached.
+        """
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            version = self.version(key)
+            value = loader()
+            if value is not None:
+                self.set(key, value, version=version)
+        return value
+
+    def invalidate(self, *keys):
+        try:
+            # Marked before the delete, so a load already in flight sees it when it stores
+            invalidation = self.backend.incr(self._invalidation_key)
+            self.backend.set_many({self._marker(key): invalidation for key in keys}, self.ttl)
+            self.backend.delete(*(self._key(key) for key in keys))
+            self._count("invalidations")
+        except Exception as e:
+            log.warning("Cache '%s' invalidation failed: %s", self.name, e)
+            self._count("errors")
+
+    def clear(self):
+        """Invalidate every entry in this cache"""
+        try:
+            self.backend.incr(self._generation_key)
+            self._count("invalidations")
+        except Exception as e:
+            log.warning("Cache '%s' clear failed: %s", self.name, e)
+            self._count("errors")
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats["backend"] = CACHE_BACKEND_REDIS if self.backend.shared else CACHE_BACKEND_LOCAL
+        return stats
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+_shared_backend = None
+
+
+def _build_backend(maxsize, ttl):
+    global _shared_backend
+    backend = os.getenv('CACHE_BACKEND', CACHE_BACKEND_LOCAL).lower()
+    if backend == CACHE_BACKEND_REDIS:
+        if _shared_backend is None:
+            _shared_backend = RedisBackend.from_url(
+                os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0'), ttl
+            )
+        return _shared_backend
+    if backend != CACHE_BACKEND_LOCAL:
+        raise ValueError(f"Unknown CACHE_BACKEND '{backend}'")
+    return LocalBackend(maxsize=maxsize, ttl=ttl)
+
+
+def get_cache(name, maxsize=None, ttl=None, backend=None):
+    """Return the process-wide cache called ``name``, creating it on first use.
+
+    ``maxsize`` and ``ttl`` default to ``CACHE_SIZE`` / ``CACHE_TTL``. Pass
+    ``backend`` to use a specific backend, e.g. a local stand-in for Redis.
+    """
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                maxsize = maxsize or int(os.getenv('CACHE_SIZE', DEFAULT_CACHE_SIZE))
+                ttl = ttl or float(os.getenv('CACHE_TTL', DEFAULT_CACHE_TTL))
+                cache = Cache(name, backend or _build_backend(maxsize, ttl), ttl)
+                _caches[name] = cache
+    return cache
+
+
+def cache_stats():
+    """Hit/miss counters for every cache in this process, keyed by cache name"""
+    return {name: cache.stats() for name, cache in sorted(_caches.items())}
@@ -0,0 +1,20 @@
+"""
+lookups wraps the hot read paths shared by the services in the read-through cache
+
+"""
+
+from common_packages.cache.cache import get_cache
+from common_packages.constants.constants import CALIBRATION_CACHE
+from common_packages.models.models import Calibration, db
+
+
+def load_calibration(calibration_id):
+    """Return ``Calibration.to_dict()`` for ``calibration_id``, or None if it doesn't exist.
+
+    Calibrations are immutable once created, so cached entries never go stale.
+    """
+    def load():
+        calibration = db.session.get(Calibration, calibration_id)
+        return calibration.to_dict() if calibration is not None else None
+
+    return get_cache(CALIBRATION_CACHE).get_or_load(calibration_id, load)
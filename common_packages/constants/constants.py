@@ -1,6 +1,99 @@
 CALIBRATION_SCHEMA: str = 'create_calibration.json'
 ADD_TAG_SCHEMA: str = 'add_or_delete_calibration_to_tag.json'
 FILTER_CALIBRATIONS_SCHEMA: str = 'filter_calibration.json'
+CALIBRATION_BATCH_SCHEMA: str = 'create_calibration_batch.json'
+BULK_TAG_SCHEMA: str = 'bulk_tag_calibrations.json'
+SNAPSHOT_SCHEMA: str = 'create_tag_snapshot.json'
+
+# Bulk ingestion modes: reject the whole batch on any invalid row, or insert the valid rows
+BATCH_MODE_ALL_OR_NOTHING: str = 'all_or_nothing'
+BATCH_MODE_PARTIAL: str = 'partial'
+MAX_BATCH_SIZE: int = 10000  # keep in sync with maxItems in the batch and bulk tag schemas
+
+# Aggregate statistics endpoint
+STATS_GROUP_KEYS = ('calibration_type', 'username')
+DEFAULT_STATS_PERCENTILES = (50.0, 90.0, 99.0)
+MAX_STATS_PERCENTILES: int = 10
+
+# Time-bucketed value series: interval suffix -> seconds, and bounds on the response size
+SERIES_INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+DEFAULT_SERIES_POINTS: int = 500
+MAX_SERIES_BUCKETS: int = 10000
+
+# Rows fetched per server-side cursor round trip, and encoded per chunk, by the streaming export
+EXPORT_BATCH_SIZE: int = 5000
+
+# Per-calibration outcomes reported by the bulk tagging endpoints
+TAG_OUTCOME_ADDED: str = 'added'
+TAG_OUTCOME_REACTIVATED: str = 'reactivated'
+TAG_OUTCOME_ALREADY_TAGGED: str = 'already_tagged'
+TAG_OUTCOME_REMOVED: str = 'removed'
+TAG_OUTCOME_NOT_TAGGED: str = 'not_tagged'
+TAG_OUTCOME_NOT_FOUND: str = 'not_found'
+
+# How the calibration listing computes pagination.total
+TOTAL_EXACT: str = 'exact'
+TOTAL_ESTIMATE: str = 'estimate'
+TOTAL_NONE: str = 'none'
+TOTAL_MODES = (TOTAL_EXACT, TOTAL_ESTIMATE, TOTAL_NONE)
+
+# Per-filter count cache used by total=estimate
+DEFAULT_COUNT_CACHE_TTL: float = 30.0
+# A per-process cache never sees the tag service's clears, so counts filtered by tag
+# are reused for this long at most unless the cache is shared
+DEFAULT_TAG_COUNT_CACHE_TTL: float = 5.0
+COUNT_CACHE_SIZE: int = 1024
+
+# Read-through cache for calibration and tag lookups
+CACHE_BACKEND_LOCAL: str = 'local'
+CACHE_BACKEND_REDIS: str = 'redis'
+DEFAULT_CACHE_SIZE: int = 10000
+DEFAULT_CACHE_TTL: float = 300.0
+# Tag membership changes far more often than calibrations, which never do
+DEFAULT_CALIBRATION_TAGS_CACHE_TTL: float = 30.0
+
+# Cache names shared by the services
+CALIBRATION_CACHE: str = 'calibration'                # calibration id -> Calibration.to_dict()
+CALIBRATION_TAGS_CACHE: str = 'calibration_tags'      # calibration id -> active tags response data
+CALIBRATION_COUNT_CACHE: str = 'calibration_counts'   # listing filter signature -> row count
+GATEWAY_RESPONSE_CACHE: str = 'gateway_responses'     # gateway GET path + query -> body and validators
+
+# Gateway response cache: entries are dropped by any successful gateway POST/DELETE, or expire
+DEFAULT_GATEWAY_CACHE_SIZE: int = 1000
+DEFAULT_GATEWAY_CACHE_TTL: float = 30.0
+
+# Downstream services reachable from the API gateway
+CALIBRATION_SERVICE: str = 'calibration'
+TAG_SERVICE: str = 'tag'
+
+# service name -> (base URL env var, default base URL)
+SERVICE_URLS = {
+    CALIBRATION_SERVICE: ('CALIBRATION_SERVICE_URL', 'http://calibration-service:5001'),
+    TAG_SERVICE: ('TAG_SERVICE_URL', 'http://tag-service:5002'),
+}
+
+# Connection pool and timeout defaults for gateway -> service calls
+DEFAULT_POOL_SIZE: int = 20
+DEFAULT_CONNECT_TIMEOUT: float = 2.0
+DEFAULT_READ_TIMEOUT: float = 30.0
+DEFAULT_FANOUT_WORKERS: int = 32          # threads shared by concurrent downstream fan-out
+DEFAULT_COMPOSITE_DEADLINE: float = 5.0   # seconds a composite gateway request may take overall
+MAX_COMPOSITE_IDS: int = 100
+
+# SQLAlchemy connection pool defaults, per process, overridable through the environment
+DEFAULT_DB_POOL_SIZE: int = 5              # connections kept open
+DEFAULT_DB_MAX_OVERFLOW: int = 10          # extra connections opened under load, closed when returned
+DEFAULT_DB_POOL_TIMEOUT: int = 10          # seconds a request waits for a free connection
+DEFAULT_DB_POOL_RECYCLE: int = 1800        # seconds before a connection is replaced
+DEFAULT_DB_STATEMENT_TIMEOUT: int = 0      # milliseconds a statement may run; 0 disables the limit
+
+# Pre-fork WSGI server (gunicorn) defaults, overridable through the environment
+DEFAULT_WEB_THREADS: int = 4               # request threads per worker process
+DEFAULT_WEB_TIMEOUT: int = 60              # seconds a silent worker may hang before it is killed
+DEFAULT_GRACEFUL_TIMEOUT: int = 30         # seconds in-flight requests get to finish on shutdown
+DEFAULT_KEEPALIVE: int = 5                 # seconds an idle keep-alive connection is held open
+DEFAULT_MAX_REQUESTS: int = 5000           # requests a worker serves before it is recycled
+DEFAULT_MAX_REQUESTS_JITTER: int = 500     # random spread so workers don't recycle together
 
 # Common calibration types (for reference/validation)
 CALIBRATION_TYPES = [
@@ -20,7 +113,9 @@ STATUS_CODES = {
     "CREATED": 201,
     "BAD_REQUEST": 400,
     "NOT_FOUND": 404,
-    "INTERNAL_ERROR": 500
+    "INTERNAL_ERROR": 500,
+    "BAD_GATEWAY": 502,
+    "GATEWAY_TIMEOUT": 504
 }
 
 STATUS_MESSAGES = {
@@ -28,5 +123,7 @@ STATUS_MESSAGES = {
     201: "Created successfully",
     400: "Bad request",
     404: "Not found",
-    500: "Internal server error"
+    500: "Internal server error",
+    502: "Bad gateway",
+    504: "Gateway timeout"
 }
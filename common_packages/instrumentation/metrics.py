@@ -0,0 +1,118 @@
+"""
+metrics records request, SQL and downstream-hop timings and serves them at /metrics
+
+instrument(app, service) covers every blueprint registered on ``app``: each
+request observes its latency by route and status, plus how many SQL statements
+it ran and how long they took (counted through SQLAlchemy cursor events).
+ServiceClient reports each gateway -> service hop through observe_downstream.
+A request's latency minus its DB and downstream time is what the handler spent
+on its own work, such as serialization.
+
+Under gunicorn, ``PROMETHEUS_MULTIPROC_DIR`` (set by gunicorn_conf) makes every
+worker write its samples there, and /metrics aggregates all of the workers.
+"""
+
+import os
+import time
+
+from flask import Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from common_packages.instrumentation.timing import (
+    REQUEST_ID_HEADER, SERVER_TIMING_HEADER, record_phase, server_timing_header, start_request
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Unmatched URLs share one route label so scanners can't blow up the series count
+UNMATCHED_ROUTE = 'unmatched'
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response (until headers for streamed bodies)',
+    ['service', 'method', 'route', 'status'], buckets=LATENCY_BUCKETS
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    'http_request_db_statements', 'SQL statements executed per request',
+    ['service', 'method', 'route'], buckets=STATEMENT_BUCKETS
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_db_seconds', 'Cumulative SQL execution time per request',
+    ['service', 'method', 'route'], buckets=LATENCY_BUCKETS
+)
+DOWNSTREAM_LATENCY = Histogram(
+    'downstream_request_duration_seconds', 'Gateway -> service call time until response headers',
+    ['target', 'method', 'status'], buckets=LATENCY_BUCKETS
+)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('statement_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _finish_statement(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['statement_started'].pop()
+    if has_request_context() and 'db_statements' in g:
+        g.db_statements += 1
+        g.db_seconds += elapsed
+
+
+@event.listens_for(Engine, 'handle_error')
+def _abandon_statement(exception_context):
+    started = exception_context.connection.info.get('statement_started') if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def observe_downstream(target, method, status, seconds):
+    """Record one downstream call; ``status`` is the HTTP status or the exception name"""
+    DOWNSTREAM_LATENCY.labels(target, method, status).observe(seconds)
+
+
+def render_metrics():
+    """Every metric in the Prometheus text exposition format"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def instrument(app, service):
+    """Time every request ``app`` serves and expose the results at ``GET /metrics``.
+
+    Responses also carry the request id and a Server-Timing breakdown (see timing).
+    """
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.db_statements = 0
+        g.db_seconds = 0.0
+        start_request()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+        REQUEST_LATENCY.labels(service, request.method, route, response.status_code).observe(elapsed)
+        REQUEST_DB_STATEMENTS.labels(service, request.method, route).observe(g.db_statements)
+        REQUEST_DB_TIME.labels(service, request.method, route).observe(g.db_seconds)
+
+        if g.db_statements:
+            record_phase('db', g.db_seconds)
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+        response.headers[SERVER_TIMING_HEADER] = server_timing_header(elapsed)
+        return response
+
+    app.add_url_rule('/metrics', 'metrics', render_metrics, methods=['GET'])
@@ -0,0 +1,91 @@
+"""
+timing carries the current request's id and Server-Timing phases
+
+Every service takes the caller's ``X-Request-ID`` (or makes one), tags its log
+lines with it, echoes it on the response and sends it on every downstream call.
+Handlers time their phases with ``phase(name)``. The phases, the request's SQL
+time as ``db`` and its overall ``total`` come back in a ``Server-Timing`` header.
+
+Each downstream call adds a phase named after its target, covering the whole
+hop. The target's own Server-Timing entries are added too, prefixed with its
+name. A gateway request therefore shows, e.g., ``calibration`` next to
+``calibration.count`` and ``calibration.total``. Durations are in milliseconds.
+"""
+
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+SERVER_TIMING_HEADER = 'Server-Timing'
+
+# Caller-supplied ids end up in logs and headers, so only plain tokens are kept
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+_DURATION = re.compile(r'^\s*dur\s*=\s*"?([0-9.]+)"?\s*$')
+
+# fan_out threads record hops into the same request concurrently
+_phases_lock = threading.Lock()
+
+
+def start_request():
+    """Adopt or create the request id and start collecting phases"""
+    incoming = request.headers.get(REQUEST_ID_HEADER, '')
+    g.request_id = incoming if _REQUEST_ID.match(incoming) else uuid.uuid4().hex
+    g.server_timing = {}
+
+
+def current_request_id():
+    """The id of the request being served, or None outside a request"""
+    if not has_request_context():
+        return None
+    return g.get('request_id')
+
+
+def record_phase(name, seconds):
+    """Add ``seconds`` to phase ``name`` of the current request (a no-op outside one)"""
+    if not has_request_context() or 'server_timing' not in g:
+        return
+    with _phases_lock:
+        g.server_timing[name] = g.server_timing.get(name, 0.0) + seconds
+
+
+@contextmanager
+def phase(name):
+    """Time the enclosed block as phase ``name``"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - started)
+
+
+def parse_server_timing(header):
+    """``[(name, seconds)]`` for every entry of a Server-Timing header that has a duration"""
+    entries = []
+    for entry in (header or '').split(','):
+        name, _, params = entry.strip().partition(';')
+        for param in params.split(';'):
+            match = _DURATION.match(param)
+            if name and match:
+                entries.append((name, float(match.group(1)) / 1000))
+                break
+    return entries
+
+
+def record_downstream(target, seconds, server_timing=None):
+    """Add a downstream hop and the phases ``target`` reported for it"""
+    record_phase(target, seconds)
+    for name, duration in parse_server_timing(server_timing):
+        record_phase(f'{target}.{name}', duration)
+
+
+def server_timing_header(total_seconds):
+    """The current request's phases, then ``total``, as a Server-Timing header value"""
+    with _phases_lock:
+        phases = list(g.get('server_timing', {}).items())
+    phases.append(('total', total_seconds))
+    return ', '.join(f'{name};dur={seconds * 1000:.1f}' for name, seconds in phases)
@@ -1,12 +1,181 @@
+"""
+logging_config gives every service one queue-based, structured logging pipeline
+
+setup_logger(__file__) returns the logger for the calling module's service. It
+is configured once, however many modules ask for it. Records go on an
+in-memory queue, and a background thread formats them and writes them to
+stderr, so request threads never format messages or wait on I/O. Log calls
+pass %-style arguments, so a message is only built when the writer thread
+formats a record that was kept.
+
+Configuration comes from the environment:
+- ``LOG_LEVEL`` (INFO).
+- ``LOG_FORMAT``: ``json`` (default, one object per line) or ``text``.
+- ``LOG_SAMPLE_RATE`` (1.0): the fraction of INFO and DEBUG records kept.
+- ``LOG_SAMPLE_RATES``: per-logger overrides, such as
+  ``api-service=0.1,calibration-service=0.5``.
+
+Sampling goes by request id, so each service keeps or drops all of a request's
+lines together. WARNING and above are always kept.
+"""
+
+import atexit
+import json
 import logging
 import os
+import queue
+import random
+import threading
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from common_packages.instrumentation.timing import current_request_id
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(request_id)s - %(message)s'
+
+_handler = None
+_listener = None
+_lock = threading.Lock()
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp each record with the id of the request being served ('-' outside one)"""
+
+    def filter(self, record):
+        record.request_id = current_request_id() or '-'
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep ``rate`` of the INFO and DEBUG records, chosen per request"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        if self.rate <= 0:
+            return False
+        request_id = current_request_id()
+        if request_id is None:
+            return random.random() < self.rate
+        return zlib.crc32(request_id.encode()) / 0x100000000 < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, 'request_id', '-'),
+            "pid": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    def prepare(self, record):
+        # QueueHandler would format here, on the caller's thread; the writer thread does it instead
+        return record
+
+
+def _writer():
+    handler = logging.StreamHandler()
+    if os.getenv('LOG_FORMAT', 'json').lower() == 'text':
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    else:
+        handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def _start_listener():
+    global _listener
+    _listener = QueueListener(_handler.queue, _writer())
+    _listener.start()
+
+
+def _queue_handler():
+    global _handler
+    with _lock:
+        if _handler is None:
+            _handler = _DeferredQueueHandler(queue.SimpleQueue())
+            _handler.addFilter(RequestIdFilter())
+            _start_listener()
+    return _handler
+
+
+def sample_rate(name):
+    """The sampling rate for logger ``name``, matched on its last path component
+
+    Malformed settings are skipped with a warning rather than stopping the
+    service from starting.
+    """
+    log = logging.getLogger(name)
+    rates = {}
+    for entry in filter(None, (entry.strip() for entry in os.getenv('LOG_SAMPLE_RATES', '').split(','))):
+        service, _, value = entry.rpartition('=')
+        try:
+            rate = float(value)
+        except ValueError:
+            rate = None
+        if not service.strip() or rate is None:
+            log.warning("Ignoring LOG_SAMPLE_RATES entry %r: expected service=rate", entry)
+            continue
+        rates[service.strip()] = rate
+    if os.path.basename(name) in rates:
+        return rates[os.path.basename(name)]
+    try:
+        return float(os.getenv('LOG_SAMPLE_RATE', 1.0))
+    except ValueError:
+        log.warning("Ignoring LOG_SAMPLE_RATE %r: not a number", os.getenv('LOG_SAMPLE_RATE'))
+        return 1.0
 
 
 def setup_logger(file):
     log = logging.getLogger(os.path.dirname(os.path.abspath(file)))
-    log.setLevel(logging.INFO)
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    handler.setFormatter(formatter)
-    log.addHandler(handler)
+    handler = _queue_handler()
+    with _lock:
+        # Every module of a service shares this logger; configure it only once
+        if handler not in log.handlers:
+            log.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+            # Handler first, so warnings about the sampling settings are written out
+            log.addHandler(handler)
+            log.addFilter(SamplingFilter(sample_rate(log.name)))
     return log
+
+
+def flush_logs():
+    """Write out every queued record and restart the writer thread"""
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _start_listener()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _reset_after_fork():
+    # The writer thread doesn't survive a fork: give the child its own queue and thread
+    global _lock
+    _lock = threading.Lock()
+    if _handler is not None:
+        _handler.queue = queue.SimpleQueue()
+        _start_listener()
+
+
+atexit.register(_stop_listener)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
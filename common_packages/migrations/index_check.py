@@ -0,0 +1,137 @@
+"""
+index_check EXPLAINs every documented calibration filter and checks which index serves it
+
+Sequential scans, hash joins and merge joins are disabled for the check, so
+tags are looked up through the join index. That alone proves little: without
+its filter index the planner still avoids a Seq Scan by walking the
+``(timestamp, id)`` index for the ORDER BY, or by scanning any index that covers
+the columns. So every filter case names the indexes expected to serve it, and
+the plan must search one of them with the filter columns in its Index Cond.
+Indexes left INVALID by a failed concurrent build are reported as well. Run it
+against a database with representative, ANALYZEd data: plans for empty tables
+say little about production.
+"""
+
+import json
+import re
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from common_packages.models.models import Calibration
+from common_packages.models.filters import filter_calibrations
+
+CHECKED_TABLES = ('calibrations', 'calibration_tags')
+
+USERNAME_INDEXES = ('ix_calibrations_username_timestamp_id', 'ix_calibrations_username_type_timestamp_id')
+
+# Filter combinations documented for GET /api/v1/calibrations, each with the index scans its plans need:
+# for every group, one of its (index, columns) pairs, with each column constrained by that scan's Index Cond
+FILTER_CASES = {
+    'no filters': ({}, []),
+    'username': ({'username': 'alice'}, [
+        [(index, ('username',)) for index in USERNAME_INDEXES],
+    ]),
+    'calibration_type': ({'calibration_type': 'offset'}, [
+        [('ix_calibrations_type_timestamp_id', ('calibration_type',))],
+    ]),
+    'username + calibration_type': ({'username': 'alice', 'calibration_type': 'offset'}, [
+        [('ix_calibrations_username_type_timestamp_id', ('username', 'calibration_type'))],
+    ]),
+    'date range': ({'start_date': '2025-01-01T00:00:00Z', 'end_date': '2025-12-31T23:59:59Z'}, [
+        [('ix_calibrations_timestamp_id', ('timestamp',))],
+    ]),
+    'username + date range': ({'username': 'alice', 'start_date': '2025-01-01T00:00:00Z'}, [
+        [(index, ('username', 'timestamp')) for index in USERNAME_INDEXES],
+    ]),
+    'calibration_type + date range': ({'calibration_type': 'offset', 'end_date': '2025-12-31T23:59:59Z'}, [
+        [('ix_calibrations_type_timestamp_id', ('calibration_type', 'timestamp'))],
+    ]),
+    'tag_name': ({'tag_name': 'production'}, [
+        [('ix_calibration_tags_active_tag_calibration', ('tag_id',))],
+    ]),
+    'tag_name + tag_at_time': ({'tag_name': 'production', 'tag_at_time': '2025-06-01T00:00:00Z'}, [
+        [('ix_calibration_tags_tag_valid_during', ('valid_during',)), ('ix_calibration_tags_tag_added', ('tag_id',))],
+    ]),
+    # Either side may drive the join, depending on how selective the user and the tag are
+    'username + calibration_type + tag_name': (
+        {'username': 'alice', 'calibration_type': 'offset', 'tag_name': 'production'}, [
+            [('ix_calibrations_username_type_timestamp_id', ('username', 'calibration_type')),
+             ('ix_calibration_tags_active_tag_calibration', ('tag_id',))],
+        ]
+    ),
+}
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _plan_nodes(child)
+
+
+def explain(connection, statement):
+    compiled = statement.compile(dialect=connection.dialect)
+    result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    plan = json.loads(result) if isinstance(result, str) else result
+    return plan[0]['Plan']
+
+
+def _constrains(condition, column):
+    # The column compared in the condition, e.g. ((username)::text = ...) or ("timestamp" >= ...),
+    # but not a cast such as '...'::timestamp with time zone
+    return re.search(rf'(?<![\w:])"?{column}"?\)?(::\w+)?\s*(=|<>|<=|>=|<|>|@>|&&|IS\b)', condition) is not None
+
+
+def scans(plan):
+    """Return ``(index -> Index Conds, tables read by sequential scan)`` for a plan"""
+    indexes = {}
+    seq_scans = set()
+    for node in _plan_nodes(plan):
+        if 'Index Name' in node:
+            indexes.setdefault(node['Index Name'], []).append(node.get('Index Cond') or '')
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in CHECKED_TABLES:
+            seq_scans.add(node['Relation Name'])
+    return indexes, seq_scans
+
+
+def problems(plan, expected):
+    """Why ``plan`` doesn't serve its filter case as ``expected``; empty when it does"""
+    indexes, seq_scans = scans(plan)
+    found = [f"seq scan on {table}" for table in sorted(seq_scans)]
+    for group in expected:
+        if not any(all(_constrains(condition, column) for column in columns)
+                   for index, columns in group for condition in indexes.get(index, [])):
+            found.append("no Index Cond " + " or ".join(
+                f"on {', '.join(columns)} via {index}" for index, columns in group))
+    return found
+
+
+def invalid_indexes(connection):
+    """Indexes on the checked tables left INVALID by a failed CREATE INDEX CONCURRENTLY"""
+    return connection.execute(text(
+        "SELECT index_class.relname FROM pg_index "
+        "JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid "
+        "JOIN pg_class table_class ON table_class.oid = pg_index.indrelid "
+        "WHERE NOT pg_index.indisvalid AND table_class.relname = ANY(:tables) "
+        "AND pg_table_is_visible(table_class.oid) ORDER BY 1"
+    ), {"tables": list(CHECKED_TABLES)}).scalars().all()
+
+
+def check_indexes(engine, page_size=20):
+    """Yield ``(case, indexes used, problems)`` for the page and count query of every filter case"""
+    with Session(engine) as session:
+        connection = session.connection()
+        for index in invalid_indexes(connection):
+            yield f"index {index}", set(), ["INVALID, rerun the migration that builds it"]
+
+        for setting in ('enable_seqscan', 'enable_hashjoin', 'enable_mergejoin'):
+            connection.execute(text(f"SET LOCAL {setting} = off"))
+        for case, (filters, expected) in FILTER_CASES.items():
+            query = filter_calibrations(session.query(Calibration), **filters)
+            page = query.order_by(Calibration.timestamp.desc(), Calibration.id.desc()).limit(page_size)
+            # Same shape as Query.count(), which the listing uses for totals
+            count = select(func.count()).select_from(query.subquery())
+            for kind, statement in (('page', page.statement), ('count', count)):
+                plan = explain(connection, statement)
+                yield f"{case} [{kind}]", set(scans(plan)[0]), problems(plan, expected)
+        session.rollback()
@@ -0,0 +1,40 @@
+"""Baseline schema: calibrations, tags and calibration_tags as first shipped"""
+
+TRANSACTIONAL = True
+
+UPGRADE = [
+    """
+    CREATE TABLE IF NOT EXISTS calibrations (
+        id BIGINT PRIMARY KEY,
+        calibration_type VARCHAR(100) NOT NULL,
+        value DOUBLE PRECISION NOT NULL,
+        username VARCHAR(100) NOT NULL,
+        timestamp TIMESTAMP WITH TIME ZONE NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tags (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(100) NOT NULL UNIQUE,
+        description TEXT,
+        created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS calibration_tags (
+        id SERIAL PRIMARY KEY,
+        calibration_id BIGINT NOT NULL REFERENCES calibrations (id),
+        tag_id INTEGER NOT NULL REFERENCES tags (id),
+        added_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        removed_at TIMESTAMP WITHOUT TIME ZONE,
+        added_by VARCHAR(100)
+    )
+    """,
+]
+
+DOWNGRADE = [
+    "DROP TABLE IF EXISTS calibration_tags",
+    "DROP TABLE IF EXISTS tags",
+    "DROP TABLE IF EXISTS calibrations",
+]
@@ -0,0 +1,33 @@
+"""Composite indexes for every calibration listing filter and the calibration_tags joins"""
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+TRANSACTIONAL = False
+
+UPGRADE = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calibrations_timestamp_id "
+    "ON calibrations (timestamp, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calibrations_username_timestamp_id "
+    "ON calibrations (username, timestamp, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calibrations_type_timestamp_id "
+    "ON calibrations (calibration_type, timestamp, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calibrations_username_type_timestamp_id "
+    "ON calibrations (username, calibration_type, timestamp, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calibration_tags_calibration_tag_removed "
+    "ON calibration_tags (calibration_id, tag_id, removed_at)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calibration_tags_active_tag_calibration "
+    "ON calibration_tags (tag_id, calibration_id) WHERE removed_at IS NULL",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calibration_tags_tag_added "
+    "ON calibration_tags (tag_id, added_at)",
+    "ANALYZE calibrations",
+    "ANALYZE calibration_tags",
+]
+
+DOWNGRADE = [
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_calibration_tags_tag_added",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_calibration_tags_active_tag_calibration",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_calibration_tags_calibration_tag_removed",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_calibrations_username_type_timestamp_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_calibrations_type_timestamp_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_calibrations_username_timestamp_id",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_calibrations_timestamp_id",
+]
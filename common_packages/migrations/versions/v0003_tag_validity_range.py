@@ -0,0 +1,22 @@
+"""Store each calibration_tags row's validity interval as a tsrange with a GiST index"""
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block; every
+# statement is idempotent so a failed run can simply be retried
+TRANSACTIONAL = False
+
+UPGRADE = [
+    # btree_gist lets the integer tag_id share a GiST index with the range
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    # Adding a STORED generated column rewrites calibration_tags under an ACCESS EXCLUSIVE
+    # lock: tag reads and writes wait until it finishes (see setup.md, Database Migration Commands)
+    "ALTER TABLE calibration_tags ADD COLUMN IF NOT EXISTS valid_during tsrange "
+    "GENERATED ALWAYS AS (tsrange(added_at, removed_at, '[)')) STORED",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calibration_tags_tag_valid_during "
+    "ON calibration_tags USING gist (tag_id, valid_during)",
+    "ANALYZE calibration_tags",
+]
+
+DOWNGRADE = [
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_calibration_tags_tag_valid_during",
+    "ALTER TABLE calibration_tags DROP COLUMN IF EXISTS valid_during",
+]
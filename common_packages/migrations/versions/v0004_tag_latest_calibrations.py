@@ -0,0 +1,31 @@
+"""Precompute the newest active calibration per (tag, calibration_type, username)"""
+
+TRANSACTIONAL = True
+
+UPGRADE = [
+    """
+    CREATE TABLE IF NOT EXISTS tag_latest_calibrations (
+        tag_id INTEGER NOT NULL REFERENCES tags (id),
+        calibration_type VARCHAR(100) NOT NULL,
+        username VARCHAR(100) NOT NULL,
+        calibration_id BIGINT NOT NULL REFERENCES calibrations (id),
+        timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        PRIMARY KEY (tag_id, calibration_type, username)
+    )
+    """,
+    # Backfill from current memberships; the tag service keeps it up to date from here on
+    """
+    INSERT INTO tag_latest_calibrations (tag_id, calibration_type, username, calibration_id, timestamp)
+    SELECT DISTINCT ON (ct.tag_id, c.calibration_type, c.username)
+           ct.tag_id, c.calibration_type, c.username, c.id, c.timestamp
+    FROM calibration_tags ct
+    JOIN calibrations c ON c.id = ct.calibration_id
+    WHERE ct.removed_at IS NULL
+    ORDER BY ct.tag_id, c.calibration_type, c.username, c.timestamp DESC, c.id DESC
+    ON CONFLICT DO NOTHING
+    """,
+]
+
+DOWNGRADE = [
+    "DROP TABLE IF EXISTS tag_latest_calibrations",
+]
@@ -0,0 +1,23 @@
+"""Immutable named tag snapshots, each stored as one row with a sorted id array"""
+
+TRANSACTIONAL = True
+
+UPGRADE = [
+    """
+    CREATE TABLE IF NOT EXISTS tag_snapshots (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(100) NOT NULL UNIQUE,
+        tag_id INTEGER NOT NULL REFERENCES tags (id),
+        tag_at_time TIMESTAMP WITHOUT TIME ZONE,
+        taken_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+        created_by VARCHAR(100),
+        calibration_count INTEGER NOT NULL,
+        calibration_ids BIGINT[] NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tag_snapshots_tag_taken ON tag_snapshots (tag_id, taken_at)",
+]
+
+DOWNGRADE = [
+    "DROP TABLE IF EXISTS tag_snapshots",
+]
@@ -0,0 +1,31 @@
+"""Allow at most one active calibration_tags row per (tag_id, calibration_id)"""
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block; every
+# statement is idempotent so a failed run can simply be retried
+TRANSACTIONAL = False
+
+UPGRADE = [
+    # Concurrent adds could insert the same active membership twice: keep the oldest row of each
+    """
+    DELETE FROM calibration_tags duplicate
+    USING calibration_tags kept
+    WHERE duplicate.removed_at IS NULL AND kept.removed_at IS NULL
+      AND duplicate.tag_id = kept.tag_id AND duplicate.calibration_id = kept.calibration_id
+      AND duplicate.id > kept.id
+    """,
+    # Build the unique index beside the old one, then swap names, so the tag filters are never unindexed.
+    # A duplicate added during the build fails it; rerunning deletes that duplicate and rebuilds.
+    "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_calibration_tags_active_tag_calibration_unique "
+    "ON calibration_tags (tag_id, calibration_id) WHERE removed_at IS NULL",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_calibration_tags_active_tag_calibration",
+    "ALTER INDEX IF EXISTS ix_calibration_tags_active_tag_calibration_unique "
+    "RENAME TO ix_calibration_tags_active_tag_calibration",
+]
+
+DOWNGRADE = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calibration_tags_active_tag_calibration_plain "
+    "ON calibration_tags (tag_id, calibration_id) WHERE removed_at IS NULL",
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_calibration_tags_active_tag_calibration",
+    "ALTER INDEX IF EXISTS ix_calibration_tags_active_tag_calibration_plain "
+    "RENAME TO ix_calibration_tags_active_tag_calibration",
+]
@@ -0,0 +1,73 @@
+from datetime import datetime
+from common_packages.models.models import Calibration, Tag, CalibrationTag, as_utc_naive
+from common_packages.logs.logging_config import setup_logger
+
+log = setup_logger(__file__)
+
+# Query parameters understood by filter_calibrations
+CALIBRATION_FILTERS = ('username', 'calibration_type', 'tag_name', 'tag_at_time', 'start_date', 'end_date')
+
+
+def parse_timestamp(value):
+    """Parse an ISO 8601 timestamp, accepting a trailing 'Z' for UTC"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def filter_calibrations(query, username=None, calibration_type=None, tag_name=None, tag_at_time=None,
+                        start_date=None, end_date=None):
+    """Apply the calibration listing filters to ``query``.
+
+    Malformed start/end dates are ignored with a warning. A malformed
+    ``tag_at_time`` raises ValueError because it changes which rows match.
+    """
+    if username:
+        query = query.filter(Calibration.username == username)
+
+    if calibration_type:
+        query = query.filter(Calibration.calibration_type == calibration_type.lower())
+
+    # Date range filtering
+    if start_date:
+        try:
+            query = query.filter(Calibration.timestamp >= parse_timestamp(start_date))
+        except ValueError:
+            log.warning("Invalid start_date format: %s", start_date)
+
+    if end_date:
+        try:
+            query = query.filter(Calibration.timestamp <= parse_timestamp(end_date))
+        except ValueError:
+            log.warning("Invalid end_date format: %s", end_date)
+
+    # Tag filtering with historical support (direct JOIN on Tag.name)
+    if tag_name:
+        if tag_at_time:
+            # HISTORICAL: What HAD this tag at specific time
+            try:
+                at_time = parse_timestamp(tag_at_time)
+            except ValueError:
+                raise ValueError(f"Invalid tag_at_time format: {tag_at_time}")
+
+            query = (
+                query
+                .join(CalibrationTag, Calibration.id == CalibrationTag.calibration_id)
+                .join(Tag, Tag.id == CalibrationTag.tag_id)
+                .filter(
+                    Tag.name == tag_name,
+                    # added_at <= at_time < removed_at, served by the GiST index on valid_during
+                    CalibrationTag.valid_during.contains(as_utc_naive(at_time))
+                )
+            )
+        else:
+            # CURRENT: What has this tag NOW
+            query = (
+                query
+                .join(CalibrationTag, Calibration.id == CalibrationTag.calibration_id)
+                .join(Tag, Tag.id == CalibrationTag.tag_id)
+                .filter(
+                    Tag.name == tag_name,
+                    CalibrationTag.removed_at.is_(None)
+                )
+            )
+
+    return query
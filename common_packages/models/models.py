@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Boolean, Column, ForeignKey, Text, String, BigInteger, DateTime, Float, Integer
+from sqlalchemy import Boolean, Column, Computed, ForeignKey, Index, Text, String, BigInteger, DateTime, Float, Integer, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, TSRANGE
 from datetime import datetime, timezone
 
 db = SQLAlchemy()
@@ -7,6 +8,15 @@ db = SQLAlchemy()
 
 class Calibration(db.Model):
     __tablename__ = 'calibrations'
+    # One composite index per filter combination supported by the listing, each
+    # ending in (timestamp, id) so the ORDER BY and keyset seek are index-ordered.
+    # Keep in sync with common_packages/migrations/versions.
+    __table_args__ = (
+        Index('ix_calibrations_timestamp_id', 'timestamp', 'id'),
+        Index('ix_calibrations_username_timestamp_id', 'username', 'timestamp', 'id'),
+        Index('ix_calibrations_type_timestamp_id', 'calibration_type', 'timestamp', 'id'),
+        Index('ix_calibrations_username_type_timestamp_id', 'username', 'calibration_type', 'timestamp', 'id'),
+    )
 
     id = Column(BigInteger, primary_key=True)
     calibration_type = Column(String(100), nullable=False)
@@ -56,6 +66,17 @@ class Tag(db.Model):
 
 class CalibrationTag(db.Model):
     __tablename__ = 'calibration_tags'
+    __table_args__ = (
+        # Relationship lookups for one calibration, active or removed
+        Index('ix_calibration_tags_calibration_tag_removed', 'calibration_id', 'tag_id', 'removed_at'),
+        # Current members of a tag; unique, so a calibration is active on a tag at most once
+        Index('ix_calibration_tags_active_tag_calibration', 'tag_id', 'calibration_id', unique=True,
+              postgresql_where=text('removed_at IS NULL'), sqlite_where=text('removed_at IS NULL')),
+        # Historical (tag_at_time) membership of a tag
+        Index('ix_calibration_tags_tag_added', 'tag_id', 'added_at'),
+        # Point-in-time and time-range membership: (tag_id, valid_during) needs btree_gist
+        Index('ix_calibration_tags_tag_valid_during', 'tag_id', 'valid_during', postgresql_using='gist'),
+    )
 
     id = Column(Integer, primary_key=True)
     calibration_id = Column(BigInteger, ForeignKey('calibrations.id'), nullable=False)
@@ -63,6 +84,8 @@ class CalibrationTag(db.Model):
     added_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     removed_at = Column(DateTime, nullable=True)
     added_by = Column(String(100), nullable=True)  # Track who added the relationship
+    # [added_at, removed_at) maintained by PostgreSQL; an open upper bound means still active
+    valid_during = Column(TSRANGE, Computed("tsrange(added_at, removed_at, '[)')", persisted=True))
 
 
     # Relationships
@@ -111,14 +134,77 @@ class CalibrationTag(db.Model):
     @classmethod
     def get_historical_for_tag(cls, tag_id, at_time):
         """Get relationships that were active for a tag at a specific time"""
-        from sqlalchemy import and_, or_
         return cls.query.filter(
-            and_(
-                cls.tag_id == tag_id,
-                cls.added_at <= at_time,
-                or_(
-                    cls.removed_at.is_(None),
-                    cls.removed_at > at_time
-                )
-            )
+            cls.tag_id == tag_id,
+            cls.valid_during.contains(as_utc_naive(at_time))
+        ).all()
+
+    @classmethod
+    def get_during_for_tag(cls, tag_id, start_time, end_time):
+        """Get relationships that were active for a tag at any point in [start_time, end_time)"""
+        return cls.query.filter(
+            cls.tag_id == tag_id,
+            cls.valid_during.overlaps(func.tsrange(as_utc_naive(start_time), as_utc_naive(end_time), '[)'))
         ).all()
+
+
+class TagLatestCalibration(db.Model):
+    """Newest active calibration per (tag, calibration_type, username).
+
+    Maintained by the tag service in the same transaction as every tag membership
+    change (see tag-service/latest_calibrations.py).
+    """
+    __tablename__ = 'tag_latest_calibrations'
+
+    tag_id = Column(Integer, ForeignKey('tags.id'), primary_key=True)
+    calibration_type = Column(String(100), primary_key=True)
+    username = Column(String(100), primary_key=True)
+    calibration_id = Column(BigInteger, ForeignKey('calibrations.id'), nullable=False)
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f'<TagLatestCalibration tag_id={self.tag_id} {self.calibration_type}/{self.username} ' \
+               f'-> {self.calibration_id}>'
+
+
+class TagSnapshot(db.Model):
+    """Immutable, named copy of a tag's membership: one row holding the sorted calibration ids"""
+    __tablename__ = 'tag_snapshots'
+    __table_args__ = (
+        Index('ix_tag_snapshots_tag_taken', 'tag_id', 'taken_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), unique=True, nullable=False)
+    tag_id = Column(Integer, ForeignKey('tags.id'), nullable=False)
+    tag_at_time = Column(DateTime, nullable=True)  # membership as of this instant; NULL means when taken
+    taken_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_by = Column(String(100), nullable=True)
+    calibration_count = Column(Integer, nullable=False)
+    calibration_ids = Column(ARRAY(BigInteger), nullable=False)  # ascending, no duplicates
+
+    tag = db.relationship('Tag')
+
+    def to_dict(self, include_ids=True):
+        snapshot = {
+            'id': self.id,
+            'name': self.name,
+            'tag_name': self.tag.name if self.tag else None,
+            'tag_at_time': self.tag_at_time.isoformat() if self.tag_at_time else None,
+            'taken_at': self.taken_at.isoformat() if self.taken_at else None,
+            'created_by': self.created_by,
+            'calibration_count': self.calibration_count
+        }
+        if include_ids:
+            snapshot['calibration_ids'] = self.calibration_ids
+        return snapshot
+
+    def __repr__(self):
+        return f'<TagSnapshot {self.name}: tag_id={self.tag_id} {self.calibration_count} calibrations>'
+
+
+def as_utc_naive(value):
+    """Convert a datetime to naive UTC, matching how calibration_tags stores its timestamps"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -0,0 +1,110 @@
+"""
+gunicorn_conf is the shared gunicorn configuration for the three services
+
+Each service's image runs, e.g.::
+
+    gunicorn --config python:common_packages.serving.gunicorn_conf \\
+        --chdir /app/calibration-service --bind 0.0.0.0:5001 calibration_app:app
+
+The app is imported once in the master (``GUNICORN_PRELOAD``), so migrations and
+cache warm-up run a single time, then forked into ``WEB_CONCURRENCY`` workers of
+``GUNICORN_THREADS`` threads each. Unless the caches are shared
+(``CACHE_BACKEND=redis``) a single worker is the default: a per-process cache
+is only invalidated in the worker that handled the write. The master closes its
+database connections before forking and every worker drops any pooled
+connection it inherited, so no socket is ever shared between processes. Each worker also takes its own
+Snowflake worker id, keeping generated ids unique inside a pod. Workers write
+their metrics to ``PROMETHEUS_MULTIPROC_DIR`` (a fresh temporary directory
+unless set) so /metrics reports all of them, whichever worker serves it.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+from common_packages.constants.constants import (
+    CACHE_BACKEND_LOCAL, DEFAULT_GRACEFUL_TIMEOUT, DEFAULT_KEEPALIVE, DEFAULT_MAX_REQUESTS,
+    DEFAULT_MAX_REQUESTS_JITTER, DEFAULT_WEB_THREADS, DEFAULT_WEB_TIMEOUT
+)
+from common_packages.models.models import db
+from common_packages.utils.id_generator import MAX_WORKER_ID, configure_id_generator
+
+# A reload (SIGHUP) starts a full set of new workers before the old ones exit,
+# so at most half of the Snowflake worker ids can be handed out at steady state
+MAX_WORKERS = (MAX_WORKER_ID + 1) // 2
+
+
+def _env(name, default, cast=int):
+    value = os.getenv(name)
+    if value is None or value == '':
+        return default
+    return cast(value)
+
+
+def _flag(name, default):
+    return _env(name, default, lambda value: value.lower() == 'true')
+
+
+shared_caches = os.getenv('CACHE_BACKEND', CACHE_BACKEND_LOCAL).lower() != CACHE_BACKEND_LOCAL
+workers = _env('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, MAX_WORKERS) if shared_caches else 1)
+if not 1 <= workers <= MAX_WORKERS:
+    raise ValueError(f"WEB_CONCURRENCY must be between 1 and {MAX_WORKERS}, got {workers}")
+
+threads = _env('GUNICORN_THREADS', DEFAULT_WEB_THREADS)
+worker_class = 'gthread' if threads > 1 else 'sync'
+preload_app = _flag('GUNICORN_PRELOAD', True)
+timeout = _env('GUNICORN_TIMEOUT', DEFAULT_WEB_TIMEOUT)
+graceful_timeout = _env('GUNICORN_GRACEFUL_TIMEOUT', DEFAULT_GRACEFUL_TIMEOUT)
+keepalive = _env('GUNICORN_KEEPALIVE', DEFAULT_KEEPALIVE)
+max_requests = _env('GUNICORN_MAX_REQUESTS', DEFAULT_MAX_REQUESTS)
+max_requests_jitter = _env('GUNICORN_MAX_REQUESTS_JITTER', DEFAULT_MAX_REQUESTS_JITTER)
+
+# Must be set before the app (and so prometheus_client) is imported
+metrics_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+if metrics_dir:
+    # A reused directory still holds the samples of an earlier master's workers
+    for name in os.listdir(metrics_dir):
+        if name.endswith('.db'):
+            os.remove(os.path.join(metrics_dir, name))
+else:
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='prometheus-')
+
+
+def _dispose_engines(app, close):
+    if 'sqlalchemy' not in app.extensions:
+        # The gateway keeps no database connections
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
+
+
+def when_ready(server):
+    """Warn if workers can't see each other's cache invalidations, and close the connections
+    the preloaded app opened (migrations, warm-up) before any fork"""
+    if server.cfg.workers > 1 and not shared_caches:
+        server.log.warning("%s workers with per-process caches: writes only invalidate the worker that "
+                           "handled them, others serve stale entries until they expire. "
+                           "Set CACHE_BACKEND=redis", server.cfg.workers)
+    if server.cfg.preload_app:
+        _dispose_engines(server.app.wsgi(), close=True)
+
+
+def pre_fork(server, worker):
+    """Give the new worker the lowest Snowflake worker id no live worker holds"""
+    taken = {getattr(live, 'snowflake_worker_id', None) for live in server.WORKERS.values()}
+    worker.snowflake_worker_id = next(slot for slot in range(MAX_WORKER_ID + 1) if slot not in taken)
+
+
+def post_fork(server, worker):
+    """Per-worker state: a fresh ID generator and no inherited pooled connections"""
+    configure_id_generator(worker_id=worker.snowflake_worker_id)
+    if server.cfg.preload_app:
+        # close=False: the sockets belong to the master, only forget them here
+        _dispose_engines(worker.app.wsgi(), close=False)
+    server.log.info("Worker %s using Snowflake worker id %s", worker.pid, worker.snowflake_worker_id)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,24 @@
+"""
+cursor encodes keyset pagination positions as opaque, URL-safe tokens
+
+"""
+
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(timestamp, calibration_id):
+    """Encode the ``(timestamp, id)`` of the last row on a page"""
+    payload = json.dumps({"t": timestamp.isoformat(), "id": calibration_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into ``(timestamp, id)``, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), int(payload["id"])
+    except (TypeError, KeyError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,174 @@
+"""
+export encodes calibration rows for the streaming export endpoint
+
+Encoders take an iterable of row batches, each a list of
+``(id, calibration_type, value, username, timestamp)`` tuples, and yield one
+encoded bytes chunk per batch so memory stays bounded by the batch size.
+
+The ``columnar`` format is a little-endian binary layout, every section 8-byte aligned:
+
+    stream  = magic b'CALCOL01', chunk*, end chunk (16 zero bytes)
+    chunk   = header, dictionary block, columns
+    header  = uint32 rows, uint32 new_types, uint32 new_usernames, uint32 dictionary_bytes
+    dictionary block = (uint16 length, utf-8 bytes) for each new calibration_type,
+                       then each new username, zero-padded to dictionary_bytes
+    columns = int64 id[rows], int64 timestamp_us[rows] (microseconds since the Unix epoch, UTC),
+              float64 value[rows], uint32 calibration_type[rows], uint32 username[rows]
+
+``calibration_type`` and ``username`` are codes into dictionaries that start empty
+and grow by the entries each chunk introduces, so a reader can map every column
+straight onto a typed array (e.g. ``numpy.frombuffer``) without copying.
+"""
+
+import csv
+import io
+import json
+import struct
+import sys
+from array import array
+from datetime import datetime, timezone
+
+EXPORT_NDJSON = 'ndjson'
+EXPORT_CSV = 'csv'
+EXPORT_COLUMNAR = 'columnar'
+
+COLUMNAR_MAGIC = b'CALCOL01'
+_CHUNK_HEADER = struct.Struct('<IIII')
+_LENGTH = struct.Struct('<H')
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Column order of the rows handed to the encoders
+EXPORT_COLUMNS = ('id', 'calibration_type', 'value', 'username', 'timestamp')
+
+
+def ndjson_chunks(batches):
+    """One JSON object per line, with the same fields as Calibration.to_dict"""
+    for rows in batches:
+        yield ''.join(
+            json.dumps({
+                'id': calibration_id,
+                'calibration_type': calibration_type,
+                'value': value,
+                'username': username,
+                'timestamp': timestamp.isoformat() if timestamp else None
+            }) + '\n'
+            for calibration_id, calibration_type, value, username, timestamp in rows
+        ).encode()
+
+
+def csv_chunks(batches):
+    """A header row followed by one CSV row per calibration"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(
+            (calibration_id, calibration_type, value, username, timestamp.isoformat() if timestamp else '')
+            for calibration_id, calibration_type, value, username, timestamp in rows
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # No rows at all: still send the header
+        yield buffer.getvalue().encode()
+
+
+def _typed(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+
+def _epoch_microseconds(timestamp):
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    delta = timestamp - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def columnar_chunks(batches):
+    """Typed, dictionary-encoded columns, one chunk per batch (layout in the module docstring)"""
+    yield COLUMNAR_MAGIC
+    type_codes = {}
+    username_codes = {}
+    for rows in batches:
+        if not rows:
+            continue
+        new_types = []
+        new_usernames = []
+        type_column = []
+        username_column = []
+        for _, calibration_type, _, username, _ in rows:
+            code = type_codes.get(calibration_type)
+            if code is None:
+                code = type_codes[calibration_type] = len(type_codes)
+                new_types.append(calibration_type)
+            type_column.append(code)
+            code = username_codes.get(username)
+            if code is None:
+                code = username_codes[username] = len(username_codes)
+                new_usernames.append(username)
+            username_column.append(code)
+
+        dictionary = b''.join(
+            _LENGTH.pack(len(encoded)) + encoded
+            for encoded in (entry.encode() for entry in new_types + new_usernames)
+        )
+        dictionary += b'\0' * (-len(dictionary) % 8)
+
+        yield b''.join((
+            _CHUNK_HEADER.pack(len(rows), len(new_types), len(new_usernames), len(dictionary)),
+            dictionary,
+            _typed('q', [row[0] for row in rows]),
+            _typed('q', [_epoch_microseconds(row[4]) for row in rows]),
+            _typed('d', [row[2] for row in rows]),
+            _typed('I', type_column),
+            _typed('I', username_column),
+        ))
+    yield _CHUNK_HEADER.pack(0, 0, 0, 0)
+
+
+def read_columnar(data):
+    """Decode a complete ``columnar`` export into one dict of columns per chunk.
+
+    Numeric columns are memoryviews over ``data`` (no copy) on little-endian hosts;
+    ``calibration_types`` and ``usernames`` are the dictionaries as of that chunk.
+    """
+    view = memoryview(data)
+    if bytes(view[:8]) != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar calibration export")
+    offset = 8
+    calibration_types = []
+    usernames = []
+    chunks = []
+    while True:
+        rows, new_types, new_usernames, dictionary_bytes = _CHUNK_HEADER.unpack_from(view, offset)
+        offset += _CHUNK_HEADER.size
+        if rows == 0:
+            return chunks
+
+        position = offset
+        for target, count in ((calibration_types, new_types), (usernames, new_usernames)):
+            for _ in range(count):
+                (length,) = _LENGTH.unpack_from(view, position)
+                position += _LENGTH.size
+                target.append(bytes(view[position:position + length]).decode())
+                position += length
+        offset += dictionary_bytes
+
+        columns = {"calibration_types": list(calibration_types), "usernames": list(usernames)}
+        for name, typecode, width in (('id', 'q', 8), ('timestamp_us', 'q', 8), ('value', 'd', 8),
+                                      ('calibration_type', 'I', 4), ('username', 'I', 4)):
+            columns[name] = view[offset:offset + rows * width].cast(typecode)
+            offset += rows * width
+        chunks.append(columns)
+
+
+# format -> (mimetype, file extension, encoder)
+EXPORT_FORMATS = {
+    EXPORT_NDJSON: ('application/x-ndjson', 'ndjson', ndjson_chunks),
+    EXPORT_CSV: ('text/csv', 'csv', csv_chunks),
+    EXPORT_COLUMNAR: ('application/octet-stream', 'calcol', columnar_chunks),
+}
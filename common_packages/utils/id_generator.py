@@ -1,13 +1,24 @@
+import os
+import threading
 import time
 import random
 
+WORKER_ID_BITS = 5
+DATACENTER_ID_BITS = 5
+SEQUENCE_BITS = 12
+
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+MAX_DATACENTER_ID = (1 << DATACENTER_ID_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
 
 class SnowflakeIdGenerator:
     def __init__(self, worker_id, datacenter_id):
         self.worker_id = worker_id
         self.datacenter_id = datacenter_id
-        self.sequence = random.randint(0, 4095)
+        self.sequence = random.randint(0, MAX_SEQUENCE)
         self.last_timestamp = -1
+        self._lock = threading.Lock()
 
     def _current_time(self):
         return int(round(time.time() * 1000))
@@ -18,20 +29,116 @@ class SnowflakeIdGenerator:
             timestamp = self._current_time()
         return timestamp
 
-    def generate(self):
+    def _reserve(self, count):
+        """Claim up to ``count`` consecutive sequence numbers in a single millisecond.
+
+        Returns ``(timestamp, first_sequence, reserved)``. Must be called with the lock held.
+        """
         timestamp = self._current_time()
 
         if timestamp < self.last_timestamp:
             raise Exception("Invalid system clock")
 
         if timestamp == self.last_timestamp:
-            self.sequence = (self.sequence + 1) & 4095
-            if self.sequence == 0:
+            start = self.sequence + 1
+            if start > MAX_SEQUENCE:
                 timestamp = self._wait_for_next_millisecond(self.last_timestamp)
+                start = 0
         else:
-            self.sequence = 0
+            start = 0
 
+        reserved = min(count, MAX_SEQUENCE + 1 - start)
+        self.sequence = start + reserved - 1
         self.last_timestamp = timestamp
+        return timestamp, start, reserved
+
+    def _compose(self, timestamp, sequence):
+        return ((timestamp & 0x1FFFFFFFFFF) << 22) | (self.datacenter_id << 17) | (self.worker_id << 12) | sequence
+
+    def generate(self):
+        with self._lock:
+            timestamp, sequence, _ = self._reserve(1)
+        return self._compose(timestamp, sequence)
+
+    def generate_many(self, n):
+        """Reserve ``n`` IDs in ascending order.
+
+        IDs are handed out in contiguous runs of up to 4096 per millisecond, so a
+        bulk insert of ``n`` rows costs ``ceil(n / 4096)`` clock reads at most.
+        """
+        ids = []
+        with self._lock:
+            while len(ids) < n:
+                timestamp, start, reserved = self._reserve(n - len(ids))
+                first_id = self._compose(timestamp, start)
+                ids.extend(range(first_id, first_id + reserved))
+        return ids
+
+
+def _int_env(name):
+    value = os.getenv(name)
+    if value is None or value == '':
+        return None
+    return int(value)
+
+
+def resolve_node_ids():
+    """Work out ``(worker_id, datacenter_id)`` for this process from configuration.
+
+    ``SNOWFLAKE_DATACENTER_ID`` falls back to ``POD_ORDINAL`` (e.g. a StatefulSet's
+    ``apps.kubernetes.io/pod-index`` label) and then to 0. ``SNOWFLAKE_WORKER_ID``
+    defaults to 0; prefork servers assign one per worker.
+    """
+    worker_id = _int_env('SNOWFLAKE_WORKER_ID')
+    datacenter_id = _int_env('SNOWFLAKE_DATACENTER_ID')
+    if datacenter_id is None:
+        datacenter_id = _int_env('POD_ORDINAL')
+    return worker_id or 0, datacenter_id or 0
+
+
+_generator = None
+_generator_lock = threading.Lock()
+
+
+def _build_generator(worker_id=None, datacenter_id=None):
+    default_worker_id, default_datacenter_id = resolve_node_ids()
+    worker_id = default_worker_id if worker_id is None else worker_id
+    datacenter_id = default_datacenter_id if datacenter_id is None else datacenter_id
+
+    if not 0 <= worker_id <= MAX_WORKER_ID:
+        raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}, got {worker_id}")
+    if not 0 <= datacenter_id <= MAX_DATACENTER_ID:
+        raise ValueError(f"datacenter_id must be between 0 and {MAX_DATACENTER_ID}, got {datacenter_id}")
+    return SnowflakeIdGenerator(worker_id=worker_id, datacenter_id=datacenter_id)
+
+
+def configure_id_generator(worker_id=None, datacenter_id=None):
+    """Replace the process-wide generator, e.g. with a worker slot assigned after fork"""
+    global _generator
+    generator = _build_generator(worker_id, datacenter_id)
+    with _generator_lock:
+        _generator = generator
+    return generator
+
+
+def get_id_generator():
+    """Return the generator shared by every thread in this process"""
+    global _generator
+    generator = _generator
+    if generator is None:
+        with _generator_lock:
+            if _generator is None:
+                _generator = _build_generator()
+            generator = _generator
+    return generator
+
+
+def _reset_after_fork():
+    # The child must not inherit the parent's sequence state or a held lock
+    global _generator, _generator_lock
+    _generator = None
+    _generator_lock = threading.Lock()
 
-        return ((timestamp & 0x1FFFFFFFFFF) << 22) | (self.datacenter_id << 17) | (self.worker_id << 12) | self.sequence
 
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
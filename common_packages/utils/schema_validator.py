@@ -1,18 +1,87 @@
 import json
 import os
+import threading
 import jsonschema
 
+from common_packages.instrumentation.timing import phase
 
-def validate_schema(to_validate, schema):
-    schema_file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'schemas', schema)
-    print("Schema", schema_file_path)
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'schemas')
+
+_validators = {}
+_validators_lock = threading.Lock()
+
+
+def load_schemas(schema_dir=SCHEMA_DIR):
+    """Load and compile every schema in ``schema_dir`` into the validator registry"""
+    with _validators_lock:
+        for file_name in sorted(os.listdir(schema_dir)):
+            if file_name.endswith('.json'):
+                _validators[file_name] = _compile(os.path.join(schema_dir, file_name))
+    return dict(_validators)
+
+
+def _compile(schema_file_path):
     with open(schema_file_path, 'r') as file:
         schema = json.load(file)
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def get_validator(schema):
+    """Return the compiled validator for a schema file name, loading the registry on first use"""
+    validator = _validators.get(schema)
+    if validator is None:
+        if not _validators:
+            load_schemas()
+        validator = _validators.get(schema)
+        if validator is None:
+            with _validators_lock:
+                validator = _validators.setdefault(schema, _compile(os.path.join(SCHEMA_DIR, schema)))
+    return validator
+
 
-    try:
-        # Validate the payload against the schema
-        jsonschema.validate(instance=to_validate, schema=schema)
-    except jsonschema.exceptions.ValidationError as err:
-        # If validation fails, return the error message
-        return False
-    return True
+def schema_errors(to_validate, schema):
+    """Validate a payload and return a list of ``{"field", "message"}`` errors (empty when valid)"""
+    validator = get_validator(schema)
+    with phase('validation'):
+        if validator.is_valid(to_validate):
+            return []
+        return _collect_errors(validator, to_validate)
+
+
+def _collect_errors(validator, to_validate):
+    errors = []
+    seen = set()
+    for err in sorted(validator.iter_errors(to_validate), key=lambda e: [str(p) for p in e.absolute_path]):
+        path = [str(p) for p in err.absolute_path]
+        if err.validator == 'required' and isinstance(err.instance, dict):
+            # jsonschema yields one error per missing property, all sharing the same validator_value
+            for name in err.validator_value:
+                field = '.'.join(path + [name])
+                if name not in err.instance and field not in seen:
+                    seen.add(field)
+                    errors.append({"field": field, "message": f"'{name}' is a required property"})
+            continue
+        errors.append({"field": '.'.join(path) or None, "message": err.message})
+    return errors
+
+
+def validate_many(items, schema):
+    """Validate a list of payloads against one schema.
+
+    Returns a dict mapping the index of every invalid item to its error list, so
+    an empty dict means the whole batch is valid.
+    """
+    validator = get_validator(schema)
+    is_valid = validator.is_valid
+    invalid = {}
+    with phase('validation'):
+        for index, item in enumerate(items):
+            if not is_valid(item):
+                invalid[index] = _collect_errors(validator, item)
+    return invalid
+
+
+def validate_schema(to_validate, schema):
+    return get_validator(schema).is_valid(to_validate)
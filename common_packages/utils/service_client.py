@@ -0,0 +1,222 @@
+"""
+service_client keeps one pooled, keep-alive HTTP session per downstream service
+
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Timeout
+
+from common_packages.constants.constants import (
+    SERVICE_URLS,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_FANOUT_WORKERS,
+)
+from common_packages.instrumentation.metrics import observe_downstream
+from common_packages.instrumentation.timing import (
+    REQUEST_ID_HEADER, SERVER_TIMING_HEADER, current_request_id, record_downstream
+)
+
+
+def _env(name, default, cast):
+    value = os.getenv(name)
+    if value is None or value == '':
+        return default
+    return cast(value)
+
+
+class ServiceClient:
+    """HTTP client for a single downstream service.
+
+    Connections are reused through a urllib3 pool of ``pool_size`` sockets. The
+    session is rebuilt lazily in a forked child so workers never share sockets
+    with their parent. Every call's latency is recorded under ``name``, and calls
+    made while serving a request forward its X-Request-ID.
+    """
+
+    def __init__(self, base_url, pool_size=DEFAULT_POOL_SIZE,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT, name=None):
+        self.base_url = base_url.rstrip('/')
+        self.name = name or self.base_url
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            with self._lock:
+                if self._session is None or self._pid != pid:
+                    self._session = self._build_session()
+                    self._pid = pid
+        return self._session
+
+    def _build_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def url(self, path):
+        return f'{self.base_url}{path}'
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        request_id = current_request_id()
+        if request_id is not None:
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), REQUEST_ID_HEADER: request_id}
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+        except requests.exceptions.RequestException as e:
+            elapsed = time.perf_counter() - started
+            observe_downstream(self.name, method, type(e).__name__, elapsed)
+            record_downstream(self.name, elapsed)
+            raise
+        elapsed = time.perf_counter() - started
+        observe_downstream(self.name, method, response.status_code, elapsed)
+        record_downstream(self.name, elapsed, response.headers.get(SERVER_TIMING_HEADER))
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
+            self._pid = None
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def build_client(service):
+    """Build a client for ``service`` from environment configuration.
+
+    ``<SERVICE>_SERVICE_POOL_SIZE`` / ``_CONNECT_TIMEOUT`` / ``_READ_TIMEOUT``
+    override the gateway-wide ``DOWNSTREAM_*`` settings for one service.
+    """
+    url_env, default_url = SERVICE_URLS[service]
+    prefix = url_env[:-len('_URL')]
+
+    def setting(name, default, cast):
+        return _env(f'{prefix}_{name}', _env(f'DOWNSTREAM_{name}', default, cast), cast)
+
+    return ServiceClient(
+        base_url=_env(url_env, default_url, str),
+        pool_size=setting('POOL_SIZE', DEFAULT_POOL_SIZE, int),
+        connect_timeout=setting('CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT, float),
+        read_timeout=setting('READ_TIMEOUT', DEFAULT_READ_TIMEOUT, float),
+        name=service,
+    )
+
+
+def get_client(service):
+    """Return the shared client for ``service``, creating it on first use"""
+    client = _clients.get(service)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(service)
+            if client is None:
+                client = build_client(service)
+                _clients[service] = client
+    return client
+
+
+def close_clients():
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """A fanned-out call was still running when the overall deadline passed"""
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # Built lazily and per process: threads don't survive a fork
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_env('DOWNSTREAM_FANOUT_WORKERS', DEFAULT_FANOUT_WORKERS, int),
+                    thread_name_prefix='fan-out'
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def _call_before(deadline, client, method, path, kwargs):
+    """Make one fanned-out call, with no more time than ``deadline`` leaves when it starts.
+
+    The time left is measured here rather than at submit, since a call may wait
+    in the executor's queue. ``total`` caps connecting plus waiting for the
+    response, so a call abandoned at the deadline gives back its thread and
+    connection by then too (only a body trickling in slower than one read
+    timeout per chunk could hold them longer).
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded(f"Deadline passed before calling {path}")
+    connect_timeout, read_timeout = client.timeout
+    timeout = Timeout(connect=min(connect_timeout, remaining), read=min(read_timeout, remaining), total=remaining)
+    return client.request(method, path, **dict(kwargs, timeout=timeout))
+
+
+def fan_out(calls, deadline):
+    """Issue downstream calls concurrently and wait for them until ``deadline``.
+
+    ``calls`` maps a key to ``(client, method, path, kwargs)`` and ``deadline`` is a
+    ``time.monotonic()`` value. Returns each key's response, or the exception its
+    call raised; calls still running at the deadline map to DeadlineExceeded, and
+    their own timeouts end them by the deadline as well.
+    """
+    executor = _get_executor()
+    futures = {}
+    for key, (client, method, path, kwargs) in calls.items():
+        # Each call runs in a copy of this context, so it sees the request being served
+        futures[executor.submit(contextvars.copy_context().run, _call_before, deadline, client, method, path,
+                                kwargs)] = key
+
+    done, _ = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+
+    results = {}
+    for future, key in futures.items():
+        if future in done:
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                results[key] = e
+        else:
+            future.cancel()
+            results[key] = DeadlineExceeded(f"Deadline exceeded calling {futures[future]}")
+    return results
@@ -0,0 +1,95 @@
+"""
+latest_calibrations maintains tag_latest_calibrations and answers "newest calibration per type" reads
+
+Every tag membership change calls record_added or record_removed inside the
+same transaction, so the precomputed rows commit (or roll back) with it. Each
+call is a fixed number of set-based statements, whatever the number of ids.
+"""
+
+from sqlalchemy import delete, func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from common_packages.models.models import Calibration, CalibrationTag, TagLatestCalibration, db, as_utc_naive
+
+# First key of pg_advisory_xact_lock(namespace, tag_id): serialises maintenance per tag
+LATEST_LOCK_NAMESPACE = 73592586
+
+_KEY_COLUMNS = ('tag_id', 'calibration_type', 'username', 'calibration_id', 'timestamp')
+
+
+def _lock(tag_id):
+    """Serialise maintenance of one tag until commit, so concurrent changes can't interleave"""
+    db.session.execute(select(func.pg_advisory_xact_lock(LATEST_LOCK_NAMESPACE, tag_id)))
+
+
+def _newest_per_key(statement):
+    return statement.distinct(Calibration.calibration_type, Calibration.username).order_by(
+        Calibration.calibration_type, Calibration.username, Calibration.timestamp.desc(), Calibration.id.desc()
+    )
+
+
+def record_added(tag_id, calibration_ids):
+    """Fold calibrations newly added to (or reactivated on) a tag into its latest rows"""
+    if not calibration_ids:
+        return
+    _lock(tag_id)
+    newest = _newest_per_key(select(
+        literal(tag_id), Calibration.calibration_type, Calibration.username, Calibration.id, Calibration.timestamp
+    ).where(Calibration.id.in_(calibration_ids)))
+
+    statement = insert(TagLatestCalibration).from_select(_KEY_COLUMNS, newest)
+    statement = statement.on_conflict_do_update(
+        index_elements=[TagLatestCalibration.tag_id, TagLatestCalibration.calibration_type,
+                        TagLatestCalibration.username],
+        set_={"calibration_id": statement.excluded.calibration_id, "timestamp": statement.excluded.timestamp},
+        # Only replace the current row if the incoming calibration is newer
+        where=tuple_(statement.excluded.timestamp, statement.excluded.calibration_id)
+        > tuple_(TagLatestCalibration.timestamp, TagLatestCalibration.calibration_id)
+    )
+    db.session.execute(statement)
+
+
+def record_removed(tag_id, calibration_ids):
+    """Recompute the latest rows that pointed at calibrations just removed from a tag"""
+    if not calibration_ids:
+        return
+    db.session.flush()
+    _lock(tag_id)
+    stale_keys = db.session.execute(
+        delete(TagLatestCalibration)
+        .where(TagLatestCalibration.tag_id == tag_id, TagLatestCalibration.calibration_id.in_(calibration_ids))
+        .returning(TagLatestCalibration.calibration_type, TagLatestCalibration.username)
+    ).all()
+    if not stale_keys:
+        return
+
+    # Newest remaining active member for each key that lost its latest calibration
+    newest = _newest_per_key(select(
+        literal(tag_id), Calibration.calibration_type, Calibration.username, Calibration.id, Calibration.timestamp
+    ).join(CalibrationTag, CalibrationTag.calibration_id == Calibration.id).where(
+        CalibrationTag.tag_id == tag_id,
+        CalibrationTag.removed_at.is_(None),
+        tuple_(Calibration.calibration_type, Calibration.username).in_([tuple(key) for key in stale_keys])
+    ))
+    db.session.execute(insert(TagLatestCalibration).from_select(_KEY_COLUMNS, newest))
+
+
+def latest_calibrations(tag_id, per_username=False, at_time=None):
+    """Newest calibration per calibration_type (and username) under a tag, now or at ``at_time``"""
+    keys = [Calibration.calibration_type] + ([Calibration.username] if per_username else [])
+
+    if at_time is not None:
+        # Historical: no precomputed rows, reduce the members valid at that instant
+        statement = select(Calibration).join(
+            CalibrationTag, CalibrationTag.calibration_id == Calibration.id
+        ).where(
+            CalibrationTag.tag_id == tag_id,
+            CalibrationTag.valid_during.contains(as_utc_naive(at_time))
+        )
+    else:
+        statement = select(Calibration).join(
+            TagLatestCalibration, TagLatestCalibration.calibration_id == Calibration.id
+        ).where(TagLatestCalibration.tag_id == tag_id)
+
+    statement = statement.distinct(*keys).order_by(*keys, Calibration.timestamp.desc(), Calibration.id.desc())
+    return db.session.execute(statement).scalars().all()
@@ -0,0 +1,217 @@
+from flask import request, jsonify, Blueprint
+from common_packages.models.models import CalibrationTag, TagSnapshot, db, as_utc_naive
+from common_packages.models.filters import parse_timestamp
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import func, literal, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg, insert
+from sqlalchemy.orm import defer
+from datetime import datetime
+from tag_registry import tag_registry
+from common_packages.logs.logging_config import setup_logger
+
+log = setup_logger(__file__)
+
+snapshot_routes = Blueprint('snapshot_routes', __name__)
+
+
+def _members(tag_id, at_time=None):
+    """Distinct ids of the calibrations in a tag, now or at ``at_time``"""
+    condition = CalibrationTag.valid_during.contains(as_utc_naive(at_time)) if at_time is not None \
+        else CalibrationTag.removed_at.is_(None)
+    return select(CalibrationTag.calibration_id).where(CalibrationTag.tag_id == tag_id, condition).distinct()
+
+
+def _not_found(message):
+    log.warning(message)
+    return jsonify({
+        "status": {
+            "code": 404,
+            "message": message
+        }
+    }), 404
+
+
+def _database_error(action, e):
+    db.session.rollback()
+    log.error("Database error %s: %s", action, e)
+    return jsonify({
+        "status": {
+            "code": 400,
+            "message": "Database error occurred",
+            "error": str(e)
+        }
+    }), 400
+
+
+def _internal_error(action, e):
+    db.session.rollback()
+    log.error("Error %s: %s", action, e)
+    return jsonify({
+        "status": {
+            "code": 500,
+            "message": "Internal server error",
+            "error": str(e)
+        }
+    }), 500
+
+
+@snapshot_routes.route('/internal-tags/<string:tag_name>/snapshots', methods=['POST'])
+def create_snapshot(tag_name):
+    """Freeze a tag's membership (current, or as of tag_at_time) into a named snapshot"""
+    data = request.get_json(silent=True) or {}
+    name = data.get('name')
+    if not isinstance(name, str) or not name:
+        return jsonify({
+            "status": {"code": 400, "message": "Expected a snapshot 'name'"}
+        }), 400
+    try:
+        at_time = parse_timestamp(data['tag_at_time']) if data.get('tag_at_time') else None
+    except (TypeError, ValueError):
+        return jsonify({
+            "status": {"code": 400, "message": "Invalid tag_at_time format"}
+        }), 400
+
+    log.info("Received request to snapshot tag '%s' as '%s' at %s", tag_name, name, at_time)
+
+    try:
+        tag_id = tag_registry.get_id(tag_name)
+        if tag_id is None:
+            return _not_found(f"Tag '{tag_name}' not found")
+
+        # The id array is built and stored by PostgreSQL in one statement
+        members = _members(tag_id, at_time).subquery()
+        statement = insert(TagSnapshot).from_select(
+            ['name', 'tag_id', 'tag_at_time', 'taken_at', 'created_by', 'calibration_count', 'calibration_ids'],
+            select(
+                literal(name),
+                literal(tag_id),
+                literal(as_utc_naive(at_time) if at_time else None, TagSnapshot.tag_at_time.type),
+                literal(datetime.utcnow()),
+                literal(data.get('created_by', 'system')),
+                func.count(),
+                func.coalesce(
+                    array_agg(aggregate_order_by(members.c.calibration_id, members.c.calibration_id)),
+                    text("'{}'::bigint[]")
+                )
+            ).select_from(members)
+        ).on_conflict_do_nothing(index_elements=[TagSnapshot.name]).returning(TagSnapshot.id)
+
+        snapshot_id = db.session.execute(statement).scalar()
+        if snapshot_id is None:
+            db.session.rollback()
+            log.warning("Snapshot already exists: %s", name)
+            return jsonify({
+                "status": {
+                    "code": 409,
+                    "message": f"Snapshot '{name}' already exists"
+                }
+            }), 409
+        db.session.commit()
+
+        snapshot = db.session.get(TagSnapshot, snapshot_id, options=[defer(TagSnapshot.calibration_ids)])
+        log.info("Created snapshot '%s' of tag '%s' with %s calibrations", name, tag_name, snapshot.calibration_count)
+
+        return jsonify({
+            "status": {
+                "code": 201,
+                "message": f"Snapshot '{name}' created"
+            },
+            "data": snapshot.to_dict(include_ids=False)
+        }), 201
+
+    except SQLAlchemyError as e:
+        return _database_error(f"creating snapshot '{name}' of tag '{tag_name}'", e)
+    except Exception as e:
+        return _internal_error(f"creating snapshot '{name}' of tag '{tag_name}'", e)
+
+
+@snapshot_routes.route('/internal-tags/<string:tag_name>/snapshots', methods=['GET'])
+def get_tag_snapshots(tag_name):
+    """List a tag's snapshots, newest first, without their id arrays"""
+    try:
+        tag_id = tag_registry.get_id(tag_name)
+        if tag_id is None:
+            return _not_found(f"Tag '{tag_name}' not found")
+
+        snapshots = TagSnapshot.query.options(defer(TagSnapshot.calibration_ids)) \
+            .filter(TagSnapshot.tag_id == tag_id) \
+            .order_by(TagSnapshot.taken_at.desc()).all()
+
+        return jsonify({
+            "status": {
+                "code": 200,
+                "message": "Success"
+            },
+            "data": {
+                "tag_name": tag_name,
+                "snapshots": [snapshot.to_dict(include_ids=False) for snapshot in snapshots]
+            }
+        }), 200
+
+    except SQLAlchemyError as e:
+        return _database_error(f"listing snapshots of tag '{tag_name}'", e)
+    except Exception as e:
+        return _internal_error(f"listing snapshots of tag '{tag_name}'", e)
+
+
+@snapshot_routes.route('/internal-snapshots/<string:name>', methods=['GET'])
+def get_snapshot(name):
+    """Fetch a snapshot: a single-row lookup, however much the tag has changed since"""
+    try:
+        snapshot = TagSnapshot.query.filter_by(name=name).first()
+        if snapshot is None:
+            return _not_found(f"Snapshot '{name}' not found")
+
+        return jsonify({
+            "status": {
+                "code": 200,
+                "message": "Success"
+            },
+            "data": snapshot.to_dict()
+        }), 200
+
+    except SQLAlchemyError as e:
+        return _database_error(f"getting snapshot '{name}'", e)
+    except Exception as e:
+        return _internal_error(f"getting snapshot '{name}'", e)
+
+
+@snapshot_routes.route('/internal-snapshots/<string:name>/diff', methods=['GET'])
+def diff_snapshot(name):
+    """Calibrations added and removed between a snapshot and another snapshot (or the tag now)"""
+    against = request.args.get('against')
+
+    try:
+        snapshot = TagSnapshot.query.filter_by(name=name).first()
+        if snapshot is None:
+            return _not_found(f"Snapshot '{name}' not found")
+
+        if against:
+            other = TagSnapshot.query.filter_by(name=against).first()
+            if other is None:
+                return _not_found(f"Snapshot '{against}' not found")
+            other_ids = other.calibration_ids
+        else:
+            other_ids = db.session.execute(_members(snapshot.tag_id)).scalars().all()
+
+        before = set(snapshot.calibration_ids)
+        after = set(other_ids)
+
+        return jsonify({
+            "status": {
+                "code": 200,
+                "message": "Success"
+            },
+            "data": {
+                "from": name,
+                "to": against,  # null means the tag's current membership
+                "added": sorted(after - before),
+                "removed": sorted(before - after),
+                "unchanged_count": len(before & after)
+            }
+        }), 200
+
+    except SQLAlchemyError as e:
+        return _database_error(f"diffing snapshot '{name}'", e)
+    except Exception as e:
+        return _internal_error(f"diffing snapshot '{name}'", e)
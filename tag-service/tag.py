@@ -1,33 +1,94 @@
 from flask import request, jsonify, Blueprint
 from common_packages.models.models import Calibration, Tag, CalibrationTag, db
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import and_
+from common_packages.models.database import pool_stats
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import and_, exists, select, update
+from sqlalchemy.dialects.postgresql import insert
+from collections import Counter
 from datetime import datetime
+import os
+from common_packages.cache.cache import get_cache, cache_stats
+from common_packages.cache.lookups import load_calibration
+from tag_registry import tag_registry
+from latest_calibrations import latest_calibrations, record_added, record_removed
+from common_packages.models.filters import parse_timestamp
+from common_packages.constants.constants import (
+    CALIBRATION_TAGS_CACHE, DEFAULT_CALIBRATION_TAGS_CACHE_TTL, CALIBRATION_COUNT_CACHE, MAX_BATCH_SIZE,
+    TAG_OUTCOME_ADDED, TAG_OUTCOME_REACTIVATED, TAG_OUTCOME_ALREADY_TAGGED,
+    TAG_OUTCOME_REMOVED, TAG_OUTCOME_NOT_TAGGED, TAG_OUTCOME_NOT_FOUND
+)
 from common_packages.logs.logging_config import setup_logger
 
 log = setup_logger(__file__)
 
 tag_routes = Blueprint('tag_routes', __name__)
 
+calibration_tags_cache = get_cache(
+    CALIBRATION_TAGS_CACHE,
+    ttl=float(os.getenv('CALIBRATION_TAGS_CACHE_TTL', DEFAULT_CALIBRATION_TAGS_CACHE_TTL))
+)
+# Owned by the calibration service; cleared here so tag filters don't serve stale totals.
+# Only a shared backend carries the clear over to it; otherwise those counts age out (see calibration.py)
+count_cache = get_cache(CALIBRATION_COUNT_CACHE)
+
+
+def invalidate_calibration_tags(*calibration_ids):
+    calibration_tags_cache.invalidate(*calibration_ids)
+    count_cache.clear()
+
 
 @tag_routes.route('/health', methods=['GET'])
 def health_check():
     return jsonify({"status": "healthy", "service": "tag-service"})
 
 
+@tag_routes.route('/internal-cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Hit/miss counters for this process's caches"""
+    return jsonify({
+        "status": {
+            "code": 200,
+            "message": "Success"
+        },
+        "data": cache_stats()
+    }), 200
+
+
+@tag_routes.route('/internal-db/stats', methods=['GET'])
+def get_db_stats():
+    """Connection pool usage for this process; server=true adds the database's connection count and limit"""
+    try:
+        stats = pool_stats(include_server=request.args.get('server', 'false').lower() == 'true')
+    except SQLAlchemyError as e:
+        log.error("Database error reading pool stats: %s", e)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": "Database error occurred",
+                "error": str(e)
+            }
+        }), 400
+    return jsonify({
+        "status": {
+            "code": 200,
+            "message": "Success"
+        },
+        "data": stats
+    }), 200
+
+
 @tag_routes.route('/internal-calibration/<int:calibration_id>/tags', methods=['POST'])
 def add_calibration_to_tag(calibration_id):
     """Add a calibration to a tag"""
     data = request.get_json()
     tag_name = data.get('tag_name')
 
-    log.info(f"Received request to add calibration {calibration_id} to tag '{tag_name}'")
+    log.info("Received request to add calibration %s to tag '%s'", calibration_id, tag_name)
 
     try:
-        # Check if calibration exists
-        calibration = Calibration.query.get(calibration_id)
-        if calibration is None:
-            log.warning(f"Calibration not found: {calibration_id}")
+        # Check if calibration exists (calibrations are immutable, so the cached copy is authoritative)
+        if load_calibration(calibration_id) is None:
+            log.warning("Calibration not found: %s", calibration_id)
             return jsonify({
                 "status": {
                     "code": 404,
@@ -35,58 +96,47 @@ def add_calibration_to_tag(calibration_id):
                 }
             }), 404
 
-        # Find or create the tag
-        tag = Tag.query.filter_by(name=tag_name).first()
-        if tag is None:
-            # Create new tag if it doesn't exist (tags are arbitrary strings)
-            tag = Tag(name=tag_name)
-            db.session.add(tag)
-            db.session.flush()  # Get the tag ID before committing
-            log.info(f"Created new tag: {tag_name}")
-
-        # Check if this calibration-tag relationship already exists and is active
-        existing_relationship = CalibrationTag.query.filter(
-            and_(
-                CalibrationTag.calibration_id == calibration_id,
-                CalibrationTag.tag_id == tag.id,
-                CalibrationTag.removed_at.is_(None)  # Only active relationships
-            )
-        ).first()
-
-        if existing_relationship:
-            log.info(f"Calibration {calibration_id} is already tagged with '{tag_name}'")
-            return jsonify({
-                "status": {
-                    "code": 200,
-                    "message": f"Calibration is already tagged with '{tag_name}'"
-                }
-            }), 200
+        # Resolve or create the tag (tags are arbitrary strings)
+        tag_id, created = tag_registry.get_or_create_id(tag_name)
+        if created:
+            log.info("Created new tag: %s", tag_name)
 
-        # Check if there's a previously removed relationship that can be reactivated
-        removed_relationship = CalibrationTag.query.filter(
+        # One lookup for the relationship: the active row sorts first, then any removed one
+        relationship = CalibrationTag.query.filter(
             and_(
                 CalibrationTag.calibration_id == calibration_id,
-                CalibrationTag.tag_id == tag.id,
-                CalibrationTag.removed_at.is_not(None)  # Previously removed
-            )
-        ).first()
-
-        if removed_relationship:
-            # Reactivate the relationship
-            removed_relationship.reactivate()
-            removed_relationship.added_by = data.get('added_by', 'system')
-            log.info(f"Reactivated calibration {calibration_id} tag relationship with '{tag_name}'")
-        else:
-            # Create new calibration-tag relationship
-            calibration_tag = CalibrationTag(
-                calibration_id=calibration_id,
-                tag_id=tag.id,
-                added_by=data.get('added_by', 'system')
+                CalibrationTag.tag_id == tag_id
             )
-            db.session.add(calibration_tag)
-            log.info(f"Created new calibration-tag relationship: {calibration_id} -> {tag_name}")
-
+        ).order_by(CalibrationTag.removed_at.desc().nulls_first()).first()
+
+        if relationship is not None and relationship.removed_at is None:
+            return _already_tagged(calibration_id, tag_name)
+
+        try:
+            # A savepoint, so losing the race below keeps a tag this request created
+            with db.session.begin_nested():
+                if relationship is not None:
+                    # Reactivate the previously removed relationship
+                    relationship.reactivate()
+                    relationship.added_by = data.get('added_by', 'system')
+                    log.info("Reactivated calibration %s tag relationship with '%s'", calibration_id, tag_name)
+                else:
+                    # Create new calibration-tag relationship
+                    calibration_tag = CalibrationTag(
+                        calibration_id=calibration_id,
+                        tag_id=tag_id,
+                        added_by=data.get('added_by', 'system')
+                    )
+                    db.session.add(calibration_tag)
+                    log.info("Created new calibration-tag relationship: %s -> %s", calibration_id, tag_name)
+        except IntegrityError:
+            # A concurrent request made the pair active first; the unique index on active rows refused this one
+            db.session.commit()
+            return _already_tagged(calibration_id, tag_name)
+
+        record_added(tag_id, [calibration_id])
         db.session.commit()
+        invalidate_calibration_tags(calibration_id)
 
         return jsonify({
             "status": {
@@ -96,13 +146,13 @@ def add_calibration_to_tag(calibration_id):
             "data": {
                 "calibration_id": calibration_id,
                 "tag_name": tag_name,
-                "tag_id": tag.id
+                "tag_id": tag_id
             }
         }), 201
 
     except SQLAlchemyError as e:
         db.session.rollback()
-        log.error(f"Database error adding calibration {calibration_id} to tag '{tag_name}': {str(e)}")
+        log.error("Database error adding calibration %s to tag '%s': %s", calibration_id, tag_name, e)
         return jsonify({
             "status": {
                 "code": 400,
@@ -112,7 +162,7 @@ def add_calibration_to_tag(calibration_id):
         }), 400
     except Exception as e:
         db.session.rollback()
-        log.error(f"Error adding calibration {calibration_id} to tag '{tag_name}': {str(e)}")
+        log.error("Error adding calibration %s to tag '%s': %s", calibration_id, tag_name, e)
         return jsonify({
             "status": {
                 "code": 500,
@@ -122,16 +172,25 @@ def add_calibration_to_tag(calibration_id):
         }), 500
 
 
+def _already_tagged(calibration_id, tag_name):
+    log.info("Calibration %s is already tagged with '%s'", calibration_id, tag_name)
+    return jsonify({
+        "status": {
+            "code": 200,
+            "message": f"Calibration is already tagged with '{tag_name}'"
+        }
+    }), 200
+
+
 @tag_routes.route('/internal-calibration/<int:calibration_id>/tags/<string:tag_name>', methods=['DELETE'])
 def remove_calibration_from_tag(calibration_id, tag_name):
     """Remove a calibration from a tag (soft delete)"""
-    log.info(f"Received request to remove calibration {calibration_id} from tag '{tag_name}'")
+    log.info("Received request to remove calibration %s from tag '%s'", calibration_id, tag_name)
 
     try:
         # Check if calibration exists
-        calibration = Calibration.query.get(calibration_id)
-        if calibration is None:
-            log.warning(f"Calibration not found: {calibration_id}")
+        if load_calibration(calibration_id) is None:
+            log.warning("Calibration not found: %s", calibration_id)
             return jsonify({
                 "status": {
                     "code": 404,
@@ -140,9 +199,9 @@ def remove_calibration_from_tag(calibration_id, tag_name):
             }), 404
 
         # Find the tag
-        tag = Tag.query.filter_by(name=tag_name).first()
-        if tag is None:
-            log.warning(f"Tag not found: {tag_name}")
+        tag_id = tag_registry.get_id(tag_name)
+        if tag_id is None:
+            log.warning("Tag not found: %s", tag_name)
             return jsonify({
                 "status": {
                     "code": 404,
@@ -154,14 +213,14 @@ def remove_calibration_from_tag(calibration_id, tag_name):
         calibration_tag = CalibrationTag.query.filter(
             and_(
                 CalibrationTag.calibration_id == calibration_id,
-                CalibrationTag.tag_id == tag.id,
+                CalibrationTag.tag_id == tag_id,
                 CalibrationTag.removed_at.is_(None)  # Only active relationships
             )
         ).first()
 
         if calibration_tag is None:
             # Calibration is not currently tagged with this tag - but return success (idempotent)
-            log.info(f"Calibration {calibration_id} is not tagged with '{tag_name}' (idempotent operation)")
+            log.info("Calibration %s is not tagged with '%s' (idempotent operation)", calibration_id, tag_name)
             return jsonify({
                 "status": {
                     "code": 200,
@@ -171,9 +230,11 @@ def remove_calibration_from_tag(calibration_id, tag_name):
 
         # Soft delete the relationship
         calibration_tag.soft_delete()
+        record_removed(tag_id, [calibration_id])
         db.session.commit()
+        invalidate_calibration_tags(calibration_id)
 
-        log.info(f"Successfully removed calibration {calibration_id} from tag '{tag_name}'")
+        log.info("Successfully removed calibration %s from tag '%s'", calibration_id, tag_name)
 
         return jsonify({
             "status": {
@@ -189,7 +250,7 @@ def remove_calibration_from_tag(calibration_id, tag_name):
 
     except SQLAlchemyError as e:
         db.session.rollback()
-        log.error(f"Database error removing calibration {calibration_id} from tag '{tag_name}': {str(e)}")
+        log.error("Database error removing calibration %s from tag '%s': %s", calibration_id, tag_name, e)
         return jsonify({
             "status": {
                 "code": 400,
@@ -199,7 +260,7 @@ def remove_calibration_from_tag(calibration_id, tag_name):
         }), 400
     except Exception as e:
         db.session.rollback()
-        log.error(f"Error removing calibration {calibration_id} from tag '{tag_name}': {str(e)}")
+        log.error("Error removing calibration %s from tag '%s': %s", calibration_id, tag_name, e)
         return jsonify({
             "status": {
                 "code": 500,
@@ -209,47 +270,270 @@ def remove_calibration_from_tag(calibration_id, tag_name):
         }), 500
 
 
-@tag_routes.route('/internal-calibration/<int:calibration_id>/tags', methods=['GET'])
-def get_calibration_tags(calibration_id):
-    """Get all tags currently associated with a calibration"""
-    log.info(f"Received request to get tags for calibration {calibration_id}")
+def _requested_ids(data):
+    """De-duplicated calibration ids from a bulk request body, in request order"""
+    calibration_ids = data.get('calibration_ids') if isinstance(data, dict) else None
+    if not isinstance(calibration_ids, list) or not 0 < len(calibration_ids) <= MAX_BATCH_SIZE \
+            or not all(isinstance(calibration_id, int) for calibration_id in calibration_ids):
+        return None
+    return list(dict.fromkeys(calibration_ids))
+
+
+def _existing_calibration_ids(calibration_ids):
+    rows = db.session.execute(select(Calibration.id).where(Calibration.id.in_(calibration_ids)))
+    return {row[0] for row in rows}
+
+
+def _bulk_response(message, tag_name, tag_id, outcomes):
+    return jsonify({
+        "status": {
+            "code": 200,
+            "message": message
+        },
+        "data": {
+            "tag_name": tag_name,
+            "tag_id": tag_id,
+            "summary": dict(Counter(outcomes.values())),
+            "results": [
+                {"calibration_id": calibration_id, "outcome": outcome}
+                for calibration_id, outcome in outcomes.items()
+            ]
+        }
+    }), 200
+
+
+def _invalid_bulk_request():
+    return jsonify({
+        "status": {
+            "code": 400,
+            "message": f"Expected 'calibration_ids' with 1 to {MAX_BATCH_SIZE} integer ids"
+        }
+    }), 400
+
+
+@tag_routes.route('/internal-tags/<string:tag_name>/calibrations', methods=['POST'])
+def add_calibrations_to_tag(tag_name):
+    """Add many calibrations to a tag with a fixed number of statements"""
+    data = request.get_json(silent=True)
+    calibration_ids = _requested_ids(data)
+    if calibration_ids is None:
+        return _invalid_bulk_request()
+    added_by = data.get('added_by', 'system')
+
+    log.info("Received request to add %s calibrations to tag '%s'", len(calibration_ids), tag_name)
 
     try:
-        # Check if calibration exists
-        calibration = Calibration.query.get(calibration_id)
-        if calibration is None:
-            log.warning(f"Calibration not found: {calibration_id}")
+        existing = _existing_calibration_ids(calibration_ids)
+        tag_id, created = tag_registry.get_or_create_id(tag_name)
+        if created:
+            log.info("Created new tag: %s", tag_name)
+
+        # Current relationship state for every requested calibration, in one query
+        active = set()
+        removed = {}
+        relationships = db.session.execute(
+            select(CalibrationTag.id, CalibrationTag.calibration_id, CalibrationTag.removed_at)
+            .where(CalibrationTag.tag_id == tag_id, CalibrationTag.calibration_id.in_(existing))
+            .order_by(CalibrationTag.removed_at.desc())
+        )
+        for relationship_id, calibration_id, removed_at in relationships:
+            if removed_at is None:
+                active.add(calibration_id)
+            else:
+                # Same row the single-calibration route would reactivate: the latest removal
+                removed.setdefault(calibration_id, relationship_id)
+
+        outcomes = {}
+        reactivate = []
+        new_rows = []
+        now = datetime.utcnow()
+        for calibration_id in calibration_ids:
+            if calibration_id not in existing:
+                outcomes[calibration_id] = TAG_OUTCOME_NOT_FOUND
+            elif calibration_id in active:
+                outcomes[calibration_id] = TAG_OUTCOME_ALREADY_TAGGED
+            elif calibration_id in removed:
+                outcomes[calibration_id] = TAG_OUTCOME_REACTIVATED
+                reactivate.append(removed[calibration_id])
+            else:
+                outcomes[calibration_id] = TAG_OUTCOME_ADDED
+                new_rows.append({
+                    "calibration_id": calibration_id,
+                    "tag_id": tag_id,
+                    "added_at": now,
+                    "added_by": added_by
+                })
+
+        # The checks above can race with another request for the same calibrations. At most one
+        # active row per (tag, calibration) is enforced by a unique index, so rows a concurrent
+        # request got to first are skipped here and reported as already tagged.
+        table = CalibrationTag.__table__
+        done = set()
+        if reactivate:
+            current = table.alias('current')
+            done.update(db.session.execute(
+                update(table)
+                .where(table.c.id.in_(reactivate), ~exists().where(
+                    current.c.tag_id == table.c.tag_id,
+                    current.c.calibration_id == table.c.calibration_id,
+                    current.c.removed_at.is_(None)
+                ))
+                .values(removed_at=None, added_by=added_by)
+                .returning(table.c.calibration_id)
+            ).scalars())
+        if new_rows:
+            done.update(db.session.execute(
+                insert(table)
+                .on_conflict_do_nothing(index_elements=[table.c.tag_id, table.c.calibration_id],
+                                        index_where=table.c.removed_at.is_(None))
+                .returning(table.c.calibration_id),
+                new_rows
+            ).scalars())
+        for calibration_id, outcome in outcomes.items():
+            if outcome in (TAG_OUTCOME_ADDED, TAG_OUTCOME_REACTIVATED) and calibration_id not in done:
+                outcomes[calibration_id] = TAG_OUTCOME_ALREADY_TAGGED
+
+        changed = [calibration_id for calibration_id, outcome in outcomes.items()
+                   if outcome in (TAG_OUTCOME_ADDED, TAG_OUTCOME_REACTIVATED)]
+        record_added(tag_id, changed)
+        db.session.commit()
+
+        if changed:
+            invalidate_calibration_tags(*changed)
+
+        log.info("Tagged %s of %s calibrations with '%s'", len(changed), len(calibration_ids), tag_name)
+        return _bulk_response(f"Tagged {len(changed)} of {len(calibration_ids)} calibrations with '{tag_name}'",
+                              tag_name, tag_id, outcomes)
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Database error adding calibrations to tag '%s': %s", tag_name, e)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": "Database error occurred",
+                "error": str(e)
+            }
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        log.error("Error adding calibrations to tag '%s': %s", tag_name, e)
+        return jsonify({
+            "status": {
+                "code": 500,
+                "message": "Internal server error",
+                "error": str(e)
+            }
+        }), 500
+
+
+@tag_routes.route('/internal-tags/<string:tag_name>/calibrations', methods=['DELETE'])
+def remove_calibrations_from_tag(tag_name):
+    """Remove many calibrations from a tag (soft delete) with a fixed number of statements"""
+    data = request.get_json(silent=True)
+    calibration_ids = _requested_ids(data)
+    if calibration_ids is None:
+        return _invalid_bulk_request()
+
+    log.info("Received request to remove %s calibrations from tag '%s'", len(calibration_ids), tag_name)
+
+    try:
+        tag_id = tag_registry.get_id(tag_name)
+        if tag_id is None:
+            log.warning("Tag not found: %s", tag_name)
             return jsonify({
                 "status": {
                     "code": 404,
-                    "message": "Calibration not found"
+                    "message": f"Tag '{tag_name}' not found"
                 }
             }), 404
 
-        # Query for all active tags associated with this calibration
-        active_tags_query = db.session.query(Tag, CalibrationTag).\
-            join(CalibrationTag, Tag.id == CalibrationTag.tag_id).\
-            filter(
-                and_(
-                    CalibrationTag.calibration_id == calibration_id,
-                    CalibrationTag.removed_at.is_(None)  # Only active relationships
-                )
-            ).\
-            order_by(CalibrationTag.added_at.desc())
-
-        # Build response data
-        tags_data = []
-        for tag, calibration_tag in active_tags_query.all():
-            tag_info = {
-                "tag_id": tag.id,
-                "tag_name": tag.name,
-                "description": tag.description,
-                "added_at": calibration_tag.added_at.isoformat() if calibration_tag.added_at else None,
-                "added_by": calibration_tag.added_by
+        existing = _existing_calibration_ids(calibration_ids)
+
+        # Soft delete every active relationship at once
+        removed = db.session.execute(
+            update(CalibrationTag.__table__)
+            .where(
+                CalibrationTag.__table__.c.tag_id == tag_id,
+                CalibrationTag.__table__.c.calibration_id.in_(existing),
+                CalibrationTag.__table__.c.removed_at.is_(None)
+            )
+            .values(removed_at=datetime.utcnow())
+            .returning(CalibrationTag.__table__.c.calibration_id)
+        ).scalars().all()
+        record_removed(tag_id, removed)
+        db.session.commit()
+
+        removed = set(removed)
+        if removed:
+            invalidate_calibration_tags(*removed)
+
+        outcomes = {}
+        for calibration_id in calibration_ids:
+            if calibration_id not in existing:
+                outcomes[calibration_id] = TAG_OUTCOME_NOT_FOUND
+            elif calibration_id in removed:
+                outcomes[calibration_id] = TAG_OUTCOME_REMOVED
+            else:
+                outcomes[calibration_id] = TAG_OUTCOME_NOT_TAGGED
+
+        log.info("Removed %s of %s calibrations from tag '%s'", len(removed), len(calibration_ids), tag_name)
+        return _bulk_response(f"Removed {len(removed)} of {len(calibration_ids)} calibrations from tag '{tag_name}'",
+                              tag_name, tag_id, outcomes)
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Database error removing calibrations from tag '%s': %s", tag_name, e)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": "Database error occurred",
+                "error": str(e)
+            }
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        log.error("Error removing calibrations from tag '%s': %s", tag_name, e)
+        return jsonify({
+            "status": {
+                "code": 500,
+                "message": "Internal server error",
+                "error": str(e)
             }
-            tags_data.append(tag_info)
+        }), 500
+
 
-        log.info(f"Found {len(tags_data)} active tags for calibration {calibration_id}")
+@tag_routes.route('/internal-tags/<string:tag_name>/latest', methods=['GET'])
+def get_latest_calibrations(tag_name):
+    """Newest calibration per calibration_type (optionally per username) under a tag"""
+    group_by = request.args.get('group_by', 'calibration_type')
+    tag_at_time = request.args.get('tag_at_time')
+
+    if group_by not in ('calibration_type', 'calibration_type,username'):
+        return jsonify({
+            "status": {"code": 400, "message": "Invalid group_by, expected calibration_type or calibration_type,username"}
+        }), 400
+    try:
+        at_time = parse_timestamp(tag_at_time) if tag_at_time else None
+    except ValueError:
+        return jsonify({
+            "status": {"code": 400, "message": "Invalid tag_at_time format"}
+        }), 400
+
+    log.info("Received request for latest calibrations under tag '%s' by %s at %s", tag_name, group_by, tag_at_time)
+
+    try:
+        tag_id = tag_registry.get_id(tag_name)
+        if tag_id is None:
+            log.warning("Tag not found: %s", tag_name)
+            return jsonify({
+                "status": {
+                    "code": 404,
+                    "message": f"Tag '{tag_name}' not found"
+                }
+            }), 404
+
+        calibrations = latest_calibrations(tag_id, per_username=group_by != 'calibration_type', at_time=at_time)
 
         return jsonify({
             "status": {
@@ -257,15 +541,62 @@ def get_calibration_tags(calibration_id):
                 "message": "Success"
             },
             "data": {
-                "calibration_id": calibration_id,
-                "calibration_info": calibration.to_dict(),
-                "tags": tags_data,
-                "tag_count": len(tags_data)
+                "tag_name": tag_name,
+                "tag_at_time": tag_at_time,
+                "group_by": group_by.split(','),
+                "calibrations": [calibration.to_dict() for calibration in calibrations]
+            }
+        }), 200
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        log.error("Database error getting latest calibrations for tag '%s': %s", tag_name, e)
+        return jsonify({
+            "status": {
+                "code": 400,
+                "message": "Database error occurred",
+                "error": str(e)
+            }
+        }), 400
+    except Exception as e:
+        log.error("Error getting latest calibrations for tag '%s': %s", tag_name, e)
+        return jsonify({
+            "status": {
+                "code": 500,
+                "message": "Internal server error",
+                "error": str(e)
             }
+        }), 500
+
+
+@tag_routes.route('/internal-calibration/<int:calibration_id>/tags', methods=['GET'])
+def get_calibration_tags(calibration_id):
+    """Get all tags currently associated with a calibration"""
+    log.info("Received request to get tags for calibration %s", calibration_id)
+
+    try:
+        data = calibration_tags_cache.get_or_load(calibration_id, lambda: _load_calibration_tags(calibration_id))
+        if data is None:
+            log.warning("Calibration not found: %s", calibration_id)
+            return jsonify({
+                "status": {
+                    "code": 404,
+                    "message": "Calibration not found"
+                }
+            }), 404
+
+        log.info("Found %s active tags for calibration %s", data['tag_count'], calibration_id)
+
+        return jsonify({
+            "status": {
+                "code": 200,
+                "message": "Success"
+            },
+            "data": data
         }), 200
 
     except Exception as e:
-        log.error(f"Error getting tags for calibration {calibration_id}: {str(e)}")
+        log.error("Error getting tags for calibration %s: %s", calibration_id, e)
         return jsonify({
             "status": {
                 "code": 500,
@@ -275,6 +606,43 @@ def get_calibration_tags(calibration_id):
         }), 500
 
 
+def _load_calibration_tags(calibration_id):
+    """Build the get_calibration_tags response data, or None if the calibration doesn't exist"""
+    calibration = load_calibration(calibration_id)
+    if calibration is None:
+        return None
+
+    # Query for all active tags associated with this calibration
+    active_tags_query = db.session.query(Tag, CalibrationTag).\
+        join(CalibrationTag, Tag.id == CalibrationTag.tag_id).\
+        filter(
+            and_(
+                CalibrationTag.calibration_id == calibration_id,
+                CalibrationTag.removed_at.is_(None)  # Only active relationships
+            )
+        ).\
+        order_by(CalibrationTag.added_at.desc())
+
+    # Build response data
+    tags_data = []
+    for tag, calibration_tag in active_tags_query.all():
+        tag_info = {
+            "tag_id": tag.id,
+            "tag_name": tag.name,
+            "description": tag.description,
+            "added_at": calibration_tag.added_at.isoformat() if calibration_tag.added_at else None,
+            "added_by": calibration_tag.added_by
+        }
+        tags_data.append(tag_info)
+
+    return {
+        "calibration_id": calibration_id,
+        "calibration_info": calibration,
+        "tags": tags_data,
+        "tag_count": len(tags_data)
+    }
+
+
 @tag_routes.route('/internal-tags', methods=['GET'])
 def get_all_tags():
     """Get all tags in the system"""
@@ -294,7 +662,7 @@ def get_all_tags():
         }), 200
 
     except Exception as e:
-        log.error(f"Error getting all tags: {str(e)}")
+        log.error("Error getting all tags: %s", e)
         return jsonify({
             "status": {
                 "code": 500,
@@ -0,0 +1,104 @@
+"""
+tag_registry keeps an in-process tag name -> id dictionary for the tag service
+
+Tags are never renamed or deleted, so once a name is resolved its id can be
+reused for the life of the process without another round trip. A tag created
+by a request is only remembered once that request's transaction commits.
+"""
+
+import threading
+from datetime import datetime
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from common_packages.models.models import Tag, db
+from common_packages.logs.logging_config import setup_logger
+
+log = setup_logger(__file__)
+
+# Session.info key for tags this session created but hasn't committed: name -> id
+PENDING_TAGS = 'tag_registry_pending'
+
+
+class TagRegistry:
+    def __init__(self):
+        self._ids = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load every tag; called at startup and lazily on first use"""
+        rows = db.session.execute(select(Tag.name, Tag.id)).all()
+        with self._lock:
+            self._ids.update(rows)
+            self._loaded = True
+        log.info("Loaded %s tags into the tag registry", len(rows))
+
+    def get_id(self, name):
+        """Return the id of tag ``name``, or None if no such tag exists"""
+        if not self._loaded:
+            self.load()
+        tag_id = self._ids.get(name)
+        if tag_id is None and name in db.session.info.get(PENDING_TAGS, {}):
+            return db.session.info[PENDING_TAGS][name]
+        if tag_id is None:
+            # Another replica may have created it since we loaded
+            tag_id = db.session.execute(select(Tag.id).where(Tag.name == name)).scalar()
+            if tag_id is not None:
+                self._remember(name, tag_id)
+        return tag_id
+
+    def get_or_create_id(self, name, description=None):
+        """Return ``(tag_id, created)`` for tag ``name``, creating the tag if needed.
+
+        The tag is inserted with ON CONFLICT DO NOTHING in a savepoint of the
+        caller's transaction, on the connection it already holds, so concurrent
+        creators race safely on tags.name. The new tag commits or rolls back with
+        the caller's work, and its id is cached only after a commit.
+        """
+        tag_id = self.get_id(name)
+        if tag_id is not None:
+            return tag_id, False
+
+        now = datetime.utcnow()
+        statement = (
+            insert(Tag)
+            .values(name=name, description=description, created_at=now, updated_at=now)
+            .on_conflict_do_nothing(index_elements=[Tag.name])
+            .returning(Tag.id)
+        )
+        with db.session.begin_nested():
+            tag_id = db.session.execute(statement).scalar()
+            created = tag_id is not None
+            if not created:
+                # Committed by another transaction, which ON CONFLICT waited for
+                tag_id = db.session.execute(select(Tag.id).where(Tag.name == name)).scalar()
+
+        if created:
+            db.session.info.setdefault(PENDING_TAGS, {})[name] = tag_id
+        else:
+            self._remember(name, tag_id)
+        return tag_id, created
+
+    def _remember(self, name, tag_id):
+        with self._lock:
+            self._ids[name] = tag_id
+
+    def __len__(self):
+        return len(self._ids)
+
+
+tag_registry = TagRegistry()
+
+
+@event.listens_for(Session, 'after_commit')
+def _remember_committed_tags(session):
+    for name, tag_id in session.info.pop(PENDING_TAGS, {}).items():
+        tag_registry._remember(name, tag_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_tags(session):
+    session.info.pop(PENDING_TAGS, None)
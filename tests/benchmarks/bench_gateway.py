@@ -0,0 +1,498 @@
+"""
+Load test for every gateway route, with stored baselines to catch regressions
+
+Each scenario sends ``--requests`` requests from ``--concurrency`` threads and
+reports throughput and p50/p95/p99 latency. Request parameters come from a
+seeded random generator, so a run with the same dataset and seed sends the same
+requests. The gateway caches GET responses, which is why scenarios vary their
+filters rather than repeating one URL.
+
+Results can be saved as a named baseline under tests/benchmarks/baselines and
+later runs compared against it. ``--compare`` exits with status 1 when a
+scenario's p95, p99 or throughput is worse than the baseline by more than
+``--tolerance``, or when it has more errors.
+
+Run from the repository root, against services already running:
+    python -m tests.benchmarks.bench_gateway [--gateway-url URL] [--concurrency C] [--requests N]
+
+or load the dataset and start the three services under gunicorn first:
+    python -m tests.benchmarks.bench_gateway --database-url URL --load --serve --save-baseline local
+    python -m tests.benchmarks.bench_gateway --database-url URL --serve --compare local
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
+
+import requests
+from sqlalchemy import create_engine
+
+from common_packages.constants.constants import CALIBRATION_TYPES
+from common_packages.migrations.migrate import database_uri
+from tests.benchmarks import dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+DEFAULT_GATEWAY_URL = 'http://127.0.0.1:5000'
+DEFAULT_CONCURRENCY = 8
+DEFAULT_REQUESTS = 200
+DEFAULT_WARMUP = 10
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_SEED = 42
+REQUEST_TIMEOUT = 60
+
+CURSOR_WALK_PAGES = 10
+INGEST_BURST_SIZE = 1000
+BULK_TAG_SIZE = 500
+DISCOVERY_PAGES = 10
+
+# Service directory and gunicorn app, as in each Dockerfile; the gateway starts last
+SERVICES = [
+    ('calibration-service', 'calibration_app:app'),
+    ('tag-service', 'tag_app:app'),
+    ('api-service', 'app:app'),
+]
+
+
+class Recorder:
+    """Latencies and failures of one scenario, shared by its threads"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def add(self, seconds, ok):
+        with self._lock:
+            self.latencies.append(seconds)
+            if not ok:
+                self.errors += 1
+
+
+class Client:
+    """A thread's HTTP session that times every request it sends"""
+
+    def __init__(self, base_url, recorder=None):
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.recorder = recorder
+
+    def send(self, method, path, expected=(200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=REQUEST_TIMEOUT, **kwargs)
+            body = response.content  # streamed routes are timed until the last byte
+            ok = response.status_code in expected
+        except requests.exceptions.RequestException:
+            response, body, ok = None, None, False
+        if self.recorder is not None:
+            self.recorder.add(time.perf_counter() - started, ok)
+        if not ok or not body:
+            return None
+        try:
+            return response.json().get('data')
+        except ValueError:
+            return None
+
+    def get(self, path, **params):
+        return self.send('GET', path, params=params)
+
+
+class Context:
+    """What the scenarios pick from: calibration ids, usernames, tags and the time window"""
+
+    def __init__(self, calibration_ids, usernames, tags, start, end, run):
+        self.calibration_ids = calibration_ids
+        self.usernames = usernames
+        self.tags = tags
+        self.start = start
+        self.end = end
+        self.run = run
+
+    def moment(self, rng):
+        return self.start + (self.end - self.start) * rng.random()
+
+    def window(self, rng):
+        """A random stretch of between one and thirty days inside the dataset"""
+        start = self.moment(rng)
+        return {'start_date': start.isoformat(), 'end_date': (start + timedelta(days=rng.randint(1, 30))).isoformat()}
+
+
+def discover(base_url, days):
+    """Collect ids, usernames and tags through the API, preferring the benchmark dataset"""
+    client = Client(base_url)
+    tags = [tag['name'] for tag in (client.get('/api/v1/tags') or {}).get('tags', [])]
+    bench_tags = [name for name in tags if name.startswith(dataset.BENCH_PREFIX)]
+
+    calibrations = []
+    cursor = ''
+    for _ in range(DISCOVERY_PAGES):
+        page = client.get('/api/v1/calibrations', limit=100, cursor=cursor)
+        if not page:
+            break
+        calibrations.extend(page['calibrations'])
+        cursor = page['pagination']['next_cursor']
+        if not cursor:
+            break
+    if not calibrations or not tags:
+        raise SystemExit(f"No calibrations or tags at {base_url}; load the dataset first (--load)")
+
+    end = datetime.now(timezone.utc)
+    return Context(
+        calibration_ids=sorted({calibration['id'] for calibration in calibrations}),
+        usernames=sorted({calibration['username'] for calibration in calibrations}),
+        tags=sorted(bench_tags or tags),
+        start=end - timedelta(days=days),
+        end=end,
+        run=uuid.uuid4().hex[:8],
+    )
+
+
+# Scenarios: one call sends one or more timed requests
+
+def health(client, ctx, rng):
+    client.get('/health')
+
+
+def list_filtered(client, ctx, rng):
+    params = rng.choice([
+        {'username': rng.choice(ctx.usernames)},
+        {'calibration_type': rng.choice(CALIBRATION_TYPES)},
+        ctx.window(rng),
+        {'username': rng.choice(ctx.usernames), **ctx.window(rng)},
+    ])
+    client.get('/api/v1/calibrations', limit=20, total='estimate', **params)
+
+
+def list_by_tag(client, ctx, rng):
+    client.get('/api/v1/calibrations', tag_name=rng.choice(ctx.tags), page=rng.randint(1, 5), total='exact')
+
+
+def deep_offset(client, ctx, rng):
+    client.get('/api/v1/calibrations', page=rng.randint(100, 1000), limit=50, total='none',
+               calibration_type=rng.choice(CALIBRATION_TYPES))
+
+
+def deep_cursor(client, ctx, rng):
+    cursor = ''
+    params = {'calibration_type': rng.choice(CALIBRATION_TYPES)}
+    for _ in range(CURSOR_WALK_PAGES):
+        page = client.get('/api/v1/calibrations', limit=100, cursor=cursor, **params)
+        cursor = page and page['pagination']['next_cursor']
+        if not cursor:
+            break
+
+
+def tag_at_time(client, ctx, rng):
+    client.get('/api/v1/calibrations', tag_name=rng.choice(ctx.tags), tag_at_time=ctx.moment(rng).isoformat(),
+               total='estimate')
+
+
+def latest_at_time(client, ctx, rng):
+    client.get(f'/api/v1/tags/{rng.choice(ctx.tags)}/latest', tag_at_time=ctx.moment(rng).isoformat())
+
+
+def tag_latest(client, ctx, rng):
+    client.get(f'/api/v1/tags/{rng.choice(ctx.tags)}/latest',
+               group_by=rng.choice(['calibration_type', 'calibration_type,username']))
+
+
+def stats(client, ctx, rng):
+    client.get('/api/v1/calibrations/stats', group_by=rng.choice(['calibration_type', 'username']),
+               percentiles='50,95,99', **ctx.window(rng))
+
+
+def series(client, ctx, rng):
+    client.get('/api/v1/calibrations/series', tag_name=rng.choice(ctx.tags), interval=rng.choice(['1h', '1d']),
+               **ctx.window(rng))
+
+
+def export(client, ctx, rng):
+    client.get('/api/v1/calibrations/export', username=rng.choice(ctx.usernames), **ctx.window(rng))
+
+
+def calibration_tags(client, ctx, rng):
+    client.get(f'/api/v1/calibrations/{rng.choice(ctx.calibration_ids)}/tags')
+
+
+def with_tags_ids(client, ctx, rng):
+    ids = rng.sample(ctx.calibration_ids, min(20, len(ctx.calibration_ids)))
+    client.get('/api/v1/calibrations/with-tags', ids=','.join(map(str, ids)))
+
+
+def with_tags_filter(client, ctx, rng):
+    client.get('/api/v1/calibrations/with-tags', username=rng.choice(ctx.usernames), limit=20, total='none')
+
+
+def tags(client, ctx, rng):
+    client.get('/api/v1/tags')
+
+
+def snapshots(client, ctx, rng):
+    tag = rng.choice(ctx.tags)
+    name = f'{dataset.BENCH_PREFIX}snapshot-{ctx.run}-{uuid.uuid4().hex[:12]}'
+    at_time = rng.choice([None, ctx.moment(rng).isoformat()])
+    body = {'name': name, 'created_by': 'bench', **({'tag_at_time': at_time} if at_time else {})}
+    if client.send('POST', f'/api/v1/tags/{tag}/snapshots', expected=(201,), json=body) is None:
+        return
+    client.get(f'/api/v1/tags/{tag}/snapshots')
+    client.get(f'/api/v1/snapshots/{name}')
+    client.get(f'/api/v1/snapshots/{name}/diff')
+
+
+def tag_churn(client, ctx, rng):
+    calibration_id = rng.choice(ctx.calibration_ids)
+    tag = rng.choice(ctx.tags)
+    # The calibration may already carry the tag, and another thread may have just removed it
+    client.send('POST', f'/api/v1/calibrations/{calibration_id}/tags', expected=(200, 201),
+                json={'tag_name': tag})
+    client.send('DELETE', f'/api/v1/calibrations/{calibration_id}/tags/{tag}', expected=(200, 404))
+
+
+def bulk_tag(client, ctx, rng):
+    body = {'calibration_ids': rng.sample(ctx.calibration_ids, min(BULK_TAG_SIZE, len(ctx.calibration_ids))),
+            'added_by': 'bench'}
+    tag = rng.choice(ctx.tags)
+    client.send('POST', f'/api/v1/tags/{tag}/calibrations', json=body)
+    client.send('DELETE', f'/api/v1/tags/{tag}/calibrations', json=body)
+
+
+def _calibration(ctx, rng):
+    return {
+        'calibration_type': rng.choice(CALIBRATION_TYPES),
+        'value': round(rng.uniform(-100, 100), 4),
+        'username': f'{dataset.BENCH_PREFIX}ingest-{ctx.run}',
+    }
+
+
+def ingest(client, ctx, rng):
+    client.send('POST', '/api/v1/calibrations', expected=(201,), json=_calibration(ctx, rng))
+
+
+def ingest_burst(client, ctx, rng):
+    client.send('POST', '/api/v1/calibrations/batch', expected=(201,),
+                json={'calibrations': [_calibration(ctx, rng) for _ in range(INGEST_BURST_SIZE)]})
+
+
+SCENARIOS = {scenario.__name__: scenario for scenario in [
+    health, list_filtered, list_by_tag, deep_offset, deep_cursor, tag_at_time, latest_at_time, tag_latest,
+    stats, series, export, calibration_tags, with_tags_ids, with_tags_filter, tags, snapshots, tag_churn,
+    bulk_tag, ingest, ingest_burst,
+]}
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted ``values``"""
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * q // 100))
+    return values[int(rank) - 1]
+
+
+def summarize(recorder, elapsed):
+    latencies = sorted(recorder.latencies)
+    ms = lambda seconds: round(seconds * 1000, 2) if seconds is not None else None  # noqa: E731
+    return {
+        "requests": len(latencies),
+        "errors": recorder.errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+    }
+
+
+def run_scenario(name, base_url, ctx, concurrency, count, warmup, seed):
+    """Run ``count`` calls of a scenario spread over ``concurrency`` threads"""
+    scenario = SCENARIOS[name]
+    recorder = Recorder()
+    per_thread = [count // concurrency + (1 if worker < count % concurrency else 0) for worker in range(concurrency)]
+
+    # Warm connections, caches and pools with untimed calls first
+    warm = Client(base_url)
+    warm_rng = random.Random(f'{seed}-{name}-warmup')
+    for _ in range(warmup):
+        scenario(warm, ctx, warm_rng)
+
+    def work(worker, calls):
+        client = Client(base_url, recorder)
+        rng = random.Random(f'{seed}-{name}-{worker}')
+        for _ in range(calls):
+            scenario(client, ctx, rng)
+
+    threads = [threading.Thread(target=work, args=(worker, calls)) for worker, calls in enumerate(per_thread)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(recorder, time.perf_counter() - started)
+
+
+def compare(results, baseline, tolerance):
+    """Scenarios that regressed against ``baseline``, as ``(scenario, reason)`` pairs"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in ('p95_ms', 'p99_ms'):
+            if result[metric] is not None and base[metric] and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append((name, f"{metric} {base[metric]} -> {result[metric]}"))
+        if base['rps'] and result['rps'] is not None and result['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append((name, f"rps {base['rps']} -> {result['rps']}"))
+        if result['errors'] > base['errors']:
+            regressions.append((name, f"errors {base['errors']} -> {result['errors']}"))
+    return regressions
+
+
+def baseline_path(name):
+    return name if name.endswith('.json') else os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+def print_table(results, baseline=None):
+    print(f"{'scenario':<18} {'requests':>8} {'errors':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'max ms':>9}")
+    for name, result in results.items():
+        line = (f"{name:<18} {result['requests']:>8} {result['errors']:>6} {result['rps'] or 0:>9.1f} "
+                f"{result['p50_ms'] or 0:>9.1f} {result['p95_ms'] or 0:>9.1f} {result['p99_ms'] or 0:>9.1f} "
+                f"{result['max_ms'] or 0:>9.1f}")
+        base = (baseline or {}).get(name)
+        if base and base['p95_ms'] and result['p95_ms'] is not None:
+            line += f"  p95 {result['p95_ms'] / base['p95_ms'] - 1:+.0%}"
+        print(line)
+
+
+def serve(database_url, gateway_port, workers):
+    """Start the three services under gunicorn on localhost, the gateway on ``gateway_port`` and the others after it"""
+    ports = {'calibration-service': gateway_port + 1, 'tag-service': gateway_port + 2, 'api-service': gateway_port}
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])),
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'CALIBRATION_SERVICE_URL': f"http://127.0.0.1:{ports['calibration-service']}",
+        'TAG_SERVICE_URL': f"http://127.0.0.1:{ports['tag-service']}",
+        'WEB_CONCURRENCY': str(workers),
+        # Keep warnings and errors, drop per-request INFO lines that would dominate the profile
+        'LOG_SAMPLE_RATE': os.environ.get('LOG_SAMPLE_RATE', '0'),
+    }
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)  # each service gets its own
+    log_path = os.path.join(tempfile.gettempdir(), 'bench-gateway-services.log')
+    log_file = open(log_path, 'w')
+
+    processes = []
+    for directory, module in SERVICES:
+        processes.append(subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--config', 'python:common_packages.serving.gunicorn_conf',
+             '--chdir', os.path.join(ROOT, directory), '--bind', f'127.0.0.1:{ports[directory]}', module],
+            env=env, stdout=log_file, stderr=subprocess.STDOUT))
+
+    deadline = time.monotonic() + 60
+    for directory, _ in SERVICES:
+        while True:
+            try:
+                if requests.get(f'http://127.0.0.1:{ports[directory]}/health', timeout=1).status_code == 200:
+                    break
+            except requests.exceptions.RequestException:
+                pass
+            if time.monotonic() > deadline or any(process.poll() is not None for process in processes):
+                stop(processes)
+                raise SystemExit(f"{directory} did not become healthy, see {log_path}")
+            time.sleep(0.2)
+    print(f"Serving on 127.0.0.1:{gateway_port} with {workers} workers per service (logs in {log_path})")
+    return processes
+
+
+def stop(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test every gateway route")
+    parser.add_argument('--gateway-url', default=DEFAULT_GATEWAY_URL)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="client threads per scenario")
+    parser.add_argument('--requests', type=int, default=DEFAULT_REQUESTS, help="scenario calls per scenario")
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help="untimed calls before each scenario")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help="run only this scenario (repeatable)")
+    parser.add_argument('--days', type=int, default=dataset.DEFAULT_DAYS, help="span of the dataset's timestamps")
+    parser.add_argument('--database-url', default=None, help="for --load and --serve; defaults to the service's")
+    parser.add_argument('--load', action='store_true', help="load the synthetic dataset first")
+    parser.add_argument('--calibrations', type=int, default=dataset.DEFAULT_CALIBRATIONS)
+    parser.add_argument('--tags', type=int, default=dataset.DEFAULT_TAGS)
+    parser.add_argument('--serve', action='store_true', help="start the services under gunicorn on localhost")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn workers per service with --serve")
+    parser.add_argument('--save-baseline', metavar='NAME', help="store the results as a named baseline")
+    parser.add_argument('--compare', metavar='NAME', help="fail on regressions against a stored baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative slowdown before --compare fails")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or database_uri()
+    if args.load:
+        started = time.perf_counter()
+        counts = dataset.load(create_engine(database_url), calibrations=args.calibrations, tags=args.tags,
+                              days=args.days)
+        print(f"Loaded {counts} in {time.perf_counter() - started:.1f}s")
+
+    processes = []
+    if args.serve:
+        processes = serve(database_url, urlsplit(args.gateway_url).port or 80, args.workers)
+    try:
+        ctx = discover(args.gateway_url, args.days)
+        results = {}
+        for name in args.scenario or SCENARIOS:
+            results[name] = run_scenario(name, args.gateway_url, ctx, args.concurrency, args.requests,
+                                         args.warmup, args.seed)
+            print(f"  {name}: {results[name]['rps']} req/s, p95 {results[name]['p95_ms']} ms", file=sys.stderr)
+    finally:
+        stop(processes)
+
+    baseline = None
+    if args.compare:
+        with open(baseline_path(args.compare)) as file:
+            baseline = json.load(file)['results']
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path(args.save_baseline), 'w') as file:
+            json.dump({
+                "created_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "seed": args.seed,
+                "results": results,
+            }, file, indent=2)
+            file.write('\n')
+        print(f"Saved baseline to {baseline_path(args.save_baseline)}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, reason in regressions:
+            print(f"REGRESSION {name}: {reason}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
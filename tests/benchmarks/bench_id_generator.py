@@ -0,0 +1,56 @@
+"""
+Microbenchmark for Snowflake ID allocation
+
+Run from the repository root:
+    python -m tests.benchmarks.bench_id_generator [count]
+"""
+
+import sys
+import threading
+import time
+
+from common_packages.utils.id_generator import SnowflakeIdGenerator
+
+
+def bench_generate(count):
+    generator = SnowflakeIdGenerator(worker_id=1, datacenter_id=1)
+    start = time.perf_counter()
+    for _ in range(count):
+        generator.generate()
+    return count / (time.perf_counter() - start)
+
+
+def bench_generate_many(count, batch_size=1000):
+    generator = SnowflakeIdGenerator(worker_id=1, datacenter_id=1)
+    start = time.perf_counter()
+    for _ in range(count // batch_size):
+        generator.generate_many(batch_size)
+    return count / (time.perf_counter() - start)
+
+
+def bench_generate_threaded(count, threads=8):
+    generator = SnowflakeIdGenerator(worker_id=1, datacenter_id=1)
+    per_thread = count // threads
+
+    def work():
+        for _ in range(per_thread):
+            generator.generate()
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"generate()              {bench_generate(count):>14,.0f} ids/sec")
+    print(f"generate_many(1000)     {bench_generate_many(count):>14,.0f} ids/sec")
+    print(f"generate() x 8 threads  {bench_generate_threaded(count):>14,.0f} ids/sec")
+
+
+if __name__ == '__main__':
+    main()
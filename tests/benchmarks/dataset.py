@@ -0,0 +1,158 @@
+"""
+Synthetic benchmark dataset: calibrations, tags and tag churn with soft deletes
+
+Everything is generated inside PostgreSQL from a fixed seed, so the same
+arguments always produce the same rows. Only benchmark rows are touched:
+usernames and tag names start with ``bench-`` and a load replaces any
+earlier benchmark dataset, leaving other data alone.
+
+Run from the repository root:
+    python -m tests.benchmarks.dataset --database-url URL [--calibrations N] [--tags M] [--seed S]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+
+from common_packages.constants.constants import CALIBRATION_TYPES
+from common_packages.migrations.migrate import database_uri, upgrade
+
+BENCH_PREFIX = 'bench-'
+# Benchmark calibration ids sit far below Snowflake ids, which start around 2**62
+BENCH_ID_BASE = 10 ** 12
+
+DEFAULT_CALIBRATIONS = 200000
+DEFAULT_TAGS = 50
+DEFAULT_DAYS = 365
+DEFAULT_SEED = 0.42
+MAX_TAGS_PER_CALIBRATION = 3
+CHURN_REMOVED = 0.3      # share of memberships later soft deleted
+CHURN_READDED = 0.3      # share of the removed ones added back afterwards
+
+_DELETE = [
+    "DELETE FROM tag_snapshots WHERE tag_id IN (SELECT id FROM tags WHERE name LIKE 'bench-%')",
+    "DELETE FROM tag_latest_calibrations WHERE tag_id IN (SELECT id FROM tags WHERE name LIKE 'bench-%') "
+    "OR calibration_id IN (SELECT id FROM calibrations WHERE username LIKE 'bench-%')",
+    "DELETE FROM calibration_tags WHERE tag_id IN (SELECT id FROM tags WHERE name LIKE 'bench-%') "
+    "OR calibration_id IN (SELECT id FROM calibrations WHERE username LIKE 'bench-%')",
+    "DELETE FROM calibrations WHERE username LIKE 'bench-%'",
+    "DELETE FROM tags WHERE name LIKE 'bench-%'",
+]
+
+_CALIBRATIONS = """
+INSERT INTO calibrations (id, calibration_type, value, username, timestamp)
+SELECT :id_base + n,
+       (:types)[1 + floor(random() * array_length(:types, 1))::int],
+       round((random() * 200 - 100)::numeric, 4)::float8,
+       -- A few heavy users and a long tail, as in production
+       'bench-user-' || lpad(floor(:users * random() ^ 2)::int::text, 4, '0'),
+       :now - random() * make_interval(days => :days)
+FROM generate_series(1, :calibrations) AS n
+ORDER BY n
+"""
+
+_TAGS = """
+INSERT INTO tags (name, description, created_at, updated_at)
+SELECT 'bench-tag-' || lpad(n::text, 4, '0'), 'Benchmark tag ' || n,
+       :now - make_interval(days => :days), :now - make_interval(days => :days)
+FROM generate_series(1, :tags) AS n
+"""
+
+# Up to three distinct tags per calibration, added some time after the calibration
+_MEMBERSHIPS = """
+WITH tag_ids AS (SELECT array_agg(id ORDER BY name) AS ids FROM tags WHERE name LIKE 'bench-tag-%'),
+     tagged AS (
+         SELECT c.id AS calibration_id,
+                t.ids[1 + ((c.id - :id_base) * 7919 + slot) % array_length(t.ids, 1)] AS tag_id,
+                c.timestamp + (:now - c.timestamp) * random() ^ 4 AS added_at
+         FROM (SELECT id, timestamp, floor(random() * (:max_tags + 1))::int AS tag_count
+               FROM calibrations WHERE username LIKE 'bench-%' ORDER BY id) c
+         CROSS JOIN tag_ids t
+         CROSS JOIN LATERAL generate_series(0, c.tag_count - 1) AS slot
+     )
+INSERT INTO calibration_tags (calibration_id, tag_id, added_at, removed_at, added_by)
+SELECT calibration_id, tag_id, added_at,
+       CASE WHEN random() < :removed THEN added_at + (:now - added_at) * random() END,
+       'bench'
+FROM tagged
+"""
+
+_READDED = """
+INSERT INTO calibration_tags (calibration_id, tag_id, added_at, removed_at, added_by)
+SELECT calibration_id, tag_id, removed_at + (:now - removed_at) * random(), NULL, 'bench'
+FROM (SELECT calibration_id, tag_id, removed_at FROM calibration_tags
+      WHERE added_by = 'bench' AND removed_at IS NOT NULL
+        AND tag_id IN (SELECT id FROM tags WHERE name LIKE 'bench-%')
+      ORDER BY calibration_id, tag_id) removed
+WHERE random() < :readded
+"""
+
+_LATEST = """
+INSERT INTO tag_latest_calibrations (tag_id, calibration_type, username, calibration_id, timestamp)
+SELECT DISTINCT ON (ct.tag_id, c.calibration_type, c.username)
+       ct.tag_id, c.calibration_type, c.username, c.id, c.timestamp
+FROM calibration_tags ct
+JOIN calibrations c ON c.id = ct.calibration_id
+WHERE ct.removed_at IS NULL AND ct.tag_id IN (SELECT id FROM tags WHERE name LIKE 'bench-%')
+ORDER BY ct.tag_id, c.calibration_type, c.username, c.timestamp DESC, c.id DESC
+"""
+
+
+def load(engine, calibrations=DEFAULT_CALIBRATIONS, tags=DEFAULT_TAGS, days=DEFAULT_DAYS, seed=DEFAULT_SEED,
+         now=None):
+    """Replace the benchmark dataset and return the number of rows per table"""
+    now = now or datetime.now(timezone.utc).replace(microsecond=0)
+    users = max(calibrations // 1000, 10)
+    params = {
+        "id_base": BENCH_ID_BASE, "types": CALIBRATION_TYPES, "users": users, "calibrations": calibrations,
+        "tags": tags, "days": days, "now": now, "max_tags": min(MAX_TAGS_PER_CALIBRATION, tags),
+        "removed": CHURN_REMOVED, "readded": CHURN_READDED,
+    }
+    upgrade(engine)
+    with engine.begin() as connection:
+        for statement in _DELETE:
+            connection.execute(text(statement))
+        # random() is reproducible from here on in this session
+        connection.execute(text("SELECT setseed(:seed)"), {"seed": seed})
+        for statement in (_CALIBRATIONS, _TAGS, _MEMBERSHIPS, _READDED, _LATEST):
+            connection.execute(text(statement), params)
+
+        counts = connection.execute(text("""
+            SELECT (SELECT count(*) FROM calibrations WHERE username LIKE 'bench-%'),
+                   (SELECT count(*) FROM tags WHERE name LIKE 'bench-%'),
+                   (SELECT count(*) FROM calibration_tags WHERE added_by = 'bench'),
+                   (SELECT count(*) FROM calibration_tags WHERE added_by = 'bench' AND removed_at IS NULL)
+        """)).one()
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        for table in ('calibrations', 'tags', 'calibration_tags', 'tag_latest_calibrations'):
+            connection.execute(text(f"ANALYZE {table}"))
+
+    return {
+        "calibrations": counts[0],
+        "tags": counts[1],
+        "memberships": counts[2],
+        "active_memberships": counts[3],
+        "users": users,
+        "window": [(now - timedelta(days=days)).isoformat(), now.isoformat()],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load the synthetic benchmark dataset")
+    parser.add_argument('--database-url', default=None, help="defaults to $SQLALCHEMY_DATABASE_URI")
+    parser.add_argument('--calibrations', type=int, default=DEFAULT_CALIBRATIONS)
+    parser.add_argument('--tags', type=int, default=DEFAULT_TAGS)
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help="span of calibration timestamps")
+    parser.add_argument('--seed', type=float, default=DEFAULT_SEED, help="PostgreSQL setseed() value in [-1, 1]")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    counts = load(create_engine(args.database_url or database_uri()),
+                  calibrations=args.calibrations, tags=args.tags, days=args.days, seed=args.seed)
+    print(f"Loaded {counts} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
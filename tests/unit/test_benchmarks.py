@@ -0,0 +1,25 @@
+"""
+Unit tests for the gateway benchmark's reporting and baseline comparison
+"""
+
+from tests.benchmarks.bench_gateway import Recorder, compare, percentile, summarize
+
+
+def test_baseline_comparison_flags_slower_and_failing_scenarios():
+    """Test percentiles, summaries and the baseline comparison flagging slower, failing and lower-throughput runs"""
+    assert percentile(list(range(1, 101)), 95) == 95
+    assert percentile([0.5], 99) == 0.5
+
+    recorder = Recorder()
+    for milliseconds in range(1, 101):
+        recorder.add(milliseconds / 1000, ok=milliseconds != 100)
+    result = summarize(recorder, elapsed=2.0)
+    assert (result['requests'], result['errors'], result['rps']) == (100, 1, 50.0)
+    assert (result['p50_ms'], result['p95_ms'], result['p99_ms']) == (50.0, 95.0, 99.0)
+
+    baseline = {'list': {**result, 'errors': 1}, 'export': {**result, 'p95_ms': 70.0, 'errors': 0}}
+    assert compare({'list': result, 'new_scenario': result}, baseline, tolerance=0.2) == []
+    assert compare({'export': result}, baseline, tolerance=0.2) == [
+        ('export', 'p95_ms 70.0 -> 95.0'), ('export', 'errors 0 -> 1')
+    ]
+    assert compare({'list': {**result, 'rps': 30.0}}, baseline, tolerance=0.2) == [('list', 'rps 50.0 -> 30.0')]
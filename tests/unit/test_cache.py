@@ -0,0 +1,129 @@
+"""
+Unit tests for the read-through cache layer
+"""
+
+import pytest
+
+from common_packages.cache.cache import Cache
+from common_packages.cache.backends import LocalBackend, RedisBackend
+
+
+class FakeRedis:
+    """Local stand-in for the redis-py client"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues calls and runs them against the FakeRedis on execute()"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def set(self, *args, **kwargs):
+        self.calls.append((self.redis.set, args, kwargs))
+
+    def execute(self):
+        return [call(*args, **kwargs) for call, args, kwargs in self.calls]
+
+
+def test_read_through_and_invalidation():
+    """Test the loader runs only on a miss and invalidation forces a reload"""
+    cache = Cache('calibration', LocalBackend(maxsize=10, ttl=60), ttl=60)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {"id": 1, "value": 1.5}
+
+    assert cache.get_or_load(1, loader) == {"id": 1, "value": 1.5}
+    assert cache.get_or_load(1, loader) == {"id": 1, "value": 1.5}
+    assert len(loads) == 1
+
+    cache.invalidate(1)
+    cache.get_or_load(1, loader)
+    assert len(loads) == 2
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
+
+
+def test_missing_values_are_not_cached():
+    """Test a None result (e.g. unknown calibration) is looked up again next time"""
+    cache = Cache('calibration', LocalBackend(maxsize=10, ttl=60), ttl=60)
+
+    assert cache.get_or_load(404, lambda: None) is None
+    assert cache.get_or_load(404, lambda: "created") == "created"
+
+
+def test_shared_backend_clear_is_seen_by_every_cache_instance():
+    """Test two processes sharing a backend see each other's entries and clears"""
+    redis = FakeRedis()
+    first = Cache('calibration_counts', RedisBackend(redis, ttl=30), ttl=30)
+    second = Cache('calibration_counts', RedisBackend(redis, ttl=30), ttl=30)
+
+    first.set('username=alice', 42)
+    assert second.get('username=alice') == 42
+
+    second.clear()
+    assert first.get('username=alice') is None
+
+
+def test_broken_backend_degrades_to_miss():
+    """Test backend errors are counted and treated as cache misses"""
+    class BrokenRedis(FakeRedis):
+        def get(self, key):
+            raise ConnectionError("redis is down")
+
+    cache = Cache('calibration', RedisBackend(BrokenRedis(), ttl=30), ttl=30)
+
+    assert cache.get_or_load(1, lambda: "from database") == "from database"
+    assert cache.stats()["errors"] >= 1
+
+
+@pytest.mark.parametrize('backend', [lambda: LocalBackend(maxsize=10, ttl=60), lambda: RedisBackend(FakeRedis(), 60)],
+                         ids=['local', 'redis'])
+def test_load_overtaken_by_an_invalidation_is_not_cached(backend):
+    """Test a value loaded before an invalidate() or clear() that ran during the load is returned but not kept"""
+    cache = Cache('calibration_tags', backend(), ttl=60)
+    current = {"tags": ["old"]}
+
+    def load_then(invalidation):
+        def loader():
+            value = dict(current)
+            current["tags"] = ["new"]
+            invalidation()
+            return value
+        return loader
+
+    assert cache.get_or_load(7, load_then(lambda: cache.invalidate(7))) == {"tags": ["old"]}
+    assert cache.get_or_load(7, lambda: dict(current)) == {"tags": ["new"]}
+
+    current["tags"] = ["old"]
+    cache.invalidate(7)
+    assert cache.get_or_load(7, load_then(cache.clear)) == {"tags": ["old"]}
+    assert cache.get_or_load(7, lambda: dict(current)) == {"tags": ["new"]}
+
+    # Invalidating another key doesn't stop this one being cached
+    cache.invalidate(7)
+    assert cache.get_or_load(7, load_then(lambda: cache.invalidate(8))) == {"tags": ["new"]}
+    assert cache.get(7) == {"tags": ["new"]}
@@ -0,0 +1,163 @@
+"""
+Tests for the calibration service endpoints, served from PostgreSQL
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import calibration
+from common_packages.models.models import Calibration, CalibrationTag, Tag, db
+
+
+def test_batch_all_or_nothing_and_partial(calibration_app):
+    """Test an invalid row rejects an all-or-nothing batch but only itself in partial mode"""
+    client = calibration_app.test_client()
+    calibrations = [
+        {"calibration_type": "Offset", "value": 1.5, "username": "alice"},
+        {"calibration_type": "gain", "username": "alice"},
+        {"calibration_type": "gain", "value": -2.0, "username": "bob"},
+    ]
+
+    response = client.post('/internal-calibrations/batch', json={"calibrations": calibrations})
+    assert response.status_code == 400
+    assert [error['index'] for error in response.get_json()['errors']] == [1]
+    assert Calibration.query.count() == 0
+
+    response = client.post('/internal-calibrations/batch', json={"calibrations": calibrations, "mode": "partial"})
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body['data']['created'], body['data']['rejected']) == (2, 1)
+    ids = body['data']['calibration_ids']
+    assert ids[1] is None and len(set(ids)) == 3
+    assert body['errors'][0]['index'] == 1
+    assert {(row.id, row.calibration_type, row.username) for row in Calibration.query} == {
+        (ids[0], 'offset', 'alice'), (ids[2], 'gain', 'bob')
+    }
+
+    response = client.post('/internal-calibrations/batch', json={"calibrations": [], "mode": "partial"})
+    assert response.status_code == 400
+
+
+def test_cursor_pages_walk_ties_without_gaps(calibration_app):
+    """Test keyset pages follow (timestamp, id) order and split equal timestamps without skipping rows"""
+    tied = datetime(2025, 8, 7, 12, 0, 0)
+    rows = [(1, tied - timedelta(minutes=1)), (2, tied), (3, tied), (4, tied), (5, tied + timedelta(minutes=1))]
+    db.session.add_all(Calibration(id=calibration_id, calibration_type='gain', value=1.0, username='alice',
+                                   timestamp=timestamp) for calibration_id, timestamp in rows)
+    db.session.commit()
+    client = calibration_app.test_client()
+
+    first = client.get('/internal-calibrations?cursor=&limit=2').get_json()['data']
+    assert [row['id'] for row in first['calibrations']] == [5, 4]
+    assert first['pagination']['has_next'] is True
+    assert 'total' not in first['pagination']
+
+    # The next page starts inside the run of equal timestamps
+    second = client.get(f"/internal-calibrations?cursor={first['pagination']['next_cursor']}&limit=2")
+    second = second.get_json()['data']
+    assert [row['id'] for row in second['calibrations']] == [3, 2]
+
+    last = client.get(f"/internal-calibrations?cursor={second['pagination']['next_cursor']}&limit=2")
+    last = last.get_json()['data']
+    assert [row['id'] for row in last['calibrations']] == [1]
+    assert last['pagination'] == {"limit": 2, "has_next": False, "next_cursor": None}
+
+    assert client.get('/internal-calibrations?cursor=not-a-cursor').status_code == 400
+
+
+def test_stats_grouped_by_type_and_user(calibration_app):
+    """Test grouped stats return one entry per (type, user) with the requested percentiles, in key order"""
+    rows = [('gain', 'alice', 1.0), ('gain', 'alice', 3.0), ('gain', 'bob', 5.0), ('offset', 'alice', 2.0)]
+    db.session.add_all(Calibration(id=calibration_id, calibration_type=calibration_type, value=value,
+                                   username=username, timestamp=datetime(2025, 8, 7, 12, 0, 0))
+                       for calibration_id, (calibration_type, username, value) in enumerate(rows, start=1))
+    db.session.commit()
+    client = calibration_app.test_client()
+
+    response = client.get('/internal-calibrations/stats?group_by=calibration_type,username&percentiles=50,100')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['group_by'] == ['calibration_type', 'username']
+    assert [(group['calibration_type'], group['username'], group['count']) for group in data['groups']] == [
+        ('gain', 'alice', 2), ('gain', 'bob', 1), ('offset', 'alice', 1)
+    ]
+    alice_gain = data['groups'][0]
+    assert (alice_gain['mean'], alice_gain['min'], alice_gain['max']) == (2.0, 1.0, 3.0)
+    assert alice_gain['stddev'] == pytest.approx(2 ** 0.5)
+    assert alice_gain['percentiles'] == {'p50': 2.0, 'p100': 3.0}
+    assert data['groups'][1]['stddev'] is None
+
+    ungrouped = client.get('/internal-calibrations/stats?username=alice').get_json()['data']
+    assert ungrouped['group_by'] == [] and len(ungrouped['groups']) == 1
+    assert 'username' not in ungrouped['groups'][0] and ungrouped['groups'][0]['count'] == 3
+    assert client.get('/internal-calibrations/stats?username=nobody').get_json()['data']['groups'] == []
+    assert client.get('/internal-calibrations/stats?group_by=value').status_code == 400
+
+
+def test_series_bucket_width_and_limit(calibration_app, monkeypatch):
+    """Test the bucket width comes from points or interval, and too many buckets or a database error give 400"""
+    start = datetime(2025, 8, 7, 12, 0, 0, tzinfo=timezone.utc)
+    rows = [(1, 'gain', 0, 1.0), (2, 'gain', 30, 3.0), (3, 'gain', 999, 5.0), (4, 'offset', 500, 2.0)]
+    db.session.add_all(Calibration(id=calibration_id, calibration_type=calibration_type, value=value,
+                                   username='alice', timestamp=start + timedelta(seconds=offset))
+                       for calibration_id, calibration_type, offset, value in rows)
+    db.session.commit()
+    client = calibration_app.test_client()
+
+    # 999s span over 10 points: ceil(99.9) = 100s buckets, aligned to the epoch
+    data = client.get('/internal-calibrations/series?points=10').get_json()['data']
+    assert data['interval_seconds'] == 100
+    gain, offset = data['series']
+    assert (gain['calibration_type'], offset['calibration_type']) == ('gain', 'offset')
+    assert [(bucket['start'], bucket['count'], bucket['last']) for bucket in gain['buckets']] == [
+        ('2025-08-07T12:00:00+00:00', 2, 3.0), ('2025-08-07T12:15:00+00:00', 1, 5.0)
+    ]
+    assert client.get('/internal-calibrations/series?points=10&username=alice&calibration_type=offset') \
+        .get_json()['data']['interval_seconds'] == 1  # a single row spans nothing
+
+    assert client.get('/internal-calibrations/series?interval=5m').get_json()['data']['interval_seconds'] == 300
+    assert client.get('/internal-calibrations/series?interval=10s').status_code == 200
+    # 1s buckets over the 999s span: reach the limit by lowering it rather than adding 10000s of rows
+    monkeypatch.setattr(calibration, 'MAX_SERIES_BUCKETS', 999)
+    response = client.get('/internal-calibrations/series?interval=1s')
+    assert response.status_code == 400
+    assert 'more than 999 buckets' in response.get_json()['status']['message']
+    assert client.get('/internal-calibrations/series?points=1000').status_code == 400
+
+    def fail(*args, **kwargs):
+        raise OperationalError('SELECT', {}, Exception('connection lost'))
+
+    monkeypatch.setattr(db.session, 'execute', fail)
+    response = client.get('/internal-calibrations/series')
+    assert response.status_code == 400
+    assert response.get_json()['status']['message'] == 'Database error occurred'
+
+
+def test_estimated_totals_reuse_recent_counts(calibration_app, monkeypatch):
+    """Test total=estimate reuses a cached count, and tag filters the local backend can't see cleared only briefly"""
+    db.session.add_all(Calibration(id=calibration_id, calibration_type='gain', value=1.0, username='alice')
+                       for calibration_id in (1, 2))
+    tag = Tag(name='production')
+    db.session.add(tag)
+    db.session.flush()
+    db.session.add(CalibrationTag(calibration_id=1, tag_id=tag.id))
+    db.session.commit()
+    client = calibration_app.test_client()
+
+    def total(query):
+        pagination = client.get(f'/internal-calibrations?total=estimate&{query}').get_json()['data']['pagination']
+        return pagination['total'], pagination['total_approximate']
+
+    assert (total('username=alice'), total('tag_name=production')) == ((2, False), (1, False))
+
+    # Written behind the service's back, as the tag service's process would
+    db.session.add(Calibration(id=3, calibration_type='gain', value=1.0, username='alice'))
+    db.session.add(CalibrationTag(calibration_id=2, tag_id=tag.id))
+    db.session.commit()
+    assert (total('username=alice'), total('tag_name=production')) == ((2, True), (1, True))
+
+    # Past TAG_COUNT_CACHE_TTL the tag filter is counted again; the other count waits for COUNT_CACHE_TTL
+    monkeypatch.setattr(calibration, 'tag_count_ttl', 0)
+    assert (total('username=alice'), total('tag_name=production')) == ((2, True), (2, False))
@@ -0,0 +1,22 @@
+"""
+Unit tests for the database engine settings
+"""
+
+from common_packages.constants.constants import DEFAULT_DB_MAX_OVERFLOW
+from common_packages.models.database import TimedQueuePool, database_uri, engine_options
+
+
+def test_database_settings_read_environment(monkeypatch):
+    """Test the DB URI and pool settings come from the environment"""
+    monkeypatch.setenv('SQLALCHEMY_DATABASE_URI', 'postgresql://user:pass@db:5432/calibrations')
+    monkeypatch.setenv('DB_POOL_SIZE', '3')
+    monkeypatch.setenv('DB_POOL_PRE_PING', 'false')
+    monkeypatch.setenv('DB_STATEMENT_TIMEOUT', '5000')
+
+    options = engine_options()
+
+    assert database_uri() == 'postgresql://user:pass@db:5432/calibrations'
+    assert options["poolclass"] is TimedQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (3, DEFAULT_DB_MAX_OVERFLOW)
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
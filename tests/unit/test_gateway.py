@@ -0,0 +1,143 @@
+"""
+Tests for the gateway's conditional GETs, response cache and composite fan-out, with the downstream services mocked
+"""
+
+import threading
+import time
+
+import pytest
+
+import request_handler
+from common_packages.cache.backends import LocalBackend
+from common_packages.cache.cache import Cache
+from common_packages.constants.constants import GATEWAY_RESPONSE_CACHE
+
+
+class SharedLocalBackend(LocalBackend):
+    """One in-process store standing in for Redis: every worker of this test sees it"""
+    shared = True
+
+
+@pytest.fixture(params=[LocalBackend, SharedLocalBackend], ids=['local', 'shared'])
+def response_cache(request, monkeypatch):
+    cache = Cache(GATEWAY_RESPONSE_CACHE, request.param(maxsize=100, ttl=30), 30)
+    monkeypatch.setattr(request_handler, 'response_cache', cache)
+    return cache
+
+
+def listing_url():
+    return request_handler.calibration_service.url('/internal-calibrations')
+
+
+def test_if_none_match_gets_304_until_the_downstream_body_changes(gateway_app, response_cache, requests_mock):
+    """Test a matching ETag gets a 304 and a changed body a 200, never a stale one, on either backend"""
+    downstream = requests_mock.get(listing_url(), json={"data": {"calibrations": [1]}})
+    client = gateway_app.test_client()
+
+    first = client.get('/api/v1/calibrations?username=alice')
+    assert first.status_code == 200
+    assert first.headers['X-Cache'] == 'MISS'
+    assert 'Last-Modified' not in first.headers
+    etag = first.headers['ETag']
+
+    second = client.get('/api/v1/calibrations?username=alice', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+
+    # A write the gateway never saw: only the TTL of a shared cache can hide it
+    requests_mock.get(listing_url(), json={"data": {"calibrations": [1, 2]}})
+    third = client.get('/api/v1/calibrations?username=alice', headers={'If-None-Match': etag})
+    if response_cache.shared:
+        assert (third.status_code, third.headers['X-Cache'], downstream.call_count) == (304, 'HIT', 1)
+    else:
+        assert third.status_code == 200
+        assert third.get_json() == {"data": {"calibrations": [1, 2]}}
+        assert third.headers['ETag'] != etag
+        assert response_cache.stats()['hits'] == 0
+
+
+def test_writes_through_the_gateway_invalidate_cached_gets(gateway_app, response_cache, requests_mock):
+    """Test successful and failed POSTs and DELETEs drop cached GETs, and rejected ones don't"""
+    tags_url = request_handler.tag_service.url('/internal-calibration/7/tags')
+    requests_mock.get(tags_url, json={"data": {"tags": []}})
+    client = gateway_app.test_client()
+    etag = client.get('/api/v1/calibrations/7/tags').headers['ETag']
+
+    def tags_after(write, body):
+        requests_mock.get(tags_url, json=body)
+        write()
+        return client.get('/api/v1/calibrations/7/tags', headers={'If-None-Match': etag})
+
+    requests_mock.post(tags_url, status_code=201, json={"status": {"code": 201}})
+    response = tags_after(lambda: client.post('/api/v1/calibrations/7/tags', json={"tag_name": "production"}),
+                          {"data": {"tags": ["production"]}})
+    assert (response.status_code, response.headers['X-Cache']) == (200, 'MISS')
+    etag = response.headers['ETag']
+
+    # Rejected by the gateway's schema check: nothing changed downstream, the cached body stays valid
+    assert client.post('/api/v1/calibrations/7/tags', json={}).status_code == 400
+    response = client.get('/api/v1/calibrations/7/tags', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+    # Timed out downstream, so it may still have been applied
+    requests_mock.delete(f'{tags_url}/production', exc=request_handler.requests.exceptions.ReadTimeout)
+    response = tags_after(lambda: client.delete('/api/v1/calibrations/7/tags/production'), {"data": {"tags": []}})
+    assert response.status_code == 200
+    assert response.get_json() == {"data": {"tags": []}}
+
+
+def test_write_during_a_cache_fill_keeps_the_old_body_out(gateway_app, response_cache, requests_mock):
+    """Test a GET whose fetch started before a write doesn't cache the body it read for after the write"""
+    tags_url = request_handler.tag_service.url('/internal-calibration/7/tags')
+    client = gateway_app.test_client()
+    requests_mock.post(tags_url, status_code=201, json={"status": {"code": 201}})
+    bodies = [{"data": {"tags": []}}, {"data": {"tags": ["production"]}}]
+
+    def downstream(request, context):
+        body = bodies.pop(0)
+        if bodies:
+            # The tag is added after this body was read but before the gateway stores it
+            client.post('/api/v1/calibrations/7/tags', json={"tag_name": "production"})
+        return body
+
+    requests_mock.get(tags_url, json=downstream)
+    assert client.get('/api/v1/calibrations/7/tags').get_json() == {"data": {"tags": []}}
+    response = client.get('/api/v1/calibrations/7/tags')
+    assert (response.get_json(), response.headers['X-Cache']) == ({"data": {"tags": ["production"]}}, 'MISS')
+
+
+def test_with_tags_merges_what_arrived_before_the_deadline(gateway_app, requests_mock, monkeypatch):
+    """Test a tag lookup still running at the deadline becomes a per-calibration error, not a failed response"""
+    monkeypatch.setenv('COMPOSITE_DEADLINE', '1')
+    calibration_service, tag_service = request_handler.calibration_service, request_handler.tag_service
+    for calibration_id in (1, 2):
+        requests_mock.get(calibration_service.url(f'/internal-calibration/{calibration_id}'),
+                          json={"data": {"id": calibration_id, "calibration_type": "gain"}})
+    for calibration_id in (1, 2):
+        requests_mock.get(tag_service.url(f'/internal-calibration/{calibration_id}/tags'),
+                          json={"data": {"tags": [{"tag_name": "a"}]}})
+
+    # Stall one hop before it reaches requests-mock, which serialises the calls it answers
+    released = threading.Event()
+    send = tag_service.request
+
+    def stalled_request(method, path, **kwargs):
+        if path == '/internal-calibration/2/tags':
+            released.wait(10)
+        return send(method, path, **kwargs)
+
+    monkeypatch.setattr(tag_service, 'request', stalled_request)
+
+    started = time.monotonic()
+    try:
+        response = gateway_app.test_client().get('/api/v1/calibrations/with-tags?ids=1,2')
+    finally:
+        released.set()
+    assert time.monotonic() - started < 5
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['status']['message'] == '1 of 2 calibrations incomplete'
+    assert body['data']['calibrations'] == [
+        {"id": 1, "calibration_type": "gain", "tags": [{"tag_name": "a"}]},
+        {"id": 2, "calibration_type": "gain", "tags_error": "Downstream service timed out"},
+    ]
@@ -0,0 +1,41 @@
+"""
+Unit tests for the queued, sampled logging pipeline
+"""
+
+import logging
+
+from common_packages.logs.logging_config import SamplingFilter, sample_rate, setup_logger
+
+
+def test_setup_logger_configures_each_logger_once(monkeypatch):
+    """Test modules of one service share a single queue handler, sampled at the configured rate"""
+    monkeypatch.setenv('LOG_SAMPLE_RATES', 'sampled-service=0.25')
+    first = setup_logger('/app/sampled-service/a.py')
+    second = setup_logger('/app/sampled-service/b.py')
+
+    assert first is second
+    assert len(first.handlers) == 1 and len(first.filters) == 1
+    assert first.filters[0].rate == 0.25
+    assert sample_rate('/app/other-service') == 1.0
+
+
+def test_malformed_sample_rates_are_skipped_with_a_warning(monkeypatch, caplog):
+    """Test bad LOG_SAMPLE_RATES entries and a bad LOG_SAMPLE_RATE fall back instead of raising"""
+    monkeypatch.setenv('LOG_SAMPLE_RATES', 'api-service=0.1, calibration-service, tag-service=half,=0.5')
+    with caplog.at_level(logging.WARNING):
+        assert sample_rate('/app/api-service') == 0.1
+    assert len(caplog.records) == 3
+
+    monkeypatch.setenv('LOG_SAMPLE_RATE', 'most')
+    assert sample_rate('/app/tag-service') == 1.0
+    assert "Ignoring LOG_SAMPLE_RATE 'most'" in caplog.text
+
+
+def test_sampling_keeps_warnings_and_drops_info():
+    """Test sampling only ever drops records below WARNING"""
+    def record(level):
+        return logging.LogRecord('service', level, __file__, 1, 'message', None, None)
+
+    assert SamplingFilter(0).filter(record(logging.WARNING))
+    assert not SamplingFilter(0).filter(record(logging.INFO))
+    assert SamplingFilter(1).filter(record(logging.INFO))
@@ -0,0 +1,92 @@
+"""
+Unit tests for request, SQL and downstream instrumentation
+"""
+
+import re
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from common_packages.instrumentation.metrics import instrument, observe_downstream
+from common_packages.instrumentation.timing import parse_server_timing, phase, record_downstream
+
+
+def _sample(body, name, **labels):
+    """Value of one sample in a Prometheus text exposition"""
+    for line in body.splitlines():
+        match = re.match(r'^(\w+)\{(.*)\} (\S+)$', line)
+        if match and match.group(1) == name:
+            found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2)))
+            if all(found.get(key) == str(value) for key, value in labels.items()):
+                return float(match.group(3))
+    return None
+
+
+def test_requests_are_timed_with_their_sql_statements(monkeypatch):
+    """Test /metrics reports latency by route and status, and the SQL each request ran"""
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+    engine = create_engine('sqlite://')
+    app = Flask(__name__)
+    instrument(app, 'metrics-test')
+
+    @app.route('/items/<int:item_id>')
+    def get_item(item_id):
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+            connection.execute(text('SELECT 2'))
+        return {"id": item_id}
+
+    client = app.test_client()
+    client.get('/items/1')
+    client.get('/items/2')
+    client.get('/nowhere')
+
+    body = client.get('/metrics').get_data(as_text=True)
+    route = {"service": 'metrics-test', "method": 'GET', "route": '/items/<int:item_id>'}
+    assert _sample(body, 'http_request_duration_seconds_count', status=200, **route) == 2
+    assert _sample(body, 'http_request_db_statements_sum', **route) == 4
+    assert _sample(body, 'http_request_db_seconds_count', **route) == 2
+    assert _sample(body, 'http_request_duration_seconds_count', service='metrics-test',
+                   route='unmatched', status=404) == 1
+
+
+def test_downstream_hops_are_timed(monkeypatch):
+    """Test downstream calls are recorded by target and outcome"""
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+    app = Flask(__name__)
+    instrument(app, 'downstream-test')
+    observe_downstream('metrics-target', 'GET', 200, 0.02)
+    observe_downstream('metrics-target', 'GET', 'ConnectTimeout', 2.0)
+
+    body = app.test_client().get('/metrics').get_data(as_text=True)
+    assert _sample(body, 'downstream_request_duration_seconds_count', target='metrics-target', status=200) == 1
+    assert _sample(body, 'downstream_request_duration_seconds_sum', target='metrics-target',
+                   status='ConnectTimeout') == 2.0
+
+
+def test_request_id_and_server_timing(monkeypatch):
+    """Test the request id is adopted or generated, and phases and downstream hops reach Server-Timing"""
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+    app = Flask(__name__)
+    instrument(app, 'timing-test')
+
+    @app.route('/work')
+    def work():
+        with phase('serialization'):
+            pass
+        record_downstream('calibration', 0.030, 'count;dur=12.5, db;desc="2 statements";dur=20, total;dur=25')
+        return {}
+
+    client = app.test_client()
+    response = client.get('/work', headers={'X-Request-ID': 'trace-123'})
+    assert response.headers['X-Request-ID'] == 'trace-123'
+
+    phases = dict(parse_server_timing(response.headers['Server-Timing']))
+    assert list(phases) == ['serialization', 'calibration', 'calibration.count', 'calibration.db',
+                            'calibration.total', 'total']
+    assert phases['calibration'] == 0.030
+    assert phases['calibration.count'] == 0.0125
+
+    # Ids that aren't plain tokens are replaced rather than echoed into logs and headers
+    generated = client.get('/work', headers={'X-Request-ID': 'two words'}).headers['X-Request-ID']
+    assert re.match(r'^[0-9a-f]{32}$', generated)
@@ -0,0 +1,99 @@
+"""
+Unit tests for the schema migration registry and the index check
+"""
+
+from sqlalchemy import create_engine, text
+
+from common_packages.migrations.index_check import check_indexes, invalid_indexes
+from common_packages.migrations.migrate import load_migrations, upgrade
+from common_packages.models.models import db
+
+
+def test_migrations_are_ordered_and_complete():
+    """Test every migration module loads in version order with upgrade and downgrade steps"""
+    migrations = load_migrations()
+
+    versions = [migration.version for migration in migrations]
+    assert versions == sorted(versions)
+    assert versions[0] == 1
+
+    for migration in migrations:
+        assert migration.module.UPGRADE
+        assert migration.module.DOWNGRADE
+        assert isinstance(migration.module.TRANSACTIONAL, bool)
+
+
+def test_model_indexes_have_migrations():
+    """Test every index declared on the models is created by some migration"""
+    statements = ' '.join(
+        statement for migration in load_migrations() for statement in migration.module.UPGRADE
+    )
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            assert index.name in statements
+
+
+def _seed_representative_rows(connection):
+    # Plans for empty tables say nothing, so give the planner many users, types and tags to choose
+    # between, including the values FILTER_CASES looks for
+    connection.execute(text(
+        "INSERT INTO calibrations (id, calibration_type, value, username, timestamp) "
+        "SELECT n, CASE WHEN n / 200 % 10 = 0 THEN 'offset' ELSE 'type' || n / 200 % 10 END, n, "
+        "CASE WHEN n % 200 = 0 THEN 'alice' ELSE 'user' || n % 200 END, "
+        "timestamptz '2025-01-01' + n * interval '10 minutes' FROM generate_series(1, 50000) AS n"
+    ))
+    connection.execute(text(
+        "INSERT INTO tags (name, created_at, updated_at) "
+        "SELECT CASE WHEN n = 1 THEN 'production' ELSE 'tag' || n END, now(), now() "
+        "FROM generate_series(1, 100) AS n"
+    ))
+    connection.execute(text(
+        "INSERT INTO calibration_tags (calibration_id, tag_id, added_at, removed_at) "
+        "SELECT n, (SELECT min(id) FROM tags) + n % 100, timestamp '2025-01-01', "
+        "CASE WHEN n % 3 = 0 THEN timestamp '2025-03-01' END FROM generate_series(1, 50000) AS n"
+    ))
+    connection.execute(text("ANALYZE calibrations, tags, calibration_tags"))
+
+
+def test_index_check_needs_the_filter_index(database_url):
+    """Test the index check fails once a filter's own index is gone, though no Seq Scan appears"""
+    engine = create_engine(database_url)
+    try:
+        with engine.begin() as connection:
+            _seed_representative_rows(connection)
+        assert [case for case, _, found in check_indexes(engine) if found] == []
+
+        with engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_calibrations_type_timestamp_id"))
+        failures = {case: found for case, _, found in check_indexes(engine) if found}
+        assert set(failures) == {
+            'calibration_type [page]', 'calibration_type [count]',
+            'calibration_type + date range [page]', 'calibration_type + date range [count]',
+        }
+        assert not any('seq scan' in problem for found in failures.values() for problem in found)
+    finally:
+        # Rebuilding the index is the migration's job: forget it and apply it again
+        with engine.begin() as connection:
+            connection.execute(text("DELETE FROM schema_migrations WHERE version = 2"))
+            connection.execute(text("TRUNCATE calibrations, tags, calibration_tags CASCADE"))
+        assert upgrade(engine) == [2]
+        engine.dispose()
+
+
+def test_failed_concurrent_index_build_is_redone(database_url):
+    """Test rerunning a migration rebuilds an index that an earlier failed build left INVALID"""
+    engine = create_engine(database_url)
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(
+                "UPDATE pg_index SET indisvalid = false "
+                "WHERE indexrelid = 'ix_calibrations_username_timestamp_id'::regclass"
+            ))
+            assert invalid_indexes(connection) == ['ix_calibrations_username_timestamp_id']
+            connection.execute(text("DELETE FROM schema_migrations WHERE version = 2"))
+
+        assert upgrade(engine) == [2]
+        with engine.connect() as connection:
+            assert invalid_indexes(connection) == []
+    finally:
+        engine.dispose()
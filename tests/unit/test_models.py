@@ -0,0 +1,67 @@
+"""
+Tests for tag membership intervals (valid_during) queried at a point in time and over a range, served from PostgreSQL
+"""
+
+from datetime import datetime, timezone
+
+from common_packages.models.filters import filter_calibrations
+from common_packages.models.models import Calibration, CalibrationTag, Tag, db
+
+
+def at(hour, minute=0):
+    return datetime(2025, 8, 7, hour, minute)
+
+
+def seed_memberships():
+    """Tag 'production' with 1 over [10:00, 12:00) and again from 14:00, 2 from 11:00, 3 over [09:00, 10:00)"""
+    db.session.add_all(Calibration(id=calibration_id, calibration_type='gain', value=1.0, username='alice',
+                                   timestamp=at(8)) for calibration_id in (1, 2, 3))
+    tag = Tag(name='production')
+    db.session.add(tag)
+    db.session.flush()
+    db.session.add_all([
+        CalibrationTag(calibration_id=1, tag_id=tag.id, added_at=at(10), removed_at=at(12)),
+        CalibrationTag(calibration_id=1, tag_id=tag.id, added_at=at(14)),
+        CalibrationTag(calibration_id=2, tag_id=tag.id, added_at=at(11)),
+        CalibrationTag(calibration_id=3, tag_id=tag.id, added_at=at(9), removed_at=at(10)),
+    ])
+    db.session.commit()
+    return tag.id
+
+
+def test_membership_at_a_point_includes_added_at_and_excludes_removed_at(calibration_app):
+    """Test tag_at_time and get_historical_for_tag follow the '[)' bounds, including a re-added membership"""
+    tag_id = seed_memberships()
+
+    def members(when):
+        listed = filter_calibrations(Calibration.query, tag_name='production', tag_at_time=when)
+        historical = CalibrationTag.get_historical_for_tag(tag_id, datetime.fromisoformat(when))
+        assert sorted(row.calibration_id for row in historical) == sorted(row.id for row in listed)
+        return sorted(row.id for row in listed)
+
+    # 1 joins exactly at 10:00 as 3 leaves
+    assert members('2025-08-07T10:00:00') == [1]
+    # 1 leaves exactly at 12:00
+    assert members('2025-08-07T12:00:00') == [2]
+    assert members('2025-08-07T13:00:00') == [2]
+    # Re-added at 14:00
+    assert members('2025-08-07T14:00:00') == [1, 2]
+    # Aware timestamps are compared in UTC: 12:00+02:00 is 10:00
+    assert members('2025-08-07T12:00:00+02:00') == [1]
+
+
+def test_membership_over_a_range_overlaps_open_and_re_added_memberships(calibration_app):
+    """Test get_during_for_tag matches any membership overlapping [start, end), open-ended ones included"""
+    tag_id = seed_memberships()
+
+    def members(start, end):
+        return sorted(row.calibration_id for row in CalibrationTag.get_during_for_tag(tag_id, start, end))
+
+    # Neither 1's removal at 12:00 nor its re-add at 14:00 falls inside [12:00, 14:00)
+    assert members(at(12), at(14)) == [2]
+    # Both of 1's memberships overlap a range spanning the gap
+    assert members(at(11, 59), at(14, 1)) == [1, 1, 2]
+    # Still-open memberships overlap any later range
+    assert members(datetime(2030, 1, 1), datetime(2030, 1, 2)) == [1, 2]
+    assert members(at(9, 30), at(10)) == [3]
+    assert members(datetime(2025, 8, 7, 8, tzinfo=timezone.utc), datetime(2025, 8, 7, 9, tzinfo=timezone.utc)) == []
@@ -0,0 +1,93 @@
+"""
+Unit tests for the pooled downstream clients and the deadline-bound fan-out
+"""
+
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common_packages.constants.constants import CALIBRATION_SERVICE, DEFAULT_CONNECT_TIMEOUT
+from common_packages.utils import service_client
+from common_packages.utils.service_client import ServiceClient, build_client, fan_out, DeadlineExceeded
+
+
+def test_service_client_reads_environment(monkeypatch):
+    """Test downstream clients pick up base URLs, pool sizes and timeouts from the environment"""
+    monkeypatch.setenv('CALIBRATION_SERVICE_URL', 'http://localhost:5001/')
+    monkeypatch.setenv('DOWNSTREAM_POOL_SIZE', '8')
+    monkeypatch.setenv('CALIBRATION_SERVICE_READ_TIMEOUT', '5')
+
+    client = build_client(CALIBRATION_SERVICE)
+
+    assert client.url('/internal-calibrations') == 'http://localhost:5001/internal-calibrations'
+    assert client.pool_size == 8
+    assert client.timeout == (DEFAULT_CONNECT_TIMEOUT, 5.0)
+
+
+def test_service_client_reuses_session():
+    """Test a client keeps one session per process and shares it between calls"""
+    client = ServiceClient('http://localhost:5002', pool_size=4)
+
+    session = client.session
+    assert client.session is session
+    assert session.get_adapter('http://localhost:5002')._pool_maxsize == 4
+
+    client.close()
+    assert client.session is not session
+
+
+def test_fan_out_runs_concurrently_within_deadline(monkeypatch):
+    """Test fanned-out calls overlap, and calls still running at the deadline are reported"""
+    client = ServiceClient('http://localhost:5001')
+
+    def fake_request(method, path, **kwargs):
+        time.sleep(1.0 if path == '/slow' else 0.1)
+        return path
+
+    monkeypatch.setattr(client, 'request', fake_request)
+    started = time.monotonic()
+    results = fan_out({
+        'a': (client, 'GET', '/a', {}),
+        'b': (client, 'GET', '/b', {}),
+        'slow': (client, 'GET', '/slow', {}),
+    }, deadline=started + 0.5)
+
+    assert time.monotonic() - started < 0.9
+    assert results['a'] == '/a' and results['b'] == '/b'
+    assert isinstance(results['slow'], DeadlineExceeded)
+
+
+def test_fan_out_hops_abandoned_at_the_deadline_end_by_then(monkeypatch):
+    """Test a hop that waited in the queue and then got no answer gives its thread back by the deadline"""
+    # One thread, so the second hop only starts once the first is done
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(service_client, '_get_executor', lambda: executor)
+    busy = ServiceClient('http://localhost:5001')
+    monkeypatch.setattr(busy, 'request', lambda method, path, **kwargs: time.sleep(0.3) or path)
+
+    # Accepts connections into its backlog but never reads or answers them
+    silent = socket.create_server(('127.0.0.1', 0))
+    client = ServiceClient(f'http://127.0.0.1:{silent.getsockname()[1]}', read_timeout=30)
+    finished = []
+    send = client.request
+
+    def timed_request(method, path, **kwargs):
+        try:
+            return send(method, path, **kwargs)
+        finally:
+            finished.append(time.monotonic())
+
+    monkeypatch.setattr(client, 'request', timed_request)
+    try:
+        started = time.monotonic()
+        results = fan_out({
+            'busy': (busy, 'GET', '/busy', {}),
+            'silent': (client, 'GET', '/silent', {}),
+        }, deadline=started + 0.6)
+        assert results['busy'] == '/busy'
+        assert isinstance(results['silent'], DeadlineExceeded)
+        executor.shutdown(wait=True)
+        assert finished[0] - started < 0.75
+    finally:
+        client.close()
+        silent.close()
@@ -0,0 +1,75 @@
+"""
+Unit tests for the shared gunicorn configuration
+"""
+
+import importlib
+import multiprocessing
+import os
+from types import SimpleNamespace
+
+from common_packages.utils import id_generator
+
+
+def test_gunicorn_workers_get_distinct_snowflake_ids(monkeypatch, tmp_path):
+    """Test each pre-forked worker takes the lowest free worker id, and freed ids are reused"""
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    from common_packages.serving import gunicorn_conf
+
+    server = SimpleNamespace(WORKERS={})
+    for pid in (101, 102, 103):
+        worker = SimpleNamespace()
+        gunicorn_conf.pre_fork(server, worker)
+        server.WORKERS[pid] = worker
+    assert [worker.snowflake_worker_id for worker in server.WORKERS.values()] == [0, 1, 2]
+
+    # A recycled worker's replacement takes over its id
+    del server.WORKERS[102]
+    replacement = SimpleNamespace()
+    gunicorn_conf.pre_fork(server, replacement)
+    assert replacement.snowflake_worker_id == 1
+
+
+def test_gunicorn_runs_one_worker_unless_caches_are_shared(monkeypatch, tmp_path):
+    """Test per-process caches default to a single worker, and a shared backend to one per core"""
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    from common_packages.serving import gunicorn_conf
+    backend = os.getenv('CACHE_BACKEND')
+
+    try:
+        monkeypatch.delenv('CACHE_BACKEND', raising=False)
+        assert importlib.reload(gunicorn_conf).workers == 1
+
+        monkeypatch.setenv('CACHE_BACKEND', 'redis')
+        expected = min(multiprocessing.cpu_count() * 2 + 1, gunicorn_conf.MAX_WORKERS)
+        assert importlib.reload(gunicorn_conf).workers == expected
+
+        # More workers than the local backend supports only earns a warning
+        monkeypatch.setenv('CACHE_BACKEND', 'local')
+        importlib.reload(gunicorn_conf)
+        warnings = []
+        server = SimpleNamespace(cfg=SimpleNamespace(workers=3, preload_app=False),
+                                 log=SimpleNamespace(warning=lambda message, *args: warnings.append(message % args)))
+        gunicorn_conf.when_ready(server)
+        assert len(warnings) == 1 and warnings[0].startswith("3 workers with per-process caches")
+    finally:
+        # Reload under the caller's backend, still inside the temporary metrics directory
+        if backend is None:
+            monkeypatch.delenv('CACHE_BACKEND', raising=False)
+        else:
+            monkeypatch.setenv('CACHE_BACKEND', backend)
+        importlib.reload(gunicorn_conf)
+
+
+def test_gunicorn_hooks_pass_over_the_gateway_without_a_database(monkeypatch, tmp_path):
+    """Test the gateway app registers no database, and the fork hooks have no connections to drop for it"""
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    monkeypatch.setattr(id_generator, '_generator', None)
+    from common_packages.serving import gunicorn_conf
+    from app import app
+
+    assert 'sqlalchemy' not in app.extensions
+    server = SimpleNamespace(cfg=SimpleNamespace(workers=1, preload_app=True), app=SimpleNamespace(wsgi=lambda: app),
+                             log=SimpleNamespace(warning=print, info=print))
+    gunicorn_conf.when_ready(server)
+    gunicorn_conf.post_fork(server, SimpleNamespace(pid=101, snowflake_worker_id=0, app=server.app))
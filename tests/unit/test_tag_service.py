@@ -0,0 +1,210 @@
+"""
+Tests for the tag service endpoints, served from PostgreSQL
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy import event, select
+
+from common_packages.models.models import Calibration, CalibrationTag, Tag, db
+from tag_registry import tag_registry
+
+
+def add_calibrations(*calibration_ids):
+    db.session.add_all(Calibration(id=calibration_id, calibration_type='gain', value=1.0, username='alice',
+                                   timestamp=datetime(2025, 8, 7, 12, 0, 0)) for calibration_id in calibration_ids)
+    db.session.commit()
+
+
+@contextmanager
+def recorded_statements(engine):
+    """Collect every statement ``engine`` runs inside the block"""
+    statements = []
+
+    def record(connection, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_tag_registry_reuses_ids_and_races_safely_on_create(tag_app, monkeypatch):
+    """Test a resolved tag needs no query and a tag created concurrently is found, not duplicated"""
+    add_calibrations(1, 2)
+    client = tag_app.test_client()
+
+    response = client.post('/internal-calibration/1/tags', json={"tag_name": "production"})
+    assert response.status_code == 201
+    tag_id = response.get_json()['data']['tag_id']
+    assert db.session.get(Tag, tag_id).name == 'production'
+
+    with recorded_statements(db.engine) as statements:
+        assert tag_registry.get_or_create_id('production') == (tag_id, False)
+    assert statements == []
+
+    # Another replica creates 'staging' between our lookup and our insert
+    db.session.add(Tag(name='staging', created_at=datetime.utcnow(), updated_at=datetime.utcnow()))
+    db.session.commit()
+    with monkeypatch.context() as patch:
+        patch.setattr(tag_registry, 'get_id', lambda name: None)
+        staging_id, created = tag_registry.get_or_create_id('staging')
+    assert created is False
+    assert staging_id == Tag.query.filter_by(name='staging').one().id
+
+    response = client.post('/internal-calibration/2/tags', json={"tag_name": "staging"})
+    assert response.get_json()['data']['tag_id'] == staging_id
+    assert Tag.query.count() == 2
+
+
+def test_created_tag_shares_the_callers_transaction(tag_app):
+    """Test a new tag is written on the request's own connection, and cached only once that transaction commits"""
+    add_calibrations(1)
+    db.session.execute(select(Calibration.id)).all()
+    checkouts = []
+
+    def checkout(*args):
+        checkouts.append(args)
+
+    # The session already holds a connection; creating the tag must not take a second one
+    event.listen(db.engine.pool, 'checkout', checkout)
+    try:
+        tag_id, created = tag_registry.get_or_create_id('qa')
+    finally:
+        event.remove(db.engine.pool, 'checkout', checkout)
+    assert created is True and checkouts == []
+    assert tag_registry.get_id('qa') == tag_id
+    db.session.rollback()
+    assert Tag.query.filter_by(name='qa').count() == 0
+    assert 'qa' not in tag_registry._ids
+
+    tag_id, created = tag_registry.get_or_create_id('qa')
+    assert created is True and 'qa' not in tag_registry._ids
+    db.session.commit()
+    assert tag_registry._ids['qa'] == tag_id == Tag.query.filter_by(name='qa').one().id
+
+
+def test_single_add_losing_a_race_reports_already_tagged(tag_app):
+    """Test an add that a concurrent request beats to the active row answers 200 instead of a database error"""
+    add_calibrations(1, 2)
+    client = tag_app.test_client()
+    assert client.post('/internal-calibration/1/tags', json={"tag_name": "production"}).status_code == 201
+    assert client.delete('/internal-calibration/1/tags/production').status_code == 200
+    tag_id = tag_registry.get_id('production')
+
+    def concurrent_add(connection, cursor, statement, parameters, *args):
+        # Another request commits the active row after this one checked, just before it writes
+        if statement.startswith(('INSERT INTO calibration_tags', 'UPDATE calibration_tags')) and pending:
+            calibration_id = pending.pop()
+            with db.engine.begin() as other:
+                other.execute(CalibrationTag.__table__.insert().values(
+                    calibration_id=calibration_id, tag_id=tag_id, added_at=datetime.utcnow()))
+
+    # 2 would be a new row, 1 a reactivation
+    pending = [1, 2]
+    event.listen(db.engine, 'before_cursor_execute', concurrent_add)
+    try:
+        for calibration_id in (2, 1):
+            response = client.post(f'/internal-calibration/{calibration_id}/tags', json={"tag_name": "production"})
+            assert response.status_code == 200
+            assert response.get_json()['status']['message'] == "Calibration is already tagged with 'production'"
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', concurrent_add)
+    assert pending == []
+    assert CalibrationTag.query.filter_by(tag_id=tag_id, removed_at=None).count() == 2
+
+
+def test_bulk_add_reports_each_calibration_outcome(tag_app):
+    """Test bulk add tells not-found, already-tagged and reactivated calibrations apart and never duplicates"""
+    add_calibrations(1, 2, 3, 4)
+    client = tag_app.test_client()
+    assert client.post('/internal-calibration/1/tags', json={"tag_name": "production"}).status_code == 201
+    assert client.post('/internal-calibration/2/tags', json={"tag_name": "production"}).status_code == 201
+    assert client.delete('/internal-calibration/2/tags/production').status_code == 200
+
+    response = client.post('/internal-tags/production/calibrations', json={"calibration_ids": [1, 2, 3, 99, 3]})
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert [(result['calibration_id'], result['outcome']) for result in data['results']] == [
+        (1, 'already_tagged'), (2, 'reactivated'), (3, 'added'), (99, 'not_found')
+    ]
+    assert data['summary'] == {'already_tagged': 1, 'reactivated': 1, 'added': 1, 'not_found': 1}
+
+    response = client.post('/internal-tags/production/calibrations', json={"calibration_ids": [1, 2, 3, 4]})
+    assert [result['outcome'] for result in response.get_json()['data']['results']] == [
+        'already_tagged', 'already_tagged', 'already_tagged', 'added'
+    ]
+    active = CalibrationTag.query.filter(CalibrationTag.removed_at.is_(None))
+    assert sorted(row.calibration_id for row in active) == [1, 2, 3, 4]
+    assert CalibrationTag.query.count() == 4
+
+    response = client.get('/internal-calibration/2/tags')
+    assert [tag['tag_name'] for tag in response.get_json()['data']['tags']] == ['production']
+
+
+def test_latest_per_type_now_and_at_a_past_time(tag_app):
+    """Test latest follows adds and removals, while tag_at_time answers from the membership back then"""
+    rows = [(1, 'gain', 'alice', 1), (2, 'gain', 'alice', 2), (3, 'offset', 'bob', 1), (4, 'gain', 'bob', 3)]
+    db.session.add_all(Calibration(id=calibration_id, calibration_type=calibration_type, value=1.0,
+                                   username=username, timestamp=datetime(2025, 8, day, 12, 0, 0))
+                       for calibration_id, calibration_type, username, day in rows)
+    db.session.commit()
+    client = tag_app.test_client()
+
+    def latest(**params):
+        response = client.get('/internal-tags/production/latest', query_string=params)
+        assert response.status_code == 200
+        return [(row['calibration_type'], row['username'], row['id'])
+                for row in response.get_json()['data']['calibrations']]
+
+    client.post('/internal-tags/production/calibrations', json={"calibration_ids": [1, 3]})
+    before = datetime.now(timezone.utc).isoformat()
+    client.post('/internal-tags/production/calibrations', json={"calibration_ids": [2, 4]})
+    client.delete('/internal-calibration/4/tags/production')
+
+    assert latest() == [('gain', 'alice', 2), ('offset', 'bob', 3)]
+    assert latest(group_by='calibration_type,username') == [('gain', 'alice', 2), ('offset', 'bob', 3)]
+    assert latest(tag_at_time=before) == [('gain', 'alice', 1), ('offset', 'bob', 3)]
+
+    # Removing the latest falls back to the newest remaining member
+    client.delete('/internal-calibration/2/tags/production')
+    assert latest() == [('gain', 'alice', 1), ('offset', 'bob', 3)]
+    assert latest(tag_at_time=before) == [('gain', 'alice', 1), ('offset', 'bob', 3)]
+
+    client.post('/internal-calibration/4/tags', json={"tag_name": "production"})
+    assert latest(group_by='calibration_type,username') == [
+        ('gain', 'alice', 1), ('gain', 'bob', 4), ('offset', 'bob', 3)
+    ]
+    assert latest() == [('gain', 'bob', 4), ('offset', 'bob', 3)]
+    assert client.get('/internal-tags/missing/latest').status_code == 404
+
+
+def test_snapshot_diff_against_another_snapshot_and_the_tag_now(tag_app):
+    """Test a snapshot keeps its members as the tag changes, and diffs report what was added and removed"""
+    add_calibrations(1, 2, 3, 4)
+    client = tag_app.test_client()
+    client.post('/internal-tags/production/calibrations', json={"calibration_ids": [3, 1, 2]})
+
+    response = client.post('/internal-tags/production/snapshots', json={"name": "release-1"})
+    assert response.status_code == 201
+    assert response.get_json()['data']['calibration_count'] == 3
+    assert client.post('/internal-tags/production/snapshots', json={"name": "release-1"}).status_code == 409
+
+    client.delete('/internal-tags/production/calibrations', json={"calibration_ids": [1]})
+    client.post('/internal-tags/production/calibrations', json={"calibration_ids": [4]})
+    assert client.get('/internal-snapshots/release-1').get_json()['data']['calibration_ids'] == [1, 2, 3]
+
+    diff = client.get('/internal-snapshots/release-1/diff').get_json()['data']
+    assert diff == {"from": "release-1", "to": None, "added": [4], "removed": [1], "unchanged_count": 2}
+
+    client.post('/internal-tags/production/snapshots', json={"name": "release-2"})
+    client.delete('/internal-tags/production/calibrations', json={"calibration_ids": [2, 3, 4]})
+    diff = client.get('/internal-snapshots/release-1/diff?against=release-2').get_json()['data']
+    assert (diff['to'], diff['added'], diff['removed'], diff['unchanged_count']) == ('release-2', [4], [1], 2)
+    diff = client.get('/internal-snapshots/release-2/diff').get_json()['data']
+    assert (diff['added'], diff['removed'], diff['unchanged_count']) == ([], [2, 3, 4], 0)
+
+    assert client.get('/internal-snapshots/release-1/diff?against=missing').status_code == 404
@@ -3,9 +3,17 @@ Unit tests for utility functions
 UPDATED TO USE YOUR ACTUAL UTILITIES
 """
 
+import json
 import pytest
-from common_packages.utils.id_generator import SnowflakeIdGenerator
-from common_packages.utils.schema_validator import validate_schema
+import threading
+from datetime import datetime, timezone
+
+from common_packages.utils import id_generator
+from common_packages.utils.id_generator import SnowflakeIdGenerator, get_id_generator, configure_id_generator
+from common_packages.utils.schema_validator import validate_schema, schema_errors, validate_many, get_validator
+from common_packages.utils.cursor import encode_cursor, decode_cursor
+from common_packages.utils.ttl_cache import TTLCache
+from common_packages.utils.export import ndjson_chunks, csv_chunks, columnar_chunks, read_columnar
 from common_packages.constants.constants import CALIBRATION_SCHEMA, ADD_TAG_SCHEMA
 
 
@@ -43,6 +51,51 @@ def test_snowflake_id_generator_with_params():
     assert generated_id > 0
 
 
+def test_snowflake_generate_many():
+    """Test batch reservation returns unique, ascending IDs across millisecond boundaries"""
+    generator = SnowflakeIdGenerator(worker_id=1, datacenter_id=2)
+
+    ids = generator.generate_many(10000)
+
+    assert len(ids) == 10000
+    assert ids == sorted(set(ids))
+    assert generator.generate() > ids[-1]
+
+
+def test_snowflake_generator_is_thread_safe():
+    """Test concurrent threads sharing one generator never receive the same ID"""
+    generator = SnowflakeIdGenerator(worker_id=3, datacenter_id=4)
+    results = [[] for _ in range(8)]
+
+    def work(out):
+        for _ in range(2000):
+            out.append(generator.generate())
+
+    threads = [threading.Thread(target=work, args=(out,)) for out in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    all_ids = [generated_id for out in results for generated_id in out]
+    assert len(set(all_ids)) == len(all_ids)
+
+
+def test_process_wide_id_generator(monkeypatch):
+    """Test the shared generator is reused and takes its node IDs from configuration"""
+    # monkeypatch puts the process-wide generator back afterwards, so worker 7 doesn't leak into other tests
+    monkeypatch.setattr(id_generator, '_generator', None)
+    monkeypatch.setenv('SNOWFLAKE_WORKER_ID', '7')
+    monkeypatch.setenv('POD_ORDINAL', '3')
+
+    generator = configure_id_generator()
+    assert get_id_generator() is generator
+    assert (generator.worker_id, generator.datacenter_id) == (7, 3)
+
+    with pytest.raises(ValueError):
+        configure_id_generator(worker_id=32)
+
+
 def test_calibration_schema_validation():
     """Test calibration schema validation using your actual schema"""
     # Valid data
@@ -107,3 +160,104 @@ def test_schema_validation_edge_cases():
     result = validate_schema(invalid_empty, CALIBRATION_SCHEMA)
 
     assert isinstance(result, bool)
+
+
+def test_schema_errors_are_structured():
+    """Test schema_errors reports one entry per offending field"""
+    assert schema_errors({"calibration_type": "offset", "value": 1.5, "username": "a"}, CALIBRATION_SCHEMA) == []
+
+    errors = schema_errors({"value": "not_a_number", "username": "a"}, CALIBRATION_SCHEMA)
+    fields = sorted(error["field"] for error in errors)
+    assert fields == ["calibration_type", "value"]
+    assert all(error["message"] for error in errors)
+
+
+def test_validate_many():
+    """Test batch validation reports only the invalid indexes"""
+    items = [
+        {"calibration_type": "offset", "value": 1.5, "username": "a"},
+        {"calibration_type": "offset", "username": "a"},
+        {"calibration_type": "gain", "value": 2, "username": "b"},
+        None,
+    ]
+    invalid = validate_many(items, CALIBRATION_SCHEMA)
+
+    assert sorted(invalid) == [1, 3]
+    assert invalid[1] == [{"field": "value", "message": "'value' is a required property"}]
+
+
+def test_validators_are_cached():
+    """Test schemas are compiled once and reused"""
+    assert get_validator(CALIBRATION_SCHEMA) is get_validator(CALIBRATION_SCHEMA)
+
+
+def test_cursor_round_trip():
+    """Test keyset cursors decode back to the (timestamp, id) they were built from"""
+    timestamp = datetime(2025, 8, 7, 16, 26, 6, 988677, tzinfo=timezone.utc)
+    cursor = encode_cursor(timestamp, 7359258551077842944)
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (timestamp, 7359258551077842944)
+
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
+
+
+def test_ttl_cache_expiry_and_eviction(monkeypatch):
+    """Test cached entries expire after the TTL and the least recently used entry is evicted"""
+    now = [100.0]
+    monkeypatch.setattr('common_packages.utils.ttl_cache.time.monotonic', lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    now[0] += 11
+    assert cache.get('a') is None
+    assert cache.get('c', 'missing') == 'missing'
+
+
+def test_export_encoders_stream_one_chunk_per_batch():
+    """Test NDJSON and CSV exports encode each row batch as it arrives"""
+    timestamp = datetime(2025, 8, 7, 16, 26, 6, tzinfo=timezone.utc)
+    batches = [[(1, 'offset', 1.5, 'alice', timestamp)], [(2, 'gain', 2.0, 'bob', timestamp)]]
+
+    ndjson = list(ndjson_chunks(iter(batches)))
+    assert len(ndjson) == 2
+    assert json.loads(ndjson[0]) == {
+        'id': 1, 'calibration_type': 'offset', 'value': 1.5, 'username': 'alice',
+        'timestamp': '2025-08-07T16:26:06+00:00'
+    }
+
+    csv_output = b''.join(csv_chunks(iter(batches))).decode().splitlines()
+    assert csv_output == [
+        'id,calibration_type,value,username,timestamp',
+        '1,offset,1.5,alice,2025-08-07T16:26:06+00:00',
+        '2,gain,2.0,bob,2025-08-07T16:26:06+00:00',
+    ]
+    assert b''.join(csv_chunks(iter([]))).decode().strip() == 'id,calibration_type,value,username,timestamp'
+
+
+def test_columnar_export_round_trip():
+    """Test the columnar export decodes back to typed columns with growing dictionaries"""
+    timestamp = datetime(2025, 8, 7, 16, 26, 6, 5, tzinfo=timezone.utc)
+    batches = [
+        [(1, 'offset', 1.5, 'alice', timestamp), (2, 'gain', -2.0, 'alice', timestamp)],
+        [(3, 'offset', 0.25, 'bob', timestamp)],
+    ]
+
+    data = b''.join(columnar_chunks(iter(batches)))
+    assert len(data) % 8 == 0
+    first, second = read_columnar(data)
+
+    assert first['id'].tolist() == [1, 2]
+    assert first['value'].tolist() == [1.5, -2.0]
+    assert first['timestamp_us'].tolist() == [1754583966000005] * 2
+    assert [first['calibration_types'][code] for code in first['calibration_type']] == ['offset', 'gain']
+    assert second['calibration_type'].tolist() == [0]
+    assert [second['usernames'][code] for code in second['username']] == ['bob']
+    assert read_columnar(b''.join(columnar_chunks(iter([])))) == []